@@ -27,6 +27,12 @@ def create_app():
     with app.app_context():
         init_db()
     
+    # Index the security control catalog and crosswalk once, before the first request needs them
+    from app.services.control_catalog import load_control_catalog
+    from app.services.control_crosswalk import load_control_crosswalk
+    load_control_catalog()
+    load_control_crosswalk()
+    
     # Register template filters
     from app.utils.template_filters import register_filters
     register_filters(app)
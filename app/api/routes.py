@@ -10,11 +10,28 @@ from werkzeug.utils import secure_filename
 from app.database import db
 from app.config import settings
 from app.models.document import RFPDocument, VendorBid, AnalysisResult, Requirement, TechnicalSpecification
-from app.models.government import GovernmentAgency, SecurityRequirement, BidSecurityCompliance
+from app.models.government import GovernmentAgency, SecurityRequirement, BidSecurityCompliance, SecurityFramework
 from app.services.document_processor import process_document
 from app.services.rfp_analyzer import analyze_rfp
 from app.services.bid_evaluator import evaluate_bid
 from app.services.security_assessor import assess_security_compliance, predict_bid_risks, analyze_bid_sentiment
+from app.utils.prompt_templates import prompt_token_report, get_prompt_version
+from app.utils.llm_scheduler import scheduler, llm_lane, INTERACTIVE
+from app.utils.model_router import summarize_routing
+from app.services.requirement_library import library_stats
+from app.services.evaluation_runs import evaluation_progress
+from app.services.bid_screening import SCREENING_POLICIES
+from app.services.analysis_versions import current_analysis, current_analyses, list_versions, diff_analyses
+from app.services.bulk_evaluation import start_evaluate_all, competition_progress
+from app.services.scoring import apply_overrides, load_overrides, score_rfp_bids, scoring_weights
+from app.services.score_overrides import set_score_override, remove_score_override, list_score_overrides, rescore_bid
+from app.services.sensitivity import analyze_sensitivity
+from app.services.multi_criteria import rank_bids, CRITERIA
+from app.services.bid_facts import store_bid_facts, query_facts, list_bid_facts, parse_fact_value
+from app.utils.pdf_utils import extract_document_text
+from app.services.control_catalog import get_control_catalog
+from app.services.control_crosswalk import get_control_crosswalk
+from app.services.control_mentions import store_control_mentions, list_control_mentions
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -168,10 +185,18 @@ def upload_bid():
         # Save file
         document.save(file_path)
         
+        # Optional proposed price, for multi-criteria ranking
+        proposed_cost = request.form.get('proposed_cost')
+        try:
+            proposed_cost = float(proposed_cost) if proposed_cost else None
+        except ValueError:
+            return jsonify({"error": "Proposed cost must be a number"}), 400
+        
         # Create DB record
         bid = VendorBid(
             rfp_id=rfp_id,
             vendor_name=vendor_name,
+            proposed_cost=proposed_cost,
             filename=document.filename,
             file_path=file_path,
             content_type=document.content_type,
@@ -215,27 +240,40 @@ def get_rfp(rfp_id):
             "description": rfp.description,
             "upload_date": rfp.upload_date,
             "is_processed": rfp.is_processed,
-            "processing_errors": rfp.processing_errors
+            "processing_errors": rfp.processing_errors,
+            "predecessor_id": rfp.predecessor_id,
+            "amendment_number": rfp.amendment_number,
+            "amendment_summary": rfp.amendment_summary,
+            "extraction_stats": rfp.extraction_stats,
+            "screening_policy": rfp.screening_policy or settings.SCREENING_POLICY
         },
         "requirements": [
             {
                 "id": req.id,
+                "stable_id": req.stable_id,
+                "canonical_id": req.canonical_id,
                 "category": req.category,
                 "description": req.description,
                 "priority": req.priority,
-                "section": req.section
+                "section": req.section,
+                "source_start": req.source_start,
+                "source_end": req.source_end
             } for req in requirements
         ],
         "technical_specifications": [
             {
                 "id": spec.id,
+                "stable_id": spec.stable_id,
                 "name": spec.name,
                 "description": spec.description,
                 "category": spec.category,
                 "measurement_unit": spec.measurement_unit,
                 "min_value": spec.min_value,
                 "max_value": spec.max_value,
-                "is_mandatory": spec.is_mandatory
+                "is_mandatory": spec.is_mandatory,
+                "min_numeric": spec.min_numeric,
+                "max_numeric": spec.max_numeric,
+                "canonical_unit": spec.canonical_unit
             } for spec in tech_specs
         ]
     })
@@ -246,7 +284,7 @@ def get_bid(bid_id):
     if not bid:
         return jsonify({"error": "Bid not found"}), 404
     
-    analysis = db.session.query(AnalysisResult).filter(AnalysisResult.bid_id == bid_id).first()
+    analysis = current_analysis(db.session, bid)
     
     return jsonify({
         "bid": {
@@ -256,7 +294,11 @@ def get_bid(bid_id):
             "rfp_id": bid.rfp_id,
             "is_processed": bid.is_processed,
             "processing_errors": bid.processing_errors,
-            "total_score": bid.total_score
+            "total_score": bid.total_score,
+            "proposed_cost": bid.proposed_cost,
+            "risk_score": bid.risk_score,
+            "screening_status": bid.screening_status,
+            "screening_result": bid.screening_result
         },
         "analysis": {
             "strengths": analysis.strengths if analysis else [],
@@ -287,7 +329,10 @@ def get_rfp_bids(rfp_id):
                 "vendor_name": bid.vendor_name,
                 "submission_date": bid.submission_date,
                 "is_processed": bid.is_processed,
-                "total_score": bid.total_score
+                "total_score": bid.total_score,
+                "proposed_cost": bid.proposed_cost,
+                "risk_score": bid.risk_score,
+                "screening_status": bid.screening_status
             } for bid in bids
         ]
     })
@@ -336,20 +381,33 @@ def get_bid_comparison(rfp_id):
             "is_mandatory": spec.is_mandatory
         })
     
-    # Get bid data with analysis
+    # Get bid data with analysis, scored together and ordered by rank; of the compliance
+    # results only the item scores, with reviewer overrides applied, are sent for the matrix
+    analyses = current_analyses(db.session, bids)
+    scores = score_rfp_bids(db.session, rfp_id, bids)
+    overrides = load_overrides(db.session, [bid.id for bid in bids])
+    comparison_data["scoring"] = scoring_weights()
     for bid in bids:
-        analysis = db.session.query(AnalysisResult).filter(AnalysisResult.bid_id == bid.id).first()
+        analysis = analyses.get(bid.id)
         if analysis:
+            requirement_compliance, technical_compliance, _ = apply_overrides(
+                analysis.requirement_compliance, analysis.technical_compliance, overrides.get(bid.id, [])
+            )
             bid_data = {
                 "id": bid.id,
                 "vendor_name": bid.vendor_name,
-                "total_score": bid.total_score,
+                **scores[bid.id],
                 "strengths": analysis.strengths,
                 "weaknesses": analysis.weaknesses,
-                "requirement_compliance": analysis.requirement_compliance,
-                "technical_compliance": analysis.technical_compliance
+                "requirement_scores": {
+                    item_id: (result or {}).get("score") for item_id, result in requirement_compliance.items()
+                },
+                "technical_scores": {
+                    item_id: (result or {}).get("score") for item_id, result in technical_compliance.items()
+                }
             }
             comparison_data["bids"].append(bid_data)
+    comparison_data["bids"].sort(key=lambda bid_data: bid_data["rank"])
     
     return jsonify(comparison_data)
 
@@ -408,8 +466,9 @@ def security_assessment(bid_id):
         if not rfp:
             return jsonify({"error": "Associated RFP not found"}), 404
         
-        # Get security compliance data
-        compliance_results = assess_security_compliance(bid_id, db.session)
+        # Get security compliance data; reviewer-triggered, so it uses the interactive lane
+        with llm_lane(INTERACTIVE):
+            compliance_results = assess_security_compliance(bid_id, db.session)
         
         return jsonify({
             "bid_id": bid_id,
@@ -439,7 +498,8 @@ def get_bid_risks(bid_id):
             return jsonify({"error": "Bid not found"}), 404
         
         # Get risk prediction data
-        risk_assessment = predict_bid_risks(bid_id, db.session)
+        with llm_lane(INTERACTIVE):
+            risk_assessment = predict_bid_risks(bid_id, db.session)
         
         return jsonify({
             "bid_id": bid_id,
@@ -469,7 +529,8 @@ def get_bid_sentiment(bid_id):
             return jsonify({"error": "Bid not found"}), 404
         
         # Get sentiment analysis data
-        sentiment_analysis = analyze_bid_sentiment(bid_id, db.session)
+        with llm_lane(INTERACTIVE):
+            sentiment_analysis = analyze_bid_sentiment(bid_id, db.session)
         
         return jsonify({
             "bid_id": bid_id,
@@ -509,9 +570,10 @@ def generate_infographic_report(rfp_id):
         
         # Analyze bids and compile report data
         bid_data = []
+        analyses = current_analyses(db.session, bids)
         for bid in bids:
             # Get analysis results
-            analysis = db.session.query(AnalysisResult).filter(AnalysisResult.bid_id == bid.id).first()
+            analysis = analyses.get(bid.id)
             
             # Get security compliance
             security_compliances = db.session.query(BidSecurityCompliance).filter(BidSecurityCompliance.bid_id == bid.id).all()
@@ -650,6 +712,612 @@ def generate_infographic_report(rfp_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Prompt Template Report API
+def get_prompt_report():
+    """
+    Report token counts for every registered prompt template.
+    Shows the tokens of each prompt as originally written and as the template sends
+    it, both rendered with typical fields; totals cover the prompts that existed before.
+    """
+    templates = prompt_token_report()
+    compared = [t for t in templates if t["tokens_before"] is not None]
+    return jsonify({
+        "prompt_version": get_prompt_version(),
+        "templates": templates,
+        "total_tokens_before": sum(t["tokens_before"] for t in compared),
+        "total_tokens_after": sum(t["tokens_after"] for t in compared)
+    })
+
+# LLM Scheduler Status API
+def get_llm_scheduler_status():
+    """
+    Report LLM scheduler capacity, queue depth and wait times per lane.
+    """
+    return jsonify(scheduler.stats())
+
+# Model Routing Report API
+def get_routing_report(rfp_id):
+    """
+    Report cost, latency and escalation rates of tiered model routing for an RFP.
+    Aggregates the routing decisions stored with every compliance result of the RFP's bids.
+    """
+    rfp = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+    if not rfp:
+        return jsonify({"error": "RFP not found"}), 404
+    
+    analyses = (
+        db.session.query(AnalysisResult, VendorBid)
+        .join(VendorBid, AnalysisResult.id == VendorBid.current_analysis_id)
+        .filter(VendorBid.rfp_id == rfp_id)
+        .all()
+    )
+    
+    all_results = []
+    bids = {}
+    for analysis, bid in analyses:
+        results = list((analysis.requirement_compliance or {}).values()) + list((analysis.technical_compliance or {}).values())
+        all_results.extend(results)
+        bids.setdefault(bid.id, {"vendor_name": bid.vendor_name, "results": []})["results"].extend(results)
+    
+    return jsonify({
+        "rfp_id": rfp_id,
+        "routing": summarize_routing(all_results),
+        "bids": [
+            {"bid_id": bid_id, "vendor_name": data["vendor_name"], "routing": summarize_routing(data["results"])}
+            for bid_id, data in bids.items()
+        ]
+    })
+
+# RFP Amendment API
+def upload_rfp_amendment(rfp_id):
+    """
+    Upload an amendment that supersedes an RFP.
+    Only the amendment's added or changed sections are re-extracted. The RFP's bids move
+    to the amendment and, unless reevaluate is "false", are re-evaluated for the changed
+    requirements only.
+    """
+    try:
+        predecessor = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+        if not predecessor:
+            return jsonify({"error": "RFP not found"}), 404
+        
+        if 'document' not in request.files:
+            return jsonify({"error": "No document part"}), 400
+        
+        document = request.files['document']
+        if document.filename == '':
+            return jsonify({"error": "No document selected"}), 400
+        
+        # Validate file extension
+        file_ext = os.path.splitext(document.filename)[1].lower()
+        if file_ext[1:] not in settings.ALLOWED_EXTENSIONS:
+            return jsonify({
+                "error": f"File type not allowed. Allowed types: {settings.ALLOWED_EXTENSIONS}"
+            }), 400
+        
+        # Create unique filename
+        unique_filename = f"{uuid.uuid4()}{file_ext}"
+        file_path = os.path.join(settings.UPLOAD_FOLDER, unique_filename)
+        
+        # Ensure upload directory exists
+        os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
+        
+        # Save file
+        document.save(file_path)
+        
+        amendment_number = (predecessor.amendment_number or 0) + 1
+        rfp = RFPDocument(
+            title=request.form.get('title') or f"{predecessor.title} (Amendment {amendment_number})",
+            agency=predecessor.agency,
+            agency_id=predecessor.agency_id,
+            project_id=predecessor.project_id,
+            description=request.form.get('description') or predecessor.description,
+            filename=document.filename,
+            file_path=file_path,
+            content_type=document.content_type,
+            size_bytes=os.path.getsize(file_path),
+            predecessor_id=predecessor.id,
+            amendment_number=amendment_number
+        )
+        
+        db.session.add(rfp)
+        db.session.commit()
+        
+        success, message = process_document(rfp.id, db.session)
+        if not success:
+            logging.error(f"Error processing RFP amendment: {message}")
+            rfp.processing_errors = message
+            db.session.commit()
+        
+        # Diff against the predecessor and move its bids over
+        if not analyze_rfp(rfp.id, db.session):
+            return jsonify({"error": "Error analyzing RFP amendment", "rfp_id": rfp.id}), 500
+        
+        reevaluated = []
+        if request.form.get('reevaluate', 'true').lower() != 'false':
+            bids = db.session.query(VendorBid).filter(VendorBid.rfp_id == rfp.id).all()
+            for bid in bids:
+                if evaluate_bid(bid.id, db.session, incremental=True):
+                    reevaluated.append(bid.id)
+        
+        return jsonify({
+            "message": "RFP amendment uploaded successfully",
+            "rfp_id": rfp.id,
+            "predecessor_id": predecessor.id,
+            "amendment_number": amendment_number,
+            "amendment_summary": rfp.amendment_summary,
+            "reevaluated_bids": reevaluated
+        })
+    
+    except Exception as e:
+        logger.exception("Error uploading RFP amendment")
+        return jsonify({"error": str(e)}), 500
+
+def get_requirement_library_stats():
+    """
+    Report the size of the cross-RFP requirement library and how often its results are reused.
+    
+    Returns:
+        JSON with canonical requirement, stored result and reuse counts
+    """
+    try:
+        return jsonify(library_stats(db.session))
+    except Exception as e:
+        logger.exception("Error building requirement library stats")
+        return jsonify({"error": str(e)}), 500
+
+def get_evaluation_progress(bid_id):
+    """
+    Report the progress of a bid's latest evaluation run, including one still in flight.
+    
+    Returns:
+        JSON with the run status, finished item counts and finished stages
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    progress = evaluation_progress(db.session, bid_id)
+    if not progress:
+        return jsonify({"error": "Bid has not been evaluated"}), 404
+    return jsonify(progress)
+
+def resume_evaluation(bid_id):
+    """
+    Retry a bid's interrupted evaluation from its checkpoints, or start a fresh one
+    when the form field restart is true. With override_screening true, a bid that
+    failed mandatory screening is evaluated fully, reusing its compliance results.
+    
+    Returns:
+        JSON with the outcome and the run's progress
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    restart = request.form.get('restart', 'false').lower() == 'true'
+    override = request.form.get('override_screening', 'false').lower() == 'true'
+    success = evaluate_bid(bid_id, db.session, incremental=override, resume=not restart, screen=not override)
+    return jsonify({
+        "success": success,
+        "evaluation": evaluation_progress(db.session, bid_id)
+    }), 200 if success else 500
+
+def set_screening_policy(rfp_id):
+    """
+    Set what happens to an RFP's bids that fail mandatory screening: "continue",
+    "defer" or "skip" in the form field policy; an empty value restores the default.
+    
+    Returns:
+        JSON with the policy in effect
+    """
+    rfp = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+    if not rfp:
+        return jsonify({"error": "RFP not found"}), 404
+    
+    policy = (request.form.get('policy') or '').strip().lower() or None
+    if policy is not None and policy not in SCREENING_POLICIES:
+        return jsonify({"error": f"Policy must be one of: {', '.join(SCREENING_POLICIES)}"}), 400
+    
+    rfp.screening_policy = policy
+    db.session.commit()
+    return jsonify({"rfp_id": rfp_id, "screening_policy": policy or settings.SCREENING_POLICY})
+
+def get_analysis_versions(bid_id):
+    """
+    List the stored analysis versions of a bid, newest first.
+    
+    Returns:
+        JSON with each version's run number, score, model and prompt versions
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    return jsonify({"bid_id": bid_id, "versions": list_versions(db.session, bid)})
+
+def diff_analysis_versions(bid_id):
+    """
+    Compare two analysis versions of a bid, given by the run numbers in the query
+    parameters from and to. Defaults to the current version against the one before it.
+    
+    Returns:
+        JSON with the score delta and what changed per requirement, spec and finding
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    def version(run_number):
+        return (
+            db.session.query(AnalysisResult)
+            .filter(AnalysisResult.bid_id == bid_id, AnalysisResult.run_number == run_number)
+            .first()
+        )
+    
+    new = version(request.args.get('to', type=int)) if request.args.get('to') else current_analysis(db.session, bid)
+    if not new:
+        return jsonify({"error": "Analysis version not found"}), 404
+    
+    if request.args.get('from'):
+        old = version(request.args.get('from', type=int))
+    else:
+        old = (
+            db.session.query(AnalysisResult)
+            .filter(AnalysisResult.bid_id == bid_id, AnalysisResult.run_number < (new.run_number or 0))
+            .order_by(AnalysisResult.run_number.desc())
+            .first()
+        )
+    if not old:
+        return jsonify({"error": "No earlier analysis version to compare with"}), 404
+    
+    return jsonify(diff_analyses(old, new))
+
+def evaluate_all_bids(rfp_id):
+    """
+    Start evaluating all processed bids of an RFP in the background. With the form
+    field incremental true, each bid reuses its previous results where possible.
+    
+    Returns:
+        JSON with the job, or 409 if the RFP's previous job is still running
+    """
+    rfp = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+    if not rfp:
+        return jsonify({"error": "RFP not found"}), 404
+    
+    bid_ids = [
+        bid_id for (bid_id,) in
+        db.session.query(VendorBid.id).filter(VendorBid.rfp_id == rfp_id, VendorBid.is_processed == True)
+    ]
+    if not bid_ids:
+        return jsonify({"error": "RFP has no processed bids"}), 400
+    
+    incremental = request.form.get('incremental', 'false').lower() == 'true'
+    job = start_evaluate_all(db.engine, rfp_id, bid_ids, incremental=incremental)
+    if job is None:
+        return jsonify({"error": "An evaluate-all job for this RFP is already running"}), 409
+    return jsonify(job.snapshot()), 202
+
+def get_evaluate_all_progress(rfp_id):
+    """
+    Report the progress of an RFP's bid evaluations, per bid and for the competition.
+    
+    Returns:
+        JSON with the latest evaluate-all job, each bid's evaluation progress and totals
+    """
+    rfp = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+    if not rfp:
+        return jsonify({"error": "RFP not found"}), 404
+    
+    bid_ids = [bid_id for (bid_id,) in db.session.query(VendorBid.id).filter(VendorBid.rfp_id == rfp_id)]
+    return jsonify(competition_progress(db.session, rfp_id, bid_ids))
+
+def get_score_overrides(bid_id):
+    """
+    List the reviewer score overrides of a bid.
+    
+    Returns:
+        JSON with each override's item, score and reviewer
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    return jsonify({"bid_id": bid_id, "overrides": list_score_overrides(db.session, bid)})
+
+def override_item_score(bid_id):
+    """
+    Override the score of one requirement or spec of a bid and rescore it without
+    re-evaluation. Form fields: item_type ("requirement" or "tech_spec"), item_id,
+    score (0-100), and optionally explanation and reviewer.
+    
+    Returns:
+        JSON with the previous and new overall score, the overrides applied and the RFP ranking
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    try:
+        score = float(request.form.get('score', ''))
+    except ValueError:
+        return jsonify({"error": "Score must be a number"}), 400
+    
+    try:
+        set_score_override(
+            db.session, bid,
+            request.form.get('item_type', ''),
+            request.form.get('item_id', ''),
+            score,
+            explanation=request.form.get('explanation') or None,
+            created_by=request.form.get('reviewer') or None
+        )
+        result = rescore_bid(db.session, bid)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    
+    if result is None:
+        db.session.rollback()
+        return jsonify({"error": "Bid has not been evaluated"}), 409
+    db.session.commit()
+    return jsonify(result)
+
+def delete_score_override(bid_id, item_type, item_id):
+    """
+    Remove the score override of one item of a bid and rescore it.
+    
+    Returns:
+        JSON with the previous and new overall score and the RFP ranking
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    if not remove_score_override(db.session, bid, item_type, item_id):
+        return jsonify({"error": "Override not found"}), 404
+    result = rescore_bid(db.session, bid)
+    db.session.commit()
+    return jsonify(result or {"bid_id": bid_id})
+
+def get_award_sensitivity(rfp_id):
+    """
+    Test how stable an RFP's bid ranking is under alternative category weights.
+    
+    Accepts a JSON body (all optional): mode ("random" or "grid"), samples, step,
+    concentration, seed, and weights, a what-if mapping of category to weight such
+    as {"Security": 0.3}.
+    
+    Returns:
+        JSON with the baseline and what-if rankings, per-vendor rank stability and
+        the weights at which the winner changes per category
+    """
+    rfp = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+    if not rfp:
+        return jsonify({"error": "RFP not found"}), 404
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        result = analyze_sensitivity(
+            db.session,
+            rfp_id,
+            mode=data.get("mode", "random"),
+            samples=int(data["samples"]) if data.get("samples") else None,
+            step=float(data["step"]) if data.get("step") is not None else None,
+            concentration=float(data.get("concentration") or 0),
+            weights=data.get("weights") or None,
+            seed=data.get("seed")
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if result is None:
+        return jsonify({"error": "No bids of this RFP have been evaluated"}), 404
+    return jsonify(result)
+
+def get_multi_criteria_ranking(rfp_id):
+    """
+    Rank an RFP's bids on cost, compliance, security and risk together: the Pareto
+    frontier, dominance counts and TOPSIS ranks. Query parameters: criteria, a
+    comma-separated subset, and <criterion>_weight for TOPSIS weights.
+    
+    Returns:
+        JSON with the criteria used and skipped, the frontier and each bid's ranking
+    """
+    rfp = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+    if not rfp:
+        return jsonify({"error": "RFP not found"}), 404
+    
+    criteria = [name.strip() for name in request.args.get('criteria', '').split(',') if name.strip()] or None
+    weights = {
+        name: request.args.get(f'{name}_weight', type=float)
+        for name in CRITERIA
+        if request.args.get(f'{name}_weight') is not None
+    }
+    if any(value is None for value in weights.values()):
+        return jsonify({"error": "Criterion weights must be numbers"}), 400
+    
+    try:
+        return jsonify(rank_bids(db.session, rfp_id, criteria=criteria, weights=weights))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+def set_bid_cost(bid_id):
+    """
+    Set or clear (empty value) the proposed cost of a bid from the form field proposed_cost.
+    
+    Returns:
+        JSON with the bid's proposed cost
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    value = (request.form.get('proposed_cost') or '').strip()
+    try:
+        proposed_cost = float(value) if value else None
+    except ValueError:
+        return jsonify({"error": "Proposed cost must be a number"}), 400
+    if proposed_cost is not None and proposed_cost < 0:
+        return jsonify({"error": "Proposed cost must not be negative"}), 400
+    
+    bid.proposed_cost = proposed_cost
+    db.session.commit()
+    return jsonify({"bid_id": bid_id, "proposed_cost": proposed_cost})
+
+def search_rfp_facts(rfp_id):
+    """
+    Find an RFP's bids by their numeric claims, e.g. ?metric=uptime&min=99.95%.
+    Bounds may carry a unit and are compared in the metric's canonical unit.
+    
+    Returns:
+        JSON with each matching bid and its matching claims
+    """
+    rfp = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+    if not rfp:
+        return jsonify({"error": "RFP not found"}), 404
+    
+    metric = request.args.get('metric')
+    if not metric:
+        return jsonify({"error": "A metric is required"}), 400
+    try:
+        min_value = parse_fact_value(request.args.get('min'), metric)
+        max_value = parse_fact_value(request.args.get('max'), metric)
+    except ValueError:
+        return jsonify({"error": "Bounds must be numbers or quantities"}), 400
+    
+    bids = query_facts(
+        db.session,
+        metric,
+        rfp_id=rfp_id,
+        min_value=min_value,
+        max_value=max_value,
+        unit=request.args.get('unit')
+    )
+    return jsonify({
+        "rfp_id": rfp_id,
+        "metric": metric,
+        "min": min_value,
+        "max": max_value,
+        "bids": bids
+    })
+
+def get_bid_facts(bid_id):
+    """
+    Get the numeric claims extracted from a bid.
+    
+    Returns:
+        JSON with the bid's facts in text order
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    return jsonify({"bid_id": bid_id, "facts": list_bid_facts(db.session, bid_id)})
+
+def get_bid_control_mentions(bid_id):
+    """
+    Get where a bid cites security controls, security terms and certifications, with
+    offsets and pages for jumping to the evidence. Query parameters: control (e.g. AC-7,
+    also matching controls equivalent to it) and kind ("control", "keyword" or "framework").
+    Bids are indexed by their security assessment, or by /rfp/<id>/control-mentions/extract.
+    
+    Returns:
+        JSON with the bid's mentions in text order
+    """
+    bid = db.session.query(VendorBid).filter(VendorBid.id == bid_id).first()
+    if not bid:
+        return jsonify({"error": "Bid not found"}), 404
+    
+    mentions = list_control_mentions(
+        db.session, bid_id,
+        control_id=request.args.get('control', '').strip() or None,
+        kind=request.args.get('kind', '').strip() or None
+    )
+    return jsonify({"bid_id": bid_id, "mentions": mentions})
+
+def extract_rfp_facts(rfp_id):
+    """
+    Extract the numeric claims of all processed bids of an RFP, for bids evaluated
+    before fact extraction existed. Bids whose facts are current are skipped.
+    
+    Returns:
+        JSON with the number of facts stored per bid (-1 where already current)
+    """
+    rfp = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+    if not rfp:
+        return jsonify({"error": "RFP not found"}), 404
+    
+    bids = db.session.query(VendorBid).filter(VendorBid.rfp_id == rfp_id, VendorBid.is_processed == True).all()
+    extracted = {}
+    for bid in bids:
+        extracted[bid.id] = store_bid_facts(db.session, bid.id, extract_document_text(bid.file_path))
+    return jsonify({"rfp_id": rfp_id, "bids": extracted})
+
+def extract_rfp_control_mentions(rfp_id):
+    """
+    Index the control mentions of all processed bids of an RFP, for bids assessed
+    before mention indexing existed. Bids whose index is current are skipped.
+    
+    Returns:
+        JSON with the number of mentions stored per bid (-1 where already current)
+    """
+    rfp = db.session.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+    if not rfp:
+        return jsonify({"error": "RFP not found"}), 404
+    
+    bids = db.session.query(VendorBid).filter(VendorBid.rfp_id == rfp_id, VendorBid.is_processed == True).all()
+    indexed = {}
+    for bid in bids:
+        indexed[bid.id] = store_control_mentions(db.session, bid.id, extract_document_text(bid.file_path))
+    return jsonify({"rfp_id": rfp_id, "bids": indexed})
+
+def search_security_controls():
+    """
+    Search the security control catalog. Query parameters: q for keywords, family
+    (e.g. AC), framework (e.g. nist800_171) and limit; without q, lists the family.
+    
+    Returns:
+        JSON with the catalog version and matching controls
+    """
+    catalog = get_control_catalog()
+    query = request.args.get('q', '').strip()
+    family = request.args.get('family', '').strip() or None
+    framework_value = request.args.get('framework', '').strip() or None
+    try:
+        framework = SecurityFramework(framework_value) if framework_value else None
+    except ValueError:
+        return jsonify({"error": f"Unknown framework: {framework_value}"}), 400
+    limit = request.args.get('limit', 20, type=int)
+    
+    if query:
+        controls = catalog.search(query, family=family, framework=framework, limit=limit)
+    elif family:
+        controls = [control.to_dict() for control in catalog.family(family, framework)]
+    else:
+        return jsonify(catalog.stats())
+    return jsonify({"version": catalog.version, "controls": controls})
+
+def get_security_control(control_id):
+    """
+    Look up a control of the catalog by ID, e.g. AC-2, 3.5.3 or IA.L2-3.5.3.
+    
+    Returns:
+        JSON with the control, the controls it corresponds to and its mappings to other frameworks
+    """
+    catalog = get_control_catalog()
+    control = catalog.get(control_id)
+    if not control:
+        return jsonify({"error": "Control not found"}), 404
+    
+    crosswalk = get_control_crosswalk()
+    return jsonify({
+        **control.to_dict(),
+        "version": catalog.version,
+        "related_controls": [catalog.controls[related].to_dict() for related in control.related if related in catalog.controls],
+        "crosswalk": {"version": crosswalk.version, **crosswalk.mappings(control.framework, control_id)}
+    })
+
 # Create router for API endpoints
 router = Blueprint('api', __name__, url_prefix='/api')
 
@@ -659,6 +1327,31 @@ router.route('/security/assessment/<int:bid_id>', methods=['GET'])(security_asse
 router.route('/risk/assessment/<int:bid_id>', methods=['GET'])(get_bid_risks)
 router.route('/sentiment/analysis/<int:bid_id>', methods=['GET'])(get_bid_sentiment)
 router.route('/reports/infographic/<int:rfp_id>', methods=['GET'])(generate_infographic_report)
+router.route('/prompts/report', methods=['GET'])(get_prompt_report)
+router.route('/llm/scheduler', methods=['GET'])(get_llm_scheduler_status)
+router.route('/rfp/<int:rfp_id>/routing-report', methods=['GET'])(get_routing_report)
+router.route('/rfp/<int:rfp_id>/amendments', methods=['POST'])(upload_rfp_amendment)
+router.route('/library/stats', methods=['GET'])(get_requirement_library_stats)
+router.route('/bid/<int:bid_id>/evaluation', methods=['GET'])(get_evaluation_progress)
+router.route('/bid/<int:bid_id>/evaluation', methods=['POST'])(resume_evaluation)
+router.route('/bid/<int:bid_id>/analyses', methods=['GET'])(get_analysis_versions)
+router.route('/rfp/<int:rfp_id>/screening-policy', methods=['POST'])(set_screening_policy)
+router.route('/bid/<int:bid_id>/analyses/diff', methods=['GET'])(diff_analysis_versions)
+router.route('/rfp/<int:rfp_id>/evaluate-all', methods=['POST'])(evaluate_all_bids)
+router.route('/rfp/<int:rfp_id>/evaluate-all', methods=['GET'])(get_evaluate_all_progress)
+router.route('/bid/<int:bid_id>/score-overrides', methods=['GET'])(get_score_overrides)
+router.route('/bid/<int:bid_id>/score-overrides', methods=['POST'])(override_item_score)
+router.route('/bid/<int:bid_id>/score-overrides/<item_type>/<item_id>', methods=['DELETE'])(delete_score_override)
+router.route('/rfp/<int:rfp_id>/sensitivity', methods=['POST'])(get_award_sensitivity)
+router.route('/rfp/<int:rfp_id>/multi-criteria', methods=['GET'])(get_multi_criteria_ranking)
+router.route('/bid/<int:bid_id>/cost', methods=['POST'])(set_bid_cost)
+router.route('/rfp/<int:rfp_id>/facts', methods=['GET'])(search_rfp_facts)
+router.route('/rfp/<int:rfp_id>/facts/extract', methods=['POST'])(extract_rfp_facts)
+router.route('/bid/<int:bid_id>/facts', methods=['GET'])(get_bid_facts)
+router.route('/bid/<int:bid_id>/control-mentions', methods=['GET'])(get_bid_control_mentions)
+router.route('/rfp/<int:rfp_id>/control-mentions/extract', methods=['POST'])(extract_rfp_control_mentions)
+router.route('/controls', methods=['GET'])(search_security_controls)
+router.route('/controls/<path:control_id>', methods=['GET'])(get_security_control)
 
 # Register other API routes from main_bp to router
 router.route('/upload/rfp', methods=['POST'])(upload_rfp)
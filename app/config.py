@@ -29,6 +29,102 @@ class Settings:
     DEFAULT_MODEL = "llama-3.1-70b" if OPENAI_API_KEY == "" else "gpt-4"
     DOCUMENT_CHUNK_SIZE = 1000
     DOCUMENT_CHUNK_OVERLAP = 200
+    
+    # OpenAI models and tiered routing of compliance checks
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+    ROUTING_ENABLED = os.getenv("ROUTING_ENABLED", "true").lower() == "true"
+    ROUTING_CHEAP_MODEL = os.getenv("ROUTING_CHEAP_MODEL", "gpt-4o-mini")
+    ROUTING_AMBIGUOUS_BAND = (35, 75)  # Cheap-model scores in this band are re-checked
+    ROUTING_MIN_CONFIDENCE = 0.7
+    ROUTING_ESCALATE_PRIORITIES = ("Must-have",)  # Always evaluated by the expensive model
+    MODEL_PRICES = {  # USD per million (input, output) tokens
+        "gpt-4o": (2.50, 10.00),
+        "gpt-4o-mini": (0.15, 0.60),
+    }
+    
+    # LLM scheduling: concurrent provider calls, and slots only interactive calls may use
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+    LLM_INTERACTIVE_RESERVED = int(os.getenv("LLM_INTERACTIVE_RESERVED", 2))
+    
+    # Hierarchical summarisation of long documents
+    SUMMARY_CHUNK_SIZE = int(os.getenv("SUMMARY_CHUNK_SIZE", 4000))
+    SUMMARY_SECTION_FANOUT = int(os.getenv("SUMMARY_SECTION_FANOUT", 8))
+    SUMMARY_MAX_WORKERS = int(os.getenv("SUMMARY_MAX_WORKERS", 4))
+    
+    # Requirement-to-passage evidence matrix
+    EVIDENCE_PASSAGE_SIZE = 800
+    EVIDENCE_TOP_K = 3
+    EVIDENCE_MAX_CHARS = 5000
+    
+    # Rule-based requirement extraction; the LLM only classifies the candidates in batches
+    REQUIREMENT_RULES_ENABLED = os.getenv("REQUIREMENT_RULES_ENABLED", "true").lower() == "true"
+    REQUIREMENT_CLASSIFY_BATCH = 40
+    
+    # Decide numeric technical specifications locally when the bid states comparable values
+    SPEC_NUMERIC_CHECK_ENABLED = os.getenv("SPEC_NUMERIC_CHECK_ENABLED", "true").lower() == "true"
+    
+    # Screening of Must-have requirements and mandatory specs before full evaluation.
+    # Policy for bids that fail it, unless the RFP sets its own: "continue" evaluates them fully,
+    # "defer" evaluates compliance but defers strengths/weaknesses, gap analysis and security, "skip" stops
+    SCREENING_ENABLED = os.getenv("SCREENING_ENABLED", "true").lower() == "true"
+    SCREENING_POLICY = os.getenv("SCREENING_POLICY", "continue")
+    SCREENING_BATCH_SIZE = 25
+    SCREENING_EVIDENCE_CHARS = 1200
+    
+    # Bid scoring weights per requirement/spec category, requirement priority and mandatory spec;
+    # unlisted categories and priorities weigh 1, so the defaults give a plain mean.
+    # Mandatory specs averaging below the threshold reduce the total proportionally
+    SCORING_CATEGORY_WEIGHTS = {}
+    SCORING_PRIORITY_WEIGHTS = {"Must-have": 1.0, "Should-have": 1.0, "Nice-to-have": 1.0}
+    SCORING_MANDATORY_WEIGHT = 1.0
+    SCORING_MANDATORY_THRESHOLD = 50
+    
+    # Award sensitivity analysis: random weightings sampled by default, the cap on sampled
+    # or grid weightings per request, and the default grid step
+    SENSITIVITY_SAMPLES = int(os.getenv("SENSITIVITY_SAMPLES", "5000"))
+    SENSITIVITY_MAX_SAMPLES = int(os.getenv("SENSITIVITY_MAX_SAMPLES", "50000"))
+    SENSITIVITY_GRID_STEP = 0.1
+    
+    # Multi-criteria bid ranking: TOPSIS weight per criterion, and rankings cached in memory
+    MCDA_WEIGHTS = {"cost": 1.0, "compliance": 1.0, "security": 1.0, "risk": 1.0}
+    MCDA_CACHE_SIZE = 64
+    
+    # Bundled security-control catalog, indexed in memory at startup
+    SECURITY_CONTROL_CATALOG = os.getenv("SECURITY_CONTROL_CATALOG", str(BASE_DIR / "app" / "data" / "security_controls.json"))
+    
+    # Security assessment: controls of a family are assessed together, in calls of at most
+    # this many controls sharing this many characters of bid passages
+    SECURITY_FAMILY_BATCH_SIZE = 40
+    SECURITY_FAMILY_EVIDENCE_CHARS = 8000
+    
+    # Cross-framework control mapping: each class of equivalent controls is assessed once per bid,
+    # and a control overlapping an assessed one at least this much takes its result at reduced confidence
+    SECURITY_CONTROL_CROSSWALK = os.getenv("SECURITY_CONTROL_CROSSWALK", str(BASE_DIR / "app" / "data" / "control_crosswalk.json"))
+    CROSSWALK_ENABLED = os.getenv("CROSSWALK_ENABLED", "true").lower() == "true"
+    CROSSWALK_PARTIAL_MIN_OVERLAP = 0.8
+    
+    # Bid passages citing a control (found by the control mention index) put ahead of its evidence
+    CONTROL_MENTION_EVIDENCE_PASSAGES = 2
+    
+    # Evaluation stages that may run at once
+    EVALUATION_PIPELINE_WORKERS = int(os.getenv("EVALUATION_PIPELINE_WORKERS", "4"))
+    
+    # Bids an evaluate-all job evaluates at once; their LLM calls share the scheduler's budget
+    EVALUATE_ALL_WORKERS = int(os.getenv("EVALUATE_ALL_WORKERS", "4"))
+    
+    # Analysis versions kept per bid; the current version is never pruned
+    ANALYSIS_RETENTION_VERSIONS = int(os.getenv("ANALYSIS_RETENTION_VERSIONS", "5"))
+    
+    # A running evaluation without progress for this long is presumed dead and may be resumed
+    EVALUATION_RUN_STALE_SECONDS = int(os.getenv("EVALUATION_RUN_STALE_SECONDS", "600"))
+    
+    # Reuse a vendor's compliance results for identical requirements and evidence across RFPs
+    REQUIREMENT_LIBRARY_REUSE_ENABLED = os.getenv("REQUIREMENT_LIBRARY_REUSE_ENABLED", "true").lower() == "true"
+    
+    # Near-duplicate collapsing of extracted requirements (MinHash LSH)
+    DEDUP_MIN_SIMILARITY = 0.8  # Jaccard similarity of word sets
+    DEDUP_LSH_BANDS = 16
+    DEDUP_LSH_ROWS = 4
 
 settings = Settings()
 
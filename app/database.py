@@ -1,9 +1,15 @@
 import os
+import logging
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Index, UniqueConstraint, inspect
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
+# Configure logging
+logger = logging.getLogger(__name__)
+
 # Create a Base class
 class Base(DeclarativeBase):
     pass
@@ -23,6 +29,60 @@ def init_db():
     # Import human review models
     from app.models import review
     
+    # Import derived-analysis cache models
+    from app.models import analysis
+    
+    # Import cross-RFP requirement library models
+    from app.models import library
+    
+    # Import evaluation run checkpoint models
+    from app.models import evaluation
+    
     # In a Flask application context (will be done when app is created)
     if db.engine is not None:
         Base.metadata.create_all(bind=db.engine)
+        upgrade_schema(db.engine)
+
+def upgrade_schema(engine):
+    """
+    Bring tables created by an earlier version up to the models.
+    
+    create_all only creates missing tables, so columns added to existing tables
+    are added here, as nullable columns, and missing unique constraints and indexes
+    are created as indexes; ON CONFLICT upserts need the unique ones. Safe to run
+    on every start: anything already present is left alone.
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}")
+                logger.info(f"Added column {table.name}.{column.name}")
+            
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            indexes.update(constraint["name"] for constraint in inspector.get_unique_constraints(table.name))
+            for constraint in list(table.constraints) + list(table.indexes):
+                if not isinstance(constraint, (UniqueConstraint, Index)) or not constraint.name or not constraint.columns:
+                    continue
+                if constraint.name in indexes:
+                    continue
+                unique = "UNIQUE " if isinstance(constraint, UniqueConstraint) or constraint.unique else ""
+                column_list = ", ".join(quote(column.name) for column in constraint.columns)
+                try:
+                    with connection.begin_nested():
+                        connection.exec_driver_sql(
+                            f"CREATE {unique}INDEX {quote(constraint.name)} ON {quote(table.name)} ({column_list})"
+                        )
+                    logger.info(f"Created index {constraint.name} on {table.name}")
+                except Exception as e:
+                    # E.g. duplicate rows under a new unique constraint; they need cleaning up by hand
+                    logger.error(f"Could not create index {constraint.name} on {table.name}: {str(e)}")
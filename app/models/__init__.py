@@ -1,3 +1,6 @@
 # Import models for registration with SQLAlchemy
 from app.models.document import RFPDocument, VendorBid, AnalysisResult, Requirement, TechnicalSpecification
 from app.models.government import GovernmentAgency, SecurityRequirement, BidSecurityCompliance, GovernmentType, SecurityFramework, ComplianceLevel
+from app.models.analysis import SummaryNode, EvidenceMatrix, EvidenceLink, BidFact, ControlMention
+from app.models.library import CanonicalRequirement, CanonicalComplianceResult
+from app.models.evaluation import EvaluationRun, EvaluationCheckpoint
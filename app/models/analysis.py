@@ -0,0 +1,135 @@
+"""
+Derived-analysis models for the UniSphere application.
+This module contains database models for intermediate results that are computed
+from document text and cached so they can be reused across evaluations.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Index, JSON
+from sqlalchemy.orm import relationship
+
+from app.database import db
+
+
+class SummaryNode(db.Model):
+    """
+    A node of a hierarchical document summary tree.
+
+    Nodes are content-addressed: a chunk node is keyed by the hash of its text and
+    a section or document node by the hashes of its children, so editing one page
+    only invalidates the nodes above that page.
+    """
+    __tablename__ = "summary_nodes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)
+    level = Column(String(20), nullable=False)  # "chunk", "section" or "document"
+    summary = Column(Text, nullable=False)
+    child_hashes = Column(JSON)  # Ordered hashes of the child nodes (empty for chunks)
+    source_chars = Column(Integer)  # Length of the text this node covers
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class EvidenceMatrix(db.Model):
+    """
+    Precomputed relevance of every RFP item to every passage of a vendor bid.
+
+    Only the top-k passages per item are persisted (as EvidenceLink rows). The
+    hashes record what the matrix was computed from, so it is rebuilt only when
+    the bid text or the set of requirements, specs and security controls changes.
+    """
+    __tablename__ = "evidence_matrices"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bid_id = Column(Integer, ForeignKey("vendor_bids.id", ondelete="CASCADE"), unique=True, index=True)
+    bid_text_hash = Column(String(64), nullable=False)
+    items_hash = Column(String(64), nullable=False)
+    passage_count = Column(Integer)
+    item_count = Column(Integer)
+    top_k = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    links = relationship("EvidenceLink", back_populates="matrix", cascade="all, delete-orphan")
+
+
+class EvidenceLink(db.Model):
+    """One of the top-k bid passages for a requirement, spec or security control."""
+    __tablename__ = "evidence_links"
+    __table_args__ = (
+        Index("ix_evidence_links_bid_item", "bid_id", "item_type", "item_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    matrix_id = Column(Integer, ForeignKey("evidence_matrices.id", ondelete="CASCADE"), index=True)
+    bid_id = Column(Integer, ForeignKey("vendor_bids.id", ondelete="CASCADE"))
+    item_type = Column(String(20), nullable=False)  # "requirement", "tech_spec" or "security"
+    item_id = Column(Integer, nullable=False)
+    rank = Column(Integer, nullable=False)  # 0 is the most relevant passage
+    score = Column(Float)  # BM25 relevance of the passage to the item
+    passage_index = Column(Integer)
+    passage_start = Column(Integer)  # Character offsets in the extracted bid text
+    passage_end = Column(Integer)
+    passage_text = Column(Text)
+
+    # Relationships
+    matrix = relationship("EvidenceMatrix", back_populates="links")
+
+
+class BidFact(db.Model):
+    """
+    A numeric claim stated in a vendor bid, such as an uptime SLA, a throughput,
+    a price or a staffing level, in canonical units.
+
+    Facts are extracted locally from the bid text; source_hash records the text and
+    extractor version they came from, so they are re-extracted only when either changes.
+    """
+    __tablename__ = "bid_facts"
+    __table_args__ = (
+        Index("ix_bid_facts_bid_metric", "bid_id", "metric"),
+        Index("ix_bid_facts_metric_value", "metric", "value"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bid_id = Column(Integer, ForeignKey("vendor_bids.id", ondelete="CASCADE"), nullable=False)
+    metric = Column(String(50), nullable=False)  # e.g. "uptime", "throughput", "price", "staffing"
+    dimension = Column(String(20), nullable=False)  # e.g. "percentage", "bandwidth", "currency"
+    value = Column(Float, nullable=False)  # In the canonical unit of the dimension
+    unit = Column(String(20), nullable=False)
+    text = Column(String(255))  # The claim as written
+    context = Column(Text)  # The sentence around the claim
+    char_start = Column(Integer)  # Character offsets of the claim in the extracted bid text
+    char_end = Column(Integer)
+    page = Column(Integer, nullable=True)  # 1-based; None when the text has no page breaks
+    source_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ControlMention(db.Model):
+    """
+    A place where a vendor bid cites a security control, a security term or a
+    framework certification, such as "AC-2", "MFA" or "SOC 2 Type II".
+
+    Mentions are found locally in one pass over the bid text; a term evidencing
+    several controls has one row per control. source_hash records the text and
+    scanner version they came from, as for BidFact.
+    """
+    __tablename__ = "control_mentions"
+    __table_args__ = (
+        Index("ix_control_mentions_bid_control", "bid_id", "control_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bid_id = Column(Integer, ForeignKey("vendor_bids.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(20), nullable=False)  # "control", "keyword" or "framework"
+    term = Column(String(100), nullable=False)  # Canonical control ID or phrase matched
+    control_id = Column(String(100), nullable=True)  # Catalog control evidenced, e.g. "AC-2(1)"
+    framework = Column(String(20), nullable=True)  # SecurityFramework value of the control or certification
+    text = Column(String(255))  # The mention as written
+    context = Column(Text)  # The sentence around the mention
+    char_start = Column(Integer)  # Character offsets of the mention in the extracted bid text
+    char_end = Column(Integer)
+    page = Column(Integer, nullable=True)  # 1-based; None when the text has no page breaks
+    source_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,8 @@
 from datetime import datetime
 import enum
+import uuid
 from typing import List
-from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, Float, Boolean, Enum, JSON
+from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, Float, Boolean, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 
 from app.database import db
@@ -27,8 +28,15 @@ class RFPDocument(db.Model):
     size_bytes = db.Column(Integer)
     is_processed = db.Column(Boolean, default=False)
     processing_errors = db.Column(Text, nullable=True)
+    predecessor_id = db.Column(Integer, ForeignKey("rfp_documents.id"), nullable=True)  # RFP this amendment supersedes
+    amendment_number = db.Column(Integer, default=0)
+    section_digests = db.Column(JSON, nullable=True)  # Dict mapping section keys to content hashes
+    amendment_summary = db.Column(JSON, nullable=True)  # Section diff and carry-over counts against the predecessor
+    extraction_stats = db.Column(JSON, nullable=True)  # Extracted and collapsed item counts of the last analysis
+    screening_policy = db.Column(String(20), nullable=True)  # "continue", "defer" or "skip"; None uses settings.SCREENING_POLICY
     
     # Relationships
+    predecessor = db.relationship("RFPDocument", remote_side=[id], backref="amendments")
     requirements = db.relationship("Requirement", back_populates="rfp_document", cascade="all, delete")
     tech_specs = db.relationship("TechnicalSpecification", back_populates="rfp_document", cascade="all, delete")
     vendor_bids = db.relationship("VendorBid", back_populates="rfp_document", cascade="all, delete")
@@ -43,6 +51,11 @@ class Requirement(db.Model):
     description = db.Column(Text, nullable=False)
     priority = db.Column(String(50))  # E.g., Must-have, Should-have, Nice-to-have
     section = db.Column(String(255))  # Section in the RFP document
+    stable_id = db.Column(String(32), index=True, default=lambda: uuid.uuid4().hex)  # Kept across amendments while unchanged
+    section_key = db.Column(String(255), nullable=True)  # Key of the segmented section it was extracted from
+    source_start = db.Column(Integer, nullable=True)  # Character offsets of the requirement in the RFP text
+    source_end = db.Column(Integer, nullable=True)
+    canonical_id = db.Column(Integer, ForeignKey("canonical_requirements.id", ondelete="SET NULL"), nullable=True, index=True)
     
     # Relationships
     rfp_document = db.relationship("RFPDocument", back_populates="requirements")
@@ -59,6 +72,12 @@ class TechnicalSpecification(db.Model):
     min_value = db.Column(String(50), nullable=True)
     max_value = db.Column(String(50), nullable=True)
     is_mandatory = db.Column(Boolean, default=True)
+    min_numeric = db.Column(Float, nullable=True)  # min_value in canonical_unit
+    max_numeric = db.Column(Float, nullable=True)  # max_value in canonical_unit
+    canonical_unit = db.Column(String(20), nullable=True)  # E.g., Mbps, ms, %, GB, W
+    dimension = db.Column(String(20), nullable=True)  # E.g., bandwidth, time, percentage, storage, power
+    stable_id = db.Column(String(32), index=True, default=lambda: uuid.uuid4().hex)  # Kept across amendments while unchanged
+    section_key = db.Column(String(255), nullable=True)  # Key of the segmented section it was extracted from
     
     # Relationships
     rfp_document = db.relationship("RFPDocument", back_populates="tech_specs")
@@ -77,14 +96,30 @@ class VendorBid(db.Model):
     is_processed = db.Column(Boolean, default=False)
     processing_errors = db.Column(Text, nullable=True)
     total_score = db.Column(Float, nullable=True)
+    proposed_cost = db.Column(Float, nullable=True)  # Total price the vendor proposes
+    risk_score = db.Column(Float, nullable=True)  # 0-100 from the latest risk prediction, higher is riskier
+    screening_status = db.Column(String(20), nullable=True)  # "passed" or "failed"; None until screened
+    screening_result = db.Column(JSON, nullable=True)  # Per-criterion verdicts of the mandatory screening
+    # Latest completed analysis; older versions are kept in analysis_results
+    current_analysis_id = db.Column(
+        Integer,
+        ForeignKey("analysis_results.id", ondelete="SET NULL", use_alter=True, name="fk_vendor_bids_current_analysis"),
+        nullable=True
+    )
     
     # Relationships
     rfp_document = db.relationship("RFPDocument", back_populates="vendor_bids")
-    analysis_results = db.relationship("AnalysisResult", back_populates="vendor_bid", cascade="all, delete")
+    analysis_results = db.relationship(
+        "AnalysisResult", back_populates="vendor_bid", cascade="all, delete", foreign_keys="AnalysisResult.bid_id"
+    )
+    current_analysis = db.relationship("AnalysisResult", foreign_keys=[current_analysis_id], post_update=True)
     security_compliance = db.relationship("BidSecurityCompliance", back_populates="vendor_bid", cascade="all, delete")
 
 class AnalysisResult(db.Model):
     __tablename__ = "analysis_results"
+    __table_args__ = (
+        Index("ix_analysis_results_bid_run", "bid_id", "run_number", unique=True),
+    )
     
     id = db.Column(Integer, primary_key=True, index=True)
     bid_id = db.Column(Integer, ForeignKey("vendor_bids.id", ondelete="CASCADE"))
@@ -95,6 +130,10 @@ class AnalysisResult(db.Model):
     weaknesses = db.Column(JSON)  # List of weaknesses identified
     gap_analysis = db.Column(JSON)  # List of identified gaps
     overall_score = db.Column(Float)
+    run_number = db.Column(Integer)  # 1 for a bid's first evaluation, incremented by each re-evaluation
+    model_version = db.Column(String(100))  # Model that produced the results, "simulated" without an API key
+    prompt_version = db.Column(String(20))  # Combined prompt version, see get_prompt_version
+    score_overrides = db.Column(JSON)  # Reviewer overrides the overall score was computed with
     
     # Relationships
-    vendor_bid = db.relationship("VendorBid", back_populates="analysis_results")
+    vendor_bid = db.relationship("VendorBid", back_populates="analysis_results", foreign_keys=[bid_id])
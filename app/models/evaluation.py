@@ -0,0 +1,56 @@
+"""
+Evaluation run models for the UniSphere application.
+This module contains database models for tracking bid evaluations while they run,
+so each finished requirement, specification and stage is kept even if the
+evaluation is interrupted, and a retry resumes where it stopped.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from app.database import db
+
+
+class EvaluationRun(db.Model):
+    """One attempt at evaluating a bid, resumed by retries until it completes."""
+    __tablename__ = "evaluation_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bid_id = Column(Integer, ForeignKey("vendor_bids.id", ondelete="CASCADE"), nullable=False, index=True)
+    analysis_id = Column(Integer, ForeignKey("analysis_results.id", ondelete="SET NULL"), nullable=True)
+    status = Column(String(20), nullable=False, default="running")  # "running", "completed", "failed"
+    total_items = Column(Integer, default=0)  # Requirements and specs to evaluate
+    attempts = Column(Integer, default=1)
+    error = Column(Text)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    checkpoints = relationship("EvaluationCheckpoint", back_populates="run", cascade="all, delete-orphan")
+
+
+class EvaluationCheckpoint(db.Model):
+    """
+    A finished piece of an evaluation run.
+
+    Items are requirement and technical specification results (item_type
+    "requirement" or "tech_spec", keyed by their ID) and whole-stage results
+    (item_type "stage", keyed by the stage name).
+    """
+    __tablename__ = "evaluation_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("run_id", "item_type", "item_id", name="uq_evaluation_checkpoint_item"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("evaluation_runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    item_type = Column(String(20), nullable=False)
+    item_id = Column(String(64), nullable=False)
+    result = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    run = relationship("EvaluationRun", back_populates="checkpoints")
@@ -8,7 +8,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Dict
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, JSON, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, JSON, UniqueConstraint, Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship
 
 from app.database import db
@@ -76,11 +76,18 @@ class SecurityRequirement(db.Model):
     
     # Relationships
     agency = relationship("GovernmentAgency", back_populates="security_requirements")
-    bid_compliance = relationship("BidSecurityCompliance", back_populates="security_requirement")
+    bid_compliance = relationship(
+        "BidSecurityCompliance", back_populates="security_requirement",
+        foreign_keys="BidSecurityCompliance.requirement_id"
+    )
 
 class BidSecurityCompliance(db.Model):
     """Model for tracking how vendor bids comply with security requirements."""
     __tablename__ = "bid_security_compliance"
+    __table_args__ = (
+        # Natural key used for bulk upserts of assessment results
+        UniqueConstraint("bid_id", "requirement_id", name="uq_bid_security_compliance_requirement"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     bid_id = Column(Integer, ForeignKey("vendor_bids.id", ondelete="CASCADE"))
@@ -88,10 +95,14 @@ class BidSecurityCompliance(db.Model):
     compliance_score = Column(Float)  # 0-100
     compliance_notes = Column(Text)
     is_compliant = Column(Boolean, default=False)
-    verification_status = Column(String(50))  # "pending", "verified", "non-compliant"
+    verification_status = Column(String(50))  # "pending", "verified", "non-compliant", "error"
+    confidence = Column(Float, nullable=True)  # 0-1, lower for results taken from a partially overlapping control
+    # Requirement whose assessment this result was taken from, through the control crosswalk
+    source_requirement_id = Column(Integer, ForeignKey("security_requirements.id"), nullable=True)
+    mapping = Column(String(20), nullable=True)  # "equivalent", "partial"; None when assessed directly
     
     # Relationships
-    security_requirement = relationship("SecurityRequirement", back_populates="bid_compliance")
+    security_requirement = relationship("SecurityRequirement", back_populates="bid_compliance", foreign_keys=[requirement_id])
     vendor_bid = relationship("VendorBid", back_populates="security_compliance")
 
 # Add relationships to VendorBid model in document.py
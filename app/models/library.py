@@ -0,0 +1,60 @@
+"""
+Requirement library models for the UniSphere application.
+This module contains database models for requirements shared across RFPs and for
+compliance results that can be reused when the same vendor answers the same
+requirement with the same evidence again.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from app.database import db
+
+
+class CanonicalRequirement(db.Model):
+    """
+    A requirement text shared by every RFP that states it.
+
+    Requirements are keyed by the hash of their normalised description, so the same
+    boilerplate ("FIPS 140-2 validated encryption") in different RFPs links to one row.
+    """
+    __tablename__ = "canonical_requirements"
+
+    id = Column(Integer, primary_key=True, index=True)
+    text_hash = Column(String(64), nullable=False, unique=True, index=True)
+    normalized_text = Column(Text, nullable=False)
+    category = Column(String(100))  # Category of the first requirement linked to it
+    first_rfp_id = Column(Integer, ForeignKey("rfp_documents.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    compliance_results = relationship("CanonicalComplianceResult", back_populates="canonical_requirement", cascade="all, delete-orphan")
+
+
+class CanonicalComplianceResult(db.Model):
+    """
+    A compliance result of one vendor against a canonical requirement.
+
+    The evidence hash covers the bid passages the result was based on and the prompt
+    that produced it, so a result is only reused for an identical evaluation.
+    """
+    __tablename__ = "canonical_compliance_results"
+    __table_args__ = (
+        UniqueConstraint("canonical_id", "vendor_key", "evidence_hash", name="uq_canonical_compliance_evaluation"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    canonical_id = Column(Integer, ForeignKey("canonical_requirements.id", ondelete="CASCADE"), nullable=False, index=True)
+    vendor_key = Column(String(255), nullable=False)  # Normalised vendor name
+    evidence_hash = Column(String(64), nullable=False)
+    result = Column(JSON, nullable=False)  # Compliance result as returned by the evaluator
+    source_bid_id = Column(Integer, ForeignKey("vendor_bids.id", ondelete="SET NULL"), nullable=True)
+    source_requirement_id = Column(Integer, ForeignKey("requirements.id", ondelete="SET NULL"), nullable=True)
+    source_rfp_id = Column(Integer, ForeignKey("rfp_documents.id", ondelete="SET NULL"), nullable=True)
+    reuse_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    canonical_requirement = relationship("CanonicalRequirement", back_populates="compliance_results")
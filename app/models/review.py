@@ -5,7 +5,7 @@ providing accountability and oversight for automated decisions.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import relationship
 import enum
@@ -75,6 +75,30 @@ class HumanReview(db.Model):
     vendor_bid = relationship("VendorBid", back_populates="human_reviews")
 
 
+class ScoreOverride(db.Model):
+    """
+    A reviewer's score for one requirement or technical specification of a bid.
+
+    Overrides are applied on top of the stored compliance results whenever the bid
+    is scored, so they survive re-evaluation; the model's own results are kept as-is.
+    """
+    __tablename__ = "score_overrides"
+    __table_args__ = (
+        UniqueConstraint("bid_id", "item_type", "item_id", name="uq_score_override_item"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bid_id = Column(Integer, ForeignKey("vendor_bids.id", ondelete="CASCADE"), nullable=False, index=True)
+    item_type = Column(String(20), nullable=False)  # "requirement" or "tech_spec"
+    item_id = Column(String(64), nullable=False)
+    score = Column(Float, nullable=False)
+    explanation = Column(Text, nullable=True)
+    review_id = Column(Integer, ForeignKey("human_reviews.id", ondelete="SET NULL"), nullable=True)
+    created_by = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # Add relationships to existing models
 from app.models.document import RFPDocument, VendorBid
 
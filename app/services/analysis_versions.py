@@ -0,0 +1,252 @@
+"""
+Analysis version service for the UniSphere application.
+Every evaluation of a bid produces a numbered AnalysisResult version. The bid points
+at its latest completed version, which is what reports and the API read; older
+versions are kept up to a retention limit and can be compared with each other.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.document import VendorBid, AnalysisResult
+from app.models.evaluation import EvaluationRun
+from app.utils.prompt_templates import get_prompt_version
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def current_analysis(db: Session, bid: VendorBid) -> Optional[AnalysisResult]:
+    """
+    The bid's current analysis.
+
+    Args:
+        db: Database session
+        bid: Vendor bid
+
+    Returns:
+        The analysis the bid points at; for bids evaluated before versioning, their latest analysis
+    """
+    if bid.current_analysis_id:
+        return db.get(AnalysisResult, bid.current_analysis_id)
+    return (
+        db.query(AnalysisResult)
+        .filter(AnalysisResult.bid_id == bid.id)
+        .order_by(AnalysisResult.id.desc())
+        .first()
+    )
+
+
+def current_analyses(db: Session, bids: List[VendorBid]) -> Dict[int, AnalysisResult]:
+    """
+    Current analyses of several bids with one query per kind of bid.
+
+    Returns:
+        Mapping of bid ID to its current analysis; bids without one are left out
+    """
+    analyses = {}
+    pointers = {bid.current_analysis_id: bid.id for bid in bids if bid.current_analysis_id}
+    if pointers:
+        for analysis in db.query(AnalysisResult).filter(AnalysisResult.id.in_(list(pointers))).all():
+            analyses[pointers[analysis.id]] = analysis
+
+    legacy = [bid.id for bid in bids if not bid.current_analysis_id]
+    if legacy:
+        latest_ids = (
+            db.query(func.max(AnalysisResult.id))
+            .filter(AnalysisResult.bid_id.in_(legacy))
+            .group_by(AnalysisResult.bid_id)
+        )
+        for analysis in db.query(AnalysisResult).filter(AnalysisResult.id.in_(latest_ids)).all():
+            analyses[analysis.bid_id] = analysis
+    return analyses
+
+
+def new_analysis(db: Session, bid_id: int, use_openai: bool) -> AnalysisResult:
+    """
+    Add the next numbered analysis version of a bid; the caller flushes and commits.
+
+    Args:
+        db: Database session
+        bid_id: ID of the bid
+        use_openai: Whether the evaluation calls OpenAI, for the recorded model version
+
+    Returns:
+        The new, still empty, analysis
+    """
+    last_run = db.query(func.max(AnalysisResult.run_number)).filter(AnalysisResult.bid_id == bid_id).scalar() or 0
+    if not use_openai:
+        model_version = "simulated"
+    elif settings.ROUTING_ENABLED:
+        model_version = f"{settings.ROUTING_CHEAP_MODEL}+{settings.OPENAI_MODEL}"
+    else:
+        model_version = settings.OPENAI_MODEL
+
+    analysis = AnalysisResult(
+        bid_id=bid_id,
+        run_number=last_run + 1,
+        model_version=model_version[:100],
+        prompt_version=get_prompt_version()
+    )
+    db.add(analysis)
+    return analysis
+
+
+def publish_analysis(db: Session, bid: VendorBid, analysis: AnalysisResult) -> int:
+    """
+    Make a completed analysis the bid's current one and prune old versions.
+
+    Args:
+        db: Database session
+        bid: Vendor bid
+        analysis: The completed analysis
+
+    Returns:
+        Number of versions pruned
+    """
+    bid.current_analysis_id = analysis.id
+    db.flush()
+    return prune_analysis_versions(db, bid.id)
+
+
+def prune_analysis_versions(db: Session, bid_id: int, keep: Optional[int] = None) -> int:
+    """
+    Delete all but the newest versions of a bid's analysis.
+
+    The current version and versions still being filled by an unfinished evaluation
+    run are always kept. The caller commits.
+
+    Args:
+        db: Database session
+        bid_id: ID of the bid
+        keep: Number of versions to keep; defaults to settings.ANALYSIS_RETENTION_VERSIONS
+
+    Returns:
+        Number of versions deleted
+    """
+    keep = settings.ANALYSIS_RETENTION_VERSIONS if keep is None else keep
+    if keep < 1:
+        return 0
+
+    ids = [
+        analysis_id for (analysis_id,) in
+        db.query(AnalysisResult.id)
+        .filter(AnalysisResult.bid_id == bid_id)
+        .order_by(AnalysisResult.run_number.desc().nullslast(), AnalysisResult.id.desc())
+    ]
+    protected = {
+        analysis_id for (analysis_id,) in
+        db.query(VendorBid.current_analysis_id).filter(VendorBid.id == bid_id)
+    }
+    protected |= {
+        analysis_id for (analysis_id,) in
+        db.query(EvaluationRun.analysis_id).filter(EvaluationRun.bid_id == bid_id, EvaluationRun.status != "completed")
+    }
+    stale = [analysis_id for analysis_id in ids[keep:] if analysis_id not in protected]
+    if not stale:
+        return 0
+
+    # Clear references explicitly, since not every database enforces ON DELETE SET NULL
+    db.query(EvaluationRun).filter(EvaluationRun.analysis_id.in_(stale)).update(
+        {EvaluationRun.analysis_id: None}, synchronize_session=False
+    )
+    deleted = db.query(AnalysisResult).filter(AnalysisResult.id.in_(stale)).delete(synchronize_session=False)
+    logger.info(f"Pruned {deleted} old analysis versions of bid {bid_id}")
+    return deleted
+
+
+def list_versions(db: Session, bid: VendorBid) -> List[Dict[str, Any]]:
+    """
+    Summary of every stored analysis version of a bid, newest first.
+    """
+    current = current_analysis(db, bid)
+    analyses = (
+        db.query(AnalysisResult)
+        .filter(AnalysisResult.bid_id == bid.id)
+        .order_by(AnalysisResult.run_number.desc().nullslast(), AnalysisResult.id.desc())
+        .all()
+    )
+    return [
+        {
+            "id": analysis.id,
+            "run_number": analysis.run_number,
+            "analysis_date": analysis.analysis_date.isoformat() if analysis.analysis_date else None,
+            "overall_score": analysis.overall_score,
+            "model_version": analysis.model_version,
+            "prompt_version": analysis.prompt_version,
+            "is_current": current is not None and analysis.id == current.id
+        }
+        for analysis in analyses
+    ]
+
+
+def _diff_results(old: Dict[str, Dict], new: Dict[str, Dict]) -> Dict[str, Any]:
+    """Score changes between two mappings of item ID to compliance result."""
+    old, new = old or {}, new or {}
+    changed = []
+    for item_id in sorted(set(old) & set(new), key=str):
+        old_score = (old[item_id] or {}).get("score", 0)
+        new_score = (new[item_id] or {}).get("score", 0)
+        if old_score != new_score:
+            changed.append({
+                "id": item_id,
+                "old_score": old_score,
+                "new_score": new_score,
+                "delta": new_score - old_score,
+                "explanation": (new[item_id] or {}).get("explanation")
+            })
+    changed.sort(key=lambda item: -abs(item["delta"]))
+    return {
+        "changed": changed,
+        "added": sorted(set(new) - set(old), key=str),
+        "removed": sorted(set(old) - set(new), key=str),
+        "unchanged": len(set(old) & set(new)) - len(changed)
+    }
+
+
+def _diff_list(old: Optional[List], new: Optional[List]) -> Dict[str, List]:
+    """Entries added to and removed from a list of strengths, weaknesses or gaps."""
+    old, new = old or [], new or []
+    return {
+        "added": [item for item in new if item not in old],
+        "removed": [item for item in old if item not in new]
+    }
+
+
+def diff_analyses(old: AnalysisResult, new: AnalysisResult) -> Dict[str, Any]:
+    """
+    Compare two analysis versions of a bid.
+
+    Args:
+        old: The earlier version
+        new: The later version
+
+    Returns:
+        Score delta, per-requirement and per-spec score changes, and strengths,
+        weaknesses and gaps added or removed
+    """
+    def version(analysis: AnalysisResult) -> Dict[str, Any]:
+        return {
+            "id": analysis.id,
+            "run_number": analysis.run_number,
+            "overall_score": analysis.overall_score,
+            "model_version": analysis.model_version,
+            "prompt_version": analysis.prompt_version
+        }
+
+    return {
+        "from": version(old),
+        "to": version(new),
+        "score_delta": (new.overall_score or 0) - (old.overall_score or 0),
+        "model_changed": old.model_version != new.model_version,
+        "prompts_changed": old.prompt_version != new.prompt_version,
+        "requirements": _diff_results(old.requirement_compliance, new.requirement_compliance),
+        "tech_specs": _diff_results(old.technical_compliance, new.technical_compliance),
+        "strengths": _diff_list(old.strengths, new.strengths),
+        "weaknesses": _diff_list(old.weaknesses, new.weaknesses),
+        "gap_analysis": _diff_list(old.gap_analysis, new.gap_analysis)
+    }
@@ -1,8 +1,9 @@
 import logging
 import json
 import os
-from typing import List, Dict, Any
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.models.document import VendorBid, RFPDocument, Requirement, TechnicalSpecification, AnalysisResult
 from app.utils.pdf_utils import extract_text_from_pdf, extract_text_from_docx, extract_text_from_txt
@@ -11,34 +12,150 @@ from app.utils.openai_utils import (
     evaluate_requirement_compliance, 
     evaluate_technical_compliance,
     identify_strengths_weaknesses,
-    perform_gap_analysis
+    perform_gap_analysis,
+    technical_prompt_fields
 )
+from app.utils.prompt_templates import render_prompt
+from app.utils.model_router import summarize_routing
+from app.utils.pipeline import Pipeline, Stage
 from app.services.security_assessor import assess_security_compliance
+from app.services.summarizer import get_document_digest
+from app.services.evidence_matrix import build_evidence_matrix, collect_rfp_items, evidence_text, evidence_digest
+from app.services.spec_checker import check_numeric_spec
+from app.services.scoring import apply_overrides, load_overrides, score_bid
+from app.services.bid_facts import store_bid_facts
+from app.services.analysis_versions import current_analysis, new_analysis, publish_analysis
+from app.services.bid_screening import (
+    FAILED as SCREENING_FAILED,
+    DEFERRED_STAGES,
+    mandatory_items,
+    screening_fingerprint,
+    screen_bid
+)
+from app.services.requirement_library import find_reusable_results, record_results
+from app.services.evaluation_runs import (
+    REQUIREMENT,
+    TECH_SPEC,
+    STAGE,
+    start_run,
+    record_checkpoints,
+    checkpoint_writer,
+    finish_run
+)
 from app.config import settings
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-def evaluate_bid(bid_id: int, db: Session) -> bool:
+# Stages whose whole result is checkpointed, so a resumed evaluation skips them
+_CHECKPOINTED_STAGES = ("strengths_weaknesses", "gap_analysis", "security")
+
+
+class RFPContext:
+    """
+    Everything bid evaluation needs from an RFP, loaded once.
+    
+    The requirement and spec rows are detached from the session that loaded them
+    and only read, so the evaluations of all of an RFP's bids can share one context
+    across threads.
+    """
+    
+    def __init__(
+        self,
+        rfp: RFPDocument,
+        requirements: List[Requirement],
+        tech_specs: List[TechnicalSpecification],
+        evidence_items: List[Tuple[str, int, str]]
+    ):
+        self.rfp_id = rfp.id
+        self.title = rfp.title
+        self.screening_policy = rfp.screening_policy
+        self.requirements = requirements
+        self.tech_specs = tech_specs
+        self.evidence_items = evidence_items
+        
+        # Create a consolidated text for requirements and tech specs
+        self.requirements_text = "\n".join([
+            f"Requirement {i+1} ({req.category}, {req.priority}): {req.description}" 
+            for i, req in enumerate(requirements)
+        ])
+        
+        self.tech_specs_text = "\n".join([
+            f"Technical Specification {i+1} ({spec.category}): {spec.name} - {spec.description}" +
+            (f" (Min: {spec.min_value} {spec.measurement_unit})" if spec.min_value else "") +
+            (f" (Max: {spec.max_value} {spec.measurement_unit})" if spec.max_value else "") +
+            (f" (Mandatory)" if spec.is_mandatory else " (Optional)")
+            for i, spec in enumerate(tech_specs)
+        ])
+
+
+def load_rfp_context(db: Session, rfp_id: int) -> Optional[RFPContext]:
+    """
+    Load an RFP's requirements, specs and evidence items for bid evaluation.
+    
+    Args:
+        db: Database session
+        rfp_id: ID of the RFP
+        
+    Returns:
+        The RFP's context, or None if the RFP does not exist
+    """
+    # Load through a session of its own, so the rows are detached from the caller's
+    # session and later commits neither expire them nor reload them lazily
+    loader = Session(bind=db.get_bind(), expire_on_commit=False)
+    try:
+        rfp = loader.query(RFPDocument).filter(RFPDocument.id == rfp_id).first()
+        if not rfp:
+            return None
+        
+        requirements = loader.query(Requirement).filter(Requirement.rfp_id == rfp_id).all()
+        tech_specs = loader.query(TechnicalSpecification).filter(TechnicalSpecification.rfp_id == rfp_id).all()
+        return RFPContext(rfp, requirements, tech_specs, collect_rfp_items(rfp, loader))
+    finally:
+        loader.close()
+
+
+def evaluate_bid(
+    bid_id: int,
+    db: Session,
+    incremental: bool = False,
+    resume: bool = True,
+    screen: bool = True,
+    context: Optional[RFPContext] = None
+) -> bool:
     """
     Evaluate a vendor bid against RFP requirements and technical specifications.
     
     Args:
         bid_id: ID of the bid to evaluate
         db: Database session
+        incremental: Reuse compliance results of the bid's latest analysis and only
+            evaluate requirements and specs it has no result for, e.g. after an RFP
+            amendment invalidated the changed ones
+        resume: Continue the bid's interrupted evaluation run from its checkpoints
+            instead of starting a new run
+        screen: Screen the bid against mandatory criteria first and apply the RFP's
+            screening policy if it fails; False evaluates it fully regardless
+        context: Preloaded context of the bid's RFP, shared by the evaluations of its bids
         
     Returns:
         Success status
     """
+    evaluation_run = None
     try:
         bid = db.query(VendorBid).filter(VendorBid.id == bid_id).first()
         if not bid:
             logger.error(f"Bid with ID {bid_id} not found")
             return False
         
-        rfp = db.query(RFPDocument).filter(RFPDocument.id == bid.rfp_id).first()
-        if not rfp:
-            logger.error(f"RFP with ID {bid.rfp_id} not found")
+        # Evaluations of several bids of one RFP share its context; a single evaluation loads it here
+        if context is None:
+            context = load_rfp_context(db, bid.rfp_id)
+            if context is None:
+                logger.error(f"RFP with ID {bid.rfp_id} not found")
+                return False
+        elif context.rfp_id != bid.rfp_id:
+            logger.error(f"Bid {bid_id} does not belong to RFP {context.rfp_id}")
             return False
         
         if not bid.is_processed:
@@ -46,11 +163,11 @@ def evaluate_bid(bid_id: int, db: Session) -> bool:
             return False
         
         # Get requirements and technical specifications
-        requirements = db.query(Requirement).filter(Requirement.rfp_id == rfp.id).all()
-        tech_specs = db.query(TechnicalSpecification).filter(TechnicalSpecification.rfp_id == rfp.id).all()
+        requirements = context.requirements
+        tech_specs = context.tech_specs
         
         if not requirements and not tech_specs:
-            logger.error(f"No requirements or technical specifications found for RFP {rfp.id}")
+            logger.error(f"No requirements or technical specifications found for RFP {context.rfp_id}")
             return False
         
         # Extract text from the bid file
@@ -71,334 +188,466 @@ def evaluate_bid(bid_id: int, db: Session) -> bool:
         # Chunk the text for processing
         text_chunks = chunk_text(extracted_text)
         
-        # Create a consolidated text for requirements and tech specs
-        requirements_text = "\n".join([
-            f"Requirement {i+1} ({req.category}, {req.priority}): {req.description}" 
-            for i, req in enumerate(requirements)
-        ])
-        
-        tech_specs_text = "\n".join([
-            f"Technical Specification {i+1} ({spec.category}): {spec.name} - {spec.description}" +
-            (f" (Min: {spec.min_value} {spec.measurement_unit})" if spec.min_value else "") +
-            (f" (Max: {spec.max_value} {spec.measurement_unit})" if spec.max_value else "") +
-            (f" (Mandatory)" if spec.is_mandatory else " (Optional)")
-            for i, spec in enumerate(tech_specs)
-        ])
+        requirements_text = context.requirements_text
+        tech_specs_text = context.tech_specs_text
         
         # Combine chunks for analysis
         bid_text = " ".join(text_chunks)
         
+        # Score every requirement and spec against every bid passage once; evaluators read their evidence from it
+        evidence = build_evidence_matrix(bid, extracted_text, db, items=context.evidence_items)
+        
         # Check if OpenAI API key is available for enhanced analysis
         use_openai = settings.OPENAI_API_KEY != ""
         
+        # Screen Must-have requirements and mandatory specs before spending calls on the full evaluation
+        deferred_stages = ()
+        if screen and settings.SCREENING_ENABLED:
+            fingerprint = screening_fingerprint(mandatory_items(requirements, tech_specs))
+            screening = bid.screening_result
+            if not screening or screening.get("fingerprint") != fingerprint:
+                screening = screen_bid(
+                    requirements,
+                    tech_specs,
+                    lambda item_type, item_id: evidence_text(evidence, item_type, item_id),
+                    use_openai
+                )
+                bid.screening_status = screening["status"]
+                bid.screening_result = screening
+                db.commit()
+                logger.info(f"Screened bid {bid_id}: {screening['status']} ({screening['counts']['fail']} of {screening['checked']} mandatory criteria failed)")
+            
+            if screening["status"] == SCREENING_FAILED:
+                policy = context.screening_policy or settings.SCREENING_POLICY
+                if policy == "skip":
+                    logger.info(f"Skipping full evaluation of bid {bid_id}, which failed mandatory screening")
+                    return True
+                if policy == "defer":
+                    deferred_stages = DEFERRED_STAGES
+                    logger.info(f"Deferring {', '.join(deferred_stages)} for bid {bid_id}, which failed mandatory screening")
+        
         # Evaluate requirement compliance
         requirement_compliance = {}
-        
-        if use_openai:
-            logger.info("Using OpenAI for bid evaluation")
-            for req in requirements:
-                try:
-                    # Use OpenAI-powered evaluation
-                    req_dict = {
-                        "category": req.category,
-                        "description": req.description,
-                        "priority": req.priority
-                    }
-                    
-                    # Limit text length to avoid token limits
-                    limited_text = bid_text[:5000]  
-                    
-                    compliance_result = evaluate_requirement_compliance(req_dict, limited_text)
-                    requirement_compliance[str(req.id)] = compliance_result
-                except Exception as e:
-                    logger.error(f"Error evaluating requirement {req.id} with OpenAI: {str(e)}")
-                    requirement_compliance[str(req.id)] = {"score": 0, "explanation": f"Error analyzing compliance: {str(e)}"}
-        else:
-            # Fallback to simulated evaluation
-            logger.warning("Using simulated LLM responses for bid evaluation")
-            for req in requirements:
-                requirement_prompt = f"""
-                You are an expert in government procurement evaluation. Analyze how well the vendor's bid complies with the following requirement:
-                
-                Requirement ID: {req.id}
-                Category: {req.category}
-                Priority: {req.priority}
-                Description: {req.description}
-                
-                Based on the following bid text, evaluate compliance on a scale of 0-100, where:
-                0 = Not addressed at all
-                25 = Poorly addressed
-                50 = Partially addressed
-                75 = Mostly addressed
-                100 = Fully addressed
-                
-                Also provide a brief explanation for your score.
-                
-                Respond with a JSON object in the following format:
-                {{
-                    "score": 75,
-                    "explanation": "The vendor addresses this requirement by..."
-                }}
-                """
-                
-                compliance_result = analyze_text_with_llm(
-                    prompt=requirement_prompt,
-                    text=bid_text[:10000],  # Limit text length for API
-                    output_format="json"
-                )
-                
-                try:
-                    if isinstance(compliance_result, str):
-                        compliance_result = json.loads(compliance_result)
-                    requirement_compliance[str(req.id)] = compliance_result
-                except (json.JSONDecodeError, TypeError) as e:
-                    logger.error(f"Error parsing requirement compliance JSON: {e}")
-                    requirement_compliance[str(req.id)] = {"score": 0, "explanation": "Error analyzing compliance"}
-        
-        # Evaluate technical specification compliance
         technical_compliance = {}
         
-        if use_openai:
-            for spec in tech_specs:
-                try:
-                    # Use OpenAI-powered evaluation
-                    spec_dict = {
-                        "name": spec.name,
-                        "category": spec.category,
-                        "description": spec.description,
-                        "measurement_unit": spec.measurement_unit,
-                        "min_value": spec.min_value,
-                        "max_value": spec.max_value,
-                        "is_mandatory": spec.is_mandatory
-                    }
-                    
-                    # Limit text length to avoid token limits
-                    limited_text = bid_text[:5000]
-                    
-                    compliance_result = evaluate_technical_compliance(spec_dict, limited_text)
-                    technical_compliance[str(spec.id)] = compliance_result
-                except Exception as e:
-                    logger.error(f"Error evaluating technical spec {spec.id} with OpenAI: {str(e)}")
-                    technical_compliance[str(spec.id)] = {"score": 0, "explanation": f"Error analyzing compliance: {str(e)}"}
-        else:
-            # Fallback to simulated evaluation
-            for spec in tech_specs:
-                spec_prompt = f"""
-                You are an expert in technical evaluation for government connectivity projects. Analyze how well the vendor's bid complies with the following technical specification:
-                
-                Specification ID: {spec.id}
-                Name: {spec.name}
-                Category: {spec.category}
-                Description: {spec.description}
-                {"Measurement Unit: " + spec.measurement_unit if spec.measurement_unit else ""}
-                {"Minimum Value: " + spec.min_value if spec.min_value else ""}
-                {"Maximum Value: " + spec.max_value if spec.max_value else ""}
-                Mandatory: {"Yes" if spec.is_mandatory else "No"}
-                
-                Based on the following bid text, evaluate compliance on a scale of 0-100, where:
-                0 = Not addressed at all
-                25 = Poorly addressed
-                50 = Partially addressed
-                75 = Mostly addressed
-                100 = Fully addressed
-                
-                Also provide a brief explanation for your score.
-                
-                Respond with a JSON object in the following format:
-                {{
-                    "score": 75,
-                    "explanation": "The vendor addresses this specification by..."
-                }}
-                """
-                
-                compliance_result = analyze_text_with_llm(
-                    prompt=spec_prompt,
-                    text=bid_text[:10000],  # Limit text length for API
-                    output_format="json"
-                )
-                
-                try:
-                    if isinstance(compliance_result, str):
-                        compliance_result = json.loads(compliance_result)
-                    technical_compliance[str(spec.id)] = compliance_result
-                except (json.JSONDecodeError, TypeError) as e:
-                    logger.error(f"Error parsing technical compliance JSON: {e}")
-                    technical_compliance[str(spec.id)] = {"score": 0, "explanation": "Error analyzing compliance"}
-        
-        # Identify strengths and weaknesses
-        strengths_weaknesses_result = {"strengths": [], "weaknesses": []}
-        gap_analysis_result = []
+        if incremental:
+            previous = current_analysis(db, bid)
+            if previous:
+                requirement_ids = {str(req.id) for req in requirements}
+                spec_ids = {str(spec.id) for spec in tech_specs}
+                # Failed results are evaluated again
+                requirement_compliance = {
+                    key: value for key, value in (previous.requirement_compliance or {}).items()
+                    if key in requirement_ids and "error" not in value
+                }
+                technical_compliance = {
+                    key: value for key, value in (previous.technical_compliance or {}).items()
+                    if key in spec_ids and "error" not in value
+                }
+                logger.info(f"Reusing {len(requirement_compliance)} requirement and {len(technical_compliance)} spec results for bid {bid_id}")
         
-        if use_openai:
-            try:
-                # Use OpenAI-powered analysis for strengths and weaknesses
-                limited_text = bid_text[:7000]  # Limit text length to avoid token limits
-                
-                strengths_weaknesses_result = identify_strengths_weaknesses(
-                    requirements_text, 
-                    tech_specs_text, 
-                    limited_text
-                )
-                
-                logger.info("Successfully identified strengths and weaknesses using OpenAI")
-                
-                # Use OpenAI for gap analysis
-                gap_analysis_result = perform_gap_analysis(
-                    requirements_text,
-                    tech_specs_text,
-                    limited_text
-                )
-                
-                logger.info(f"Successfully performed gap analysis using OpenAI, found {len(gap_analysis_result)} gaps")
-                
-            except Exception as e:
-                logger.error(f"Error performing strengths/weaknesses and gap analysis with OpenAI: {str(e)}")
-                use_openai = False  # Fall back to simulated mode
-        
-        # If OpenAI failed or isn't available, use simulated mode
-        if not use_openai:
-            logger.warning("Using simulated LLM responses for strengths/weaknesses and gap analysis")
-            
-            # Strengths and weaknesses analysis
-            strengths_weaknesses_prompt = f"""
-            You are an expert in government procurement evaluation. Based on the vendor's bid, identify the top strengths and weaknesses compared to the RFP requirements and technical specifications.
-    
-            RFP Requirements:
-            {requirements_text}
-    
-            Technical Specifications:
-            {tech_specs_text}
-    
-            Analyze the bid and provide:
-            1. Top 5 strengths of the proposal
-            2. Top 5 weaknesses or gaps in the proposal
-    
-            Respond with a JSON object in the following format:
-            {{
-                "strengths": [
-                    "The vendor exceeds network throughput requirements by offering 20Gbps capability",
-                    "Strong security compliance with all required certifications",
-                    ...
-                ],
-                "weaknesses": [
-                    "Limited experience with similar government projects",
-                    "Maintenance response time does not meet the required SLA",
-                    ...
-                ]
-            }}
-            """
-            
-            strengths_weaknesses_result = analyze_text_with_llm(
-                prompt=strengths_weaknesses_prompt,
-                text=bid_text[:10000],  # Limit text length for API
-                output_format="json"
-            )
-            
-            try:
-                if isinstance(strengths_weaknesses_result, str):
-                    strengths_weaknesses_result = json.loads(strengths_weaknesses_result)
-            except (json.JSONDecodeError, TypeError) as e:
-                logger.error(f"Error parsing strengths/weaknesses JSON: {e}")
-                strengths_weaknesses_result = {"strengths": [], "weaknesses": []}
-            
-            # Gap analysis
-            gap_analysis_prompt = f"""
-            You are an expert in government procurement evaluation. Identify specific gaps between the RFP requirements and the vendor's bid.
-    
-            RFP Requirements:
-            {requirements_text}
-    
-            Technical Specifications:
-            {tech_specs_text}
-    
-            Provide a list of specific requirements or specifications that are not fully addressed in the bid, explaining what is missing.
-    
-            Respond with a JSON array in the following format:
-            [
-                {{
-                    "item": "Network throughput requirement",
-                    "requirement": "10Gbps minimum throughput",
-                    "gap": "Vendor only offers 5Gbps throughput",
-                    "impact": "Critical - would not meet basic connectivity needs"
-                }},
-                ...
-            ]
-            """
-            
-            gap_analysis_result = analyze_text_with_llm(
-                prompt=gap_analysis_prompt,
-                text=bid_text[:10000],  # Limit text length for API
-                output_format="json"
+        # Checkpoint every result as it completes, and pick up an interrupted run where it stopped
+        evaluation_run, checkpoints = start_run(db, bid_id, len(requirements) + len(tech_specs), resume=resume)
+        if not evaluation_run:
+            return False
+        run_id = evaluation_run.id
+        requirement_ids = {str(req.id) for req in requirements}
+        spec_ids = {str(spec.id) for spec in tech_specs}
+        requirement_compliance.update({key: value for key, value in checkpoints[REQUIREMENT].items() if key in requirement_ids})
+        technical_compliance.update({key: value for key, value in checkpoints[TECH_SPEC].items() if key in spec_ids})
+        
+        pending_requirements = [req for req in requirements if str(req.id) not in requirement_compliance]
+        pending_specs = [spec for spec in tech_specs if str(spec.id) not in technical_compliance]
+        
+        # Send only the passages most relevant to each requirement and specification
+        requirement_evidence = {
+            req.id: evidence_text(evidence, "requirement", req.id) or bid_text[:5000] for req in requirements
+        }
+        spec_evidence = {
+            spec.id: evidence_text(evidence, "tech_spec", spec.id) or bid_text[:5000] for spec in tech_specs
+        }
+        
+        # Reuse the vendor's results for the same requirement and evidence from earlier RFPs
+        library_enabled = use_openai and settings.REQUIREMENT_LIBRARY_REUSE_ENABLED
+        if library_enabled:
+            requirement_compliance.update(
+                find_reusable_results(db, bid, pending_requirements, lambda req: requirement_evidence[req.id])
             )
-            
-            try:
-                if isinstance(gap_analysis_result, str):
-                    gap_analysis_result = json.loads(gap_analysis_result)
-            except (json.JSONDecodeError, TypeError) as e:
-                logger.error(f"Error parsing gap analysis JSON: {e}")
-                gap_analysis_result = []
-        
-        # Calculate overall score
-        req_scores = [item.get("score", 0) for req_id, item in requirement_compliance.items()]
-        tech_scores = [item.get("score", 0) for spec_id, item in technical_compliance.items()]
-        
-        # Weight mandatory specs higher
-        mandatory_spec_ids = [str(spec.id) for spec in tech_specs if spec.is_mandatory]
-        mandatory_scores = [technical_compliance.get(spec_id, {}).get("score", 0) for spec_id in mandatory_spec_ids]
-        
-        # Calculate weighted average
-        all_scores = req_scores + tech_scores
-        if all_scores:
-            base_score = sum(all_scores) / len(all_scores)
+            pending_requirements = [req for req in pending_requirements if str(req.id) not in requirement_compliance]
+        
+        # Decide numeric specs locally where the bid states comparable values; only the rest go to the LLM
+        if settings.SPEC_NUMERIC_CHECK_ENABLED:
+            for spec in pending_specs:
+                local_result = check_numeric_spec(spec, evidence_text(evidence, "tech_spec", spec.id))
+                if local_result:
+                    technical_compliance[str(spec.id)] = local_result
+            local_count = sum(1 for spec in pending_specs if str(spec.id) in technical_compliance)
+            pending_specs = [spec for spec in pending_specs if str(spec.id) not in technical_compliance]
+            logger.info(f"Decided {local_count} technical specs numerically; {len(pending_specs)} left for the LLM")
+        
+        # Stages run on worker threads, so they get plain data rather than session-bound rows
+        requirement_items = [
+            (str(req.id), {"category": req.category, "description": req.description, "priority": req.priority}, requirement_evidence[req.id])
+            for req in pending_requirements
+        ]
+        spec_items = [
+            (str(spec.id), _spec_fields(spec), spec_evidence[spec.id])
+            for spec in pending_specs
+        ]
+        gap_evidence = evidence_digest(evidence, ['requirement', 'tech_spec'])
+        
+        # Persist each stage's results as soon as it finishes; a resumed run keeps filling its own analysis
+        analysis = db.get(AnalysisResult, evaluation_run.analysis_id) if evaluation_run.analysis_id else None
+        if analysis:
+            analysis.requirement_compliance = dict(requirement_compliance)
+            analysis.technical_compliance = dict(technical_compliance)
         else:
-            base_score = 0
-            
-        # Apply penalty for missing mandatory specs
-        mandatory_penalty = 0
-        if mandatory_scores:
-            # Calculate average of mandatory specs
-            mandatory_avg = sum(mandatory_scores) / len(mandatory_scores)
-            # If below threshold, apply penalty
-            if mandatory_avg < 50:
-                mandatory_penalty = (50 - mandatory_avg) / 100
-                
-        overall_score = base_score * (1 - mandatory_penalty)
-        
-        # Save analysis results
-        analysis = AnalysisResult(
-            bid_id=bid_id,
-            requirement_compliance=requirement_compliance,
-            technical_compliance=technical_compliance,
-            strengths=strengths_weaknesses_result.get("strengths", []),
-            weaknesses=strengths_weaknesses_result.get("weaknesses", []),
-            gap_analysis=gap_analysis_result,
-            overall_score=overall_score
+            analysis = new_analysis(db, bid_id, use_openai)
+            analysis.requirement_compliance = dict(requirement_compliance)
+            analysis.technical_compliance = dict(technical_compliance)
+            db.flush()
+            evaluation_run.analysis_id = analysis.id
+        
+        # Results that needed no call (earlier analysis, library, numeric check) are checkpointed up front
+        record_checkpoints(db, run_id, REQUIREMENT, {key: value for key, value in requirement_compliance.items() if "error" not in value})
+        record_checkpoints(db, run_id, TECH_SPEC, {key: value for key, value in technical_compliance.items() if "error" not in value})
+        db.commit()
+        
+        def persist_stage(name: str, outputs: Dict[str, Any]) -> None:
+            if name == "requirements":
+                requirement_compliance.update(outputs["requirement_results"])
+                analysis.requirement_compliance = dict(requirement_compliance)
+                if library_enabled:
+                    record_results(db, bid, pending_requirements, requirement_compliance, lambda req: requirement_evidence[req.id])
+            elif name == "tech_specs":
+                technical_compliance.update(outputs["tech_spec_results"])
+                analysis.technical_compliance = dict(technical_compliance)
+            elif name == "strengths_weaknesses":
+                analysis.strengths = outputs["strengths_weaknesses"].get("strengths", [])
+                analysis.weaknesses = outputs["strengths_weaknesses"].get("weaknesses", [])
+            elif name == "gap_analysis":
+                analysis.gap_analysis = outputs["gap_analysis"]
+            elif name == "security":
+                if not outputs["security_assessed"]:
+                    logger.warning(f"Security assessment for bid {bid_id} did not complete successfully")
+                    return
+                logger.info(f"Successfully performed security assessment for bid {bid_id}")
+            else:
+                return
+            # Compliance stages checkpoint item by item; the others as a whole
+            if name in _CHECKPOINTED_STAGES:
+                record_checkpoints(db, run_id, STAGE, {name: next(iter(outputs.values()))})
+            evaluation_run.updated_at = datetime.utcnow()
+            db.commit()
+        
+        # Compliance, whole-document analyses and the security assessment don't depend on each other.
+        # Compliance stages checkpoint each item from their own session.
+        stages = [
+            Stage(
+                "requirements",
+                lambda db, requirement_items, use_openai: _evaluate_requirements(
+                    requirement_items, use_openai, checkpoint_writer(db, run_id, REQUIREMENT)
+                ),
+                inputs=("requirement_items", "use_openai"), outputs=("requirement_results",), needs_session=True
+            ),
+            Stage(
+                "tech_specs",
+                lambda db, spec_items, use_openai: _evaluate_tech_specs(
+                    spec_items, use_openai, checkpoint_writer(db, run_id, TECH_SPEC)
+                ),
+                inputs=("spec_items", "use_openai"), outputs=("tech_spec_results",), needs_session=True
+            ),
+            # Whole-document analyses read the cached summary tree, which covers the entire bid
+            Stage("digest", get_document_digest, inputs=("text",), outputs=("bid_digest",), needs_session=True),
+            Stage(
+                "strengths_weaknesses", _identify_strengths_weaknesses,
+                inputs=("requirements_text", "tech_specs_text", "bid_digest", "use_openai"), outputs=("strengths_weaknesses",)
+            ),
+            Stage(
+                "gap_analysis", _perform_gap_analysis,
+                inputs=("requirements_text", "tech_specs_text", "bid_digest", "gap_evidence", "use_openai"), outputs=("gap_analysis",)
+            ),
+            Stage("security", lambda db: assess_security_compliance(bid_id, db), outputs=("security_assessed",), needs_session=True),
+            # Numeric claims for fact queries; local parsing only, skipped when the text is unchanged
+            Stage("facts", lambda db, text: store_bid_facts(db, bid_id, text), inputs=("text",), outputs=("facts_stored",), needs_session=True),
+        ]
+        
+        # Stages finished by an earlier attempt are not run again
+        values = {
+            "requirement_items": requirement_items,
+            "spec_items": spec_items,
+            "use_openai": use_openai,
+            "text": extracted_text,
+            "requirements_text": requirements_text,
+            "tech_specs_text": tech_specs_text,
+            "gap_evidence": gap_evidence
+        }
+        done_stages = {name for name in checkpoints[STAGE] if name in _CHECKPOINTED_STAGES}
+        for stage in stages:
+            if stage.name in done_stages:
+                values[stage.outputs[0]] = checkpoints[STAGE][stage.name]
+        if {"strengths_weaknesses", "gap_analysis"} <= done_stages:
+            done_stages.add("digest")
+        
+        pipeline = Pipeline(
+            [stage for stage in stages if stage.name not in done_stages and stage.name not in deferred_stages],
+            max_workers=settings.EVALUATION_PIPELINE_WORKERS
         )
+        pipeline_run = pipeline.run(
+            values,
+            on_stage_complete=persist_stage,
+            session_factory=sessionmaker(bind=db.get_bind())
+        )
+        timing = pipeline_run.summary()
+        logger.info(f"Evaluation pipeline for bid {bid_id}: {timing['wall_time']:.2f}s wall time for {timing['stage_time']:.2f}s of stages")
+        
+        # A failed security assessment or fact extraction doesn't fail the evaluation; the other stages do
+        if "security" in pipeline_run.errors:
+            logger.error(f"Error during security assessment: {str(pipeline_run.errors['security'])}")
+        if "facts" in pipeline_run.errors:
+            logger.error(f"Error extracting numeric facts: {str(pipeline_run.errors['facts'])}")
+        for name, error in pipeline_run.errors.items():
+            if name not in ("security", "facts"):
+                raise error
         
-        db.add(analysis)
+        if use_openai:
+            routing = summarize_routing(list(requirement_compliance.values()) + list(technical_compliance.values()))
+            logger.info(f"Model routing for bid {bid_id}: {routing['escalation_rate']:.0%} escalated, ${routing['total_cost_usd']:.4f}")
+        
+        # Reviewer score overrides outlive re-evaluation; they apply on top of the new results
+        scored_requirements, scored_specs, applied_overrides = apply_overrides(
+            requirement_compliance, technical_compliance, load_overrides(db, [bid_id]).get(bid_id, [])
+        )
+        overall_score = score_bid(requirements, tech_specs, scored_requirements, scored_specs)
+        analysis.overall_score = overall_score
+        analysis.score_overrides = applied_overrides
         
-        # Update bid with total score
+        # Update bid with total score and make this analysis its current version
         bid.total_score = overall_score
+        publish_analysis(db, bid, analysis)
         
+        finish_run(db, evaluation_run)
         db.commit()
         
         logger.info(f"Successfully evaluated bid {bid_id} with overall score {overall_score:.2f}")
         
-        # Perform security assessment as part of the evaluation process
-        try:
-            # Run the security assessment
-            security_success = assess_security_compliance(bid_id, db)
-            if security_success:
-                logger.info(f"Successfully performed security assessment for bid {bid_id}")
-            else:
-                logger.warning(f"Security assessment for bid {bid_id} did not complete successfully")
-        except Exception as e:
-            logger.error(f"Error during security assessment: {str(e)}")
-            # Don't fail the entire evaluation if security assessment fails
-        
         return True
         
     except Exception as e:
         logger.exception(f"Error evaluating bid {bid_id}")
         db.rollback()
+        if evaluation_run is not None:
+            # Checkpoints are already committed; a retry resumes from them
+            try:
+                finish_run(db, evaluation_run, error=str(e))
+                db.commit()
+            except Exception:
+                logger.exception(f"Error marking the evaluation run of bid {bid_id} as failed")
+                db.rollback()
         return False
+
+
+def _spec_fields(spec: TechnicalSpecification) -> Dict[str, Any]:
+    """Fields of a technical specification used by the compliance prompt."""
+    return {
+        "name": spec.name,
+        "category": spec.category,
+        "description": spec.description,
+        "measurement_unit": spec.measurement_unit,
+        "min_value": spec.min_value,
+        "max_value": spec.max_value,
+        "is_mandatory": spec.is_mandatory
+    }
+
+
+def _requirement_result(req_id: str, req_dict: Dict, evidence: str, use_openai: bool) -> Dict:
+    """Compliance result of one requirement; failures carry an "error" entry."""
+    if use_openai:
+        try:
+            # Use OpenAI-powered evaluation
+            return evaluate_requirement_compliance(req_dict, evidence)
+        except Exception as e:
+            logger.error(f"Error evaluating requirement {req_id} with OpenAI: {str(e)}")
+            return {"score": 0, "explanation": f"Error analyzing compliance: {str(e)}", "error": str(e)}
+    
+    # Fallback to simulated evaluation
+    requirement_prompt = render_prompt("requirement_compliance", **req_dict)
+    
+    compliance_result = analyze_text_with_llm(
+        prompt=requirement_prompt,
+        text=evidence,
+        output_format="json"
+    )
+    
+    try:
+        if isinstance(compliance_result, str):
+            compliance_result = json.loads(compliance_result)
+        return compliance_result
+    except (json.JSONDecodeError, TypeError) as e:
+        logger.error(f"Error parsing requirement compliance JSON: {e}")
+        return {"score": 0, "explanation": "Error analyzing compliance", "error": str(e)}
+
+
+def _evaluate_requirements(
+    requirement_items: List[Tuple[str, Dict, str]],
+    use_openai: bool,
+    checkpoint: Optional[Callable[[str, Dict], None]] = None
+) -> Dict[str, Dict]:
+    """
+    Evaluate requirement compliance.
+    
+    Args:
+        requirement_items: (requirement ID, requirement fields, bid evidence) tuples
+        use_openai: Whether to call OpenAI or use simulated responses
+        checkpoint: Called with each requirement ID and result as soon as it is evaluated
+        
+    Returns:
+        Mapping of requirement ID to compliance result
+    """
+    if use_openai:
+        logger.info("Using OpenAI for bid evaluation")
+    else:
+        logger.warning("Using simulated LLM responses for bid evaluation")
+    
+    results = {}
+    for req_id, req_dict, evidence in requirement_items:
+        results[req_id] = _requirement_result(req_id, req_dict, evidence, use_openai)
+        # Failed items are not checkpointed, so a retry evaluates them again
+        if checkpoint and "error" not in results[req_id]:
+            checkpoint(req_id, results[req_id])
+    return results
+
+
+def _tech_spec_result(spec_id: str, spec_dict: Dict, evidence: str, use_openai: bool) -> Dict:
+    """Compliance result of one technical specification; failures carry an "error" entry."""
+    if use_openai:
+        try:
+            # Use OpenAI-powered evaluation
+            return evaluate_technical_compliance(spec_dict, evidence)
+        except Exception as e:
+            logger.error(f"Error evaluating technical spec {spec_id} with OpenAI: {str(e)}")
+            return {"score": 0, "explanation": f"Error analyzing compliance: {str(e)}", "error": str(e)}
+    
+    # Fallback to simulated evaluation
+    spec_prompt = render_prompt("technical_compliance", **technical_prompt_fields(spec_dict))
+    
+    compliance_result = analyze_text_with_llm(
+        prompt=spec_prompt,
+        text=evidence,
+        output_format="json"
+    )
+    
+    try:
+        if isinstance(compliance_result, str):
+            compliance_result = json.loads(compliance_result)
+        return compliance_result
+    except (json.JSONDecodeError, TypeError) as e:
+        logger.error(f"Error parsing technical compliance JSON: {e}")
+        return {"score": 0, "explanation": "Error analyzing compliance", "error": str(e)}
+
+
+def _evaluate_tech_specs(
+    spec_items: List[Tuple[str, Dict, str]],
+    use_openai: bool,
+    checkpoint: Optional[Callable[[str, Dict], None]] = None
+) -> Dict[str, Dict]:
+    """
+    Evaluate technical specification compliance.
+    
+    Args:
+        spec_items: (spec ID, spec fields, bid evidence) tuples
+        use_openai: Whether to call OpenAI or use simulated responses
+        checkpoint: Called with each spec ID and result as soon as it is evaluated
+        
+    Returns:
+        Mapping of spec ID to compliance result
+    """
+    results = {}
+    for spec_id, spec_dict, evidence in spec_items:
+        results[spec_id] = _tech_spec_result(spec_id, spec_dict, evidence, use_openai)
+        # Failed items are not checkpointed, so a retry evaluates them again
+        if checkpoint and "error" not in results[spec_id]:
+            checkpoint(spec_id, results[spec_id])
+    return results
+
+
+def _identify_strengths_weaknesses(requirements_text: str, tech_specs_text: str, bid_digest: str, use_openai: bool) -> Dict:
+    """
+    Identify the bid's strengths and weaknesses, falling back to simulated mode if OpenAI fails.
+    
+    Returns:
+        Dict with strengths and weaknesses lists
+    """
+    if use_openai:
+        try:
+            result = identify_strengths_weaknesses(requirements_text, tech_specs_text, bid_digest)
+            logger.info("Successfully identified strengths and weaknesses using OpenAI")
+            return result
+        except Exception as e:
+            logger.error(f"Error identifying strengths and weaknesses with OpenAI: {str(e)}")
+    
+    logger.warning("Using simulated LLM responses for strengths/weaknesses")
+    strengths_weaknesses_prompt = render_prompt(
+        "strengths_weaknesses",
+        requirements_text=requirements_text,
+        specs_text=tech_specs_text
+    )
+    
+    result = analyze_text_with_llm(
+        prompt=strengths_weaknesses_prompt,
+        text=bid_digest,
+        output_format="json"
+    )
+    
+    try:
+        if isinstance(result, str):
+            result = json.loads(result)
+        return result
+    except (json.JSONDecodeError, TypeError) as e:
+        logger.error(f"Error parsing strengths/weaknesses JSON: {e}")
+        return {"strengths": [], "weaknesses": []}
+
+
+def _perform_gap_analysis(
+    requirements_text: str,
+    tech_specs_text: str,
+    bid_digest: str,
+    gap_evidence: str,
+    use_openai: bool
+) -> List[Dict]:
+    """
+    Find gaps between the RFP and the bid, falling back to simulated mode if OpenAI fails.
+    
+    Returns:
+        List of identified gaps
+    """
+    gap_text = f"{bid_digest}\n\nKey evidence from the bid:\n{gap_evidence}"
+    
+    if use_openai:
+        try:
+            result = perform_gap_analysis(requirements_text, tech_specs_text, gap_text)
+            logger.info(f"Successfully performed gap analysis using OpenAI, found {len(result)} gaps")
+            return result
+        except Exception as e:
+            logger.error(f"Error performing gap analysis with OpenAI: {str(e)}")
+    
+    logger.warning("Using simulated LLM responses for gap analysis")
+    gap_analysis_prompt = render_prompt(
+        "gap_analysis",
+        requirements_text=requirements_text,
+        specs_text=tech_specs_text
+    )
+    
+    result = analyze_text_with_llm(
+        prompt=gap_analysis_prompt,
+        text=gap_text,
+        output_format="json"
+    )
+    
+    try:
+        if isinstance(result, str):
+            result = json.loads(result)
+        return result
+    except (json.JSONDecodeError, TypeError) as e:
+        logger.error(f"Error parsing gap analysis JSON: {e}")
+        return []
@@ -0,0 +1,293 @@
+"""
+Bid fact extraction service for the UniSphere application.
+Pulls typed numeric claims (uptime SLAs, throughput, latency, storage, prices,
+staffing levels) out of a bid's text with a local parser and stores them as
+BidFact rows, so bids can be compared on them with plain SQL queries and without
+any LLM call.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.analysis import BidFact
+from app.models.document import VendorBid
+from app.utils.db_bulk import bulk_insert
+from app.utils.units import find_quantities, parse_quantity
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bump when extraction changes, so stored facts are re-extracted
+EXTRACTOR_VERSION = "1"
+
+# Metrics per dimension and the words that identify them near a claim. A dimension's
+# metric without keywords is its default; claims matching no metric keep the dimension's name.
+METRICS: Dict[str, Dict[str, set]] = {
+    "percentage": {
+        "uptime": {"uptime", "availability", "available", "sla"},
+        "packet_loss": {"packet", "loss"},
+        "discount": {"discount", "rebate"},
+    },
+    "time": {
+        "latency": {"latency", "delay", "jitter", "round-trip"},
+        "response_time": {"response", "respond", "resolution", "resolve", "restore", "recovery"},
+        "delivery_time": {"delivery", "deliver", "implementation", "deployment", "deploy", "lead"},
+    },
+    "bandwidth": {"throughput": set()},
+    "storage": {"storage": set()},
+    "power": {"power": set()},
+    "currency": {"price": set()},
+    "headcount": {"staffing": set()},
+}
+CANONICAL_UNITS = {
+    "percentage": "%", "time": "ms", "bandwidth": "Mbps", "storage": "GB",
+    "power": "W", "currency": "USD", "headcount": "people",
+}
+
+_NUMBER = r"(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+_SCALE = r"(?:\s?(k|thousand|m|mn|million|bn|billion)\b)?"
+_SCALES = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mn": 1e6, "million": 1e6, "bn": 1e9, "billion": 1e9}
+_CURRENCY_CODES = {
+    "$": "USD", "us$": "USD", "usd": "USD", "dollars": "USD",
+    "€": "EUR", "eur": "EUR", "euros": "EUR",
+    "£": "GBP", "gbp": "GBP", "pounds": "GBP",
+}
+_PREFIXED_PRICE = re.compile(rf"(US\$|USD|\$|€|EUR|£|GBP)\s?{_NUMBER}{_SCALE}", re.IGNORECASE)
+_SUFFIXED_PRICE = re.compile(rf"(?<![\w.]){_NUMBER}{_SCALE}\s?(USD|EUR|GBP|dollars|euros|pounds)\b", re.IGNORECASE)
+_HEADCOUNT = re.compile(
+    rf"(?<![\w.]){_NUMBER}\s+(?:(?:full[- ]time|dedicated|certified|qualified|on-site|onsite)\s+)*"
+    r"(engineers?|technicians?|staff|employees|personnel|FTEs?|consultants?|specialists?|analysts?|"
+    r"developers?|people|administrators?|team members)\b",
+    re.IGNORECASE
+)
+
+_WORD = re.compile(r"[a-z][a-z-]{2,}")
+_KEYWORD_WINDOW = 80
+_CONTEXT_LIMIT = 200
+_SENTENCE_END = re.compile(r"[.!?]\s|\n")
+
+
+def _to_float(number: str) -> float:
+    return float(number.replace(",", ""))
+
+
+def _money_claims(text: str) -> List[Dict[str, Any]]:
+    claims = []
+    for match in _PREFIXED_PRICE.finditer(text):
+        value = _to_float(match.group(2)) * _SCALES.get((match.group(3) or "").lower(), 1)
+        claims.append({"value": value, "unit": _CURRENCY_CODES[match.group(1).lower()], "dimension": "currency",
+                       "text": match.group(0), "start": match.start(), "end": match.end()})
+    for match in _SUFFIXED_PRICE.finditer(text):
+        value = _to_float(match.group(1)) * _SCALES.get((match.group(2) or "").lower(), 1)
+        claims.append({"value": value, "unit": _CURRENCY_CODES[match.group(3).lower()], "dimension": "currency",
+                       "text": match.group(0), "start": match.start(), "end": match.end()})
+    return claims
+
+
+def _headcount_claims(text: str) -> List[Dict[str, Any]]:
+    return [
+        {"value": _to_float(match.group(1)), "unit": "people", "dimension": "headcount",
+         "text": match.group(0), "start": match.start(), "end": match.end()}
+        for match in _HEADCOUNT.finditer(text)
+    ]
+
+
+def _classify(claim: Dict[str, Any], lowered: str) -> str:
+    """The metric a claim measures: the one whose keyword is nearest to it."""
+    metrics = METRICS.get(claim["dimension"], {})
+    window_start = max(claim["start"] - _KEYWORD_WINDOW, 0)
+    window = lowered[window_start:claim["end"] + _KEYWORD_WINDOW]
+    best, best_distance = None, None
+    for match in _WORD.finditer(window):
+        for metric, keywords in metrics.items():
+            if match.group(0) in keywords:
+                position = window_start + match.start()
+                distance = claim["start"] - position if position < claim["start"] else position - claim["end"]
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = metric, distance
+    if best:
+        return best
+    defaults = [metric for metric, keywords in metrics.items() if not keywords]
+    return defaults[0] if defaults else claim["dimension"]
+
+
+def claim_context(text: str, start: int, end: int) -> tuple:
+    """The sentence around a claim, at most _CONTEXT_LIMIT characters either side."""
+    left = max(start - _CONTEXT_LIMIT, 0)
+    boundaries = [match.end() for match in _SENTENCE_END.finditer(text, left, start)]
+    context_start = boundaries[-1] if boundaries else left
+    right = _SENTENCE_END.search(text, end, min(end + _CONTEXT_LIMIT, len(text)))
+    context_end = right.start() + 1 if right else min(end + _CONTEXT_LIMIT, len(text))
+    return context_start, context_end
+
+
+def extract_facts(text: str) -> List[Dict[str, Any]]:
+    """
+    Extract typed numeric claims from a bid's text.
+
+    Args:
+        text: Extracted bid text; form feeds, if present, separate its pages
+
+    Returns:
+        Claims in text order, each with metric, dimension, value (canonical unit),
+        unit, the text as written, its sentence, offsets and page
+    """
+    if not text:
+        return []
+    lowered = text.lower()
+    claims = find_quantities(text) + _money_claims(text) + _headcount_claims(text)
+
+    # Where patterns overlap, keep the longest match starting first
+    claims.sort(key=lambda claim: (claim["start"], -(claim["end"] - claim["start"])))
+    facts = []
+    covered_until = -1
+    has_pages = "\f" in text
+    for claim in claims:
+        if claim["start"] < covered_until:
+            continue
+        covered_until = claim["end"]
+        context_start, context_end = claim_context(text, claim["start"], claim["end"])
+        facts.append({
+            "metric": _classify(claim, lowered),
+            "dimension": claim["dimension"],
+            "value": claim["value"],
+            "unit": claim["unit"],
+            "text": claim["text"][:255],
+            "context": " ".join(text[context_start:context_end].split()),
+            "char_start": claim["start"],
+            "char_end": claim["end"],
+            "page": text.count("\f", 0, claim["start"]) + 1 if has_pages else None
+        })
+    return facts
+
+
+def source_hash(text: str) -> str:
+    """Identifies the bid text and extractor version facts were extracted from."""
+    return hashlib.sha256(f"{EXTRACTOR_VERSION}:{text}".encode("utf-8")).hexdigest()
+
+
+def store_bid_facts(db: Session, bid_id: int, text: str) -> int:
+    """
+    Extract a bid's facts and replace its stored ones, unless they are already
+    current for this text. Commits.
+
+    Args:
+        db: Database session
+        bid_id: ID of the bid
+        text: Extracted bid text
+
+    Returns:
+        Number of facts stored, or -1 when the stored facts were already current
+    """
+    digest = source_hash(text)
+    current = (
+        db.query(BidFact.id)
+        .filter(BidFact.bid_id == bid_id, BidFact.source_hash == digest)
+        .first()
+    )
+    if current:
+        return -1
+
+    facts = extract_facts(text)
+    db.query(BidFact).filter(BidFact.bid_id == bid_id).delete(synchronize_session=False)
+    stored = bulk_insert(db, BidFact, [{**fact, "bid_id": bid_id, "source_hash": digest} for fact in facts])
+    db.commit()
+    logger.info(f"Extracted {stored} numeric facts from bid {bid_id}")
+    return stored
+
+
+def parse_fact_value(value: Any, metric: Optional[str]) -> Optional[float]:
+    """
+    A query bound in the metric's canonical unit, from e.g. "99.95", "99.95%" or "1 Gbps".
+
+    Raises:
+        ValueError: If the value is not a number or quantity
+    """
+    if value is None or value == "":
+        return None
+    dimension = next((dim for dim, metrics in METRICS.items() if metric in metrics or metric == dim), None)
+    if dimension and dimension in ("percentage", "time", "bandwidth", "storage", "power"):
+        parsed = parse_quantity(value, CANONICAL_UNITS[dimension])
+        if parsed and parsed["dimension"] == dimension:
+            return parsed["value"]
+    return float(str(value).replace(",", "").strip())
+
+
+def query_facts(
+    db: Session,
+    metric: str,
+    rfp_id: Optional[int] = None,
+    bid_id: Optional[int] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    unit: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Bids with a claim for a metric within bounds, each with its matching claims.
+
+    Args:
+        db: Database session
+        metric: Metric such as "uptime" or "price"
+        rfp_id: Restrict to the bids of an RFP
+        bid_id: Restrict to one bid
+        min_value: Lower bound, in the metric's canonical unit
+        max_value: Upper bound, in the metric's canonical unit
+        unit: Restrict to one unit, e.g. a currency
+
+    Returns:
+        One entry per matching bid, with its matching claims in text order
+    """
+    query = (
+        db.query(BidFact, VendorBid.vendor_name, VendorBid.rfp_id)
+        .join(VendorBid, VendorBid.id == BidFact.bid_id)
+        .filter(BidFact.metric == metric)
+    )
+    if rfp_id is not None:
+        query = query.filter(VendorBid.rfp_id == rfp_id)
+    if bid_id is not None:
+        query = query.filter(BidFact.bid_id == bid_id)
+    if min_value is not None:
+        query = query.filter(BidFact.value >= min_value)
+    if max_value is not None:
+        query = query.filter(BidFact.value <= max_value)
+    if unit:
+        query = query.filter(BidFact.unit == unit)
+
+    bids: Dict[int, Dict[str, Any]] = {}
+    for fact, vendor_name, fact_rfp_id in query.order_by(BidFact.bid_id, BidFact.char_start).all():
+        entry = bids.setdefault(fact.bid_id, {
+            "bid_id": fact.bid_id,
+            "vendor_name": vendor_name,
+            "rfp_id": fact_rfp_id,
+            "facts": []
+        })
+        entry["facts"].append(fact_dict(fact))
+    return list(bids.values())
+
+
+def list_bid_facts(db: Session, bid_id: int) -> List[Dict[str, Any]]:
+    """
+    All stored facts of a bid, in text order.
+    """
+    facts = db.query(BidFact).filter(BidFact.bid_id == bid_id).order_by(BidFact.char_start).all()
+    return [fact_dict(fact) for fact in facts]
+
+
+def fact_dict(fact: BidFact) -> Dict[str, Any]:
+    """A stored fact as a JSON-serialisable dict."""
+    return {
+        "id": fact.id,
+        "metric": fact.metric,
+        "dimension": fact.dimension,
+        "value": fact.value,
+        "unit": fact.unit,
+        "text": fact.text,
+        "context": fact.context,
+        "page": fact.page,
+        "char_start": fact.char_start,
+        "char_end": fact.char_end
+    }
@@ -0,0 +1,126 @@
+"""
+Mandatory-requirement screening service for the UniSphere application.
+Before a bid's full evaluation, its Must-have requirements and mandatory technical
+specifications are checked as pass/fail criteria: numeric specifications locally,
+everything else in a few batched calls to the cheap model. Bids with a clear
+failure are flagged, and the RFP's screening policy decides whether their
+expensive evaluation stages still run.
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from app.models.document import Requirement, TechnicalSpecification
+from app.services.spec_checker import check_numeric_spec
+from app.utils.openai_utils import screen_mandatory_criteria
+from app.utils.prompt_templates import get_prompt
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PASSED = "passed"
+FAILED = "failed"
+
+SCREENING_POLICIES = ("continue", "defer", "skip")
+
+# Stages a "defer" policy postpones for bids that fail screening
+DEFERRED_STAGES = ("digest", "strengths_weaknesses", "gap_analysis", "security")
+
+
+def mandatory_items(requirements: List[Requirement], tech_specs: List[TechnicalSpecification]) -> List[tuple]:
+    """The (item type, item) pairs screening checks: Must-have requirements and mandatory specs."""
+    return (
+        [("requirement", req) for req in requirements if req.priority == "Must-have"]
+        + [("tech_spec", spec) for spec in tech_specs if spec.is_mandatory]
+    )
+
+
+def screening_fingerprint(items: List[tuple]) -> str:
+    """Identifies the criteria and prompt a screening was made with."""
+    digest = hashlib.sha256(get_prompt("mandatory_screening").fingerprint.encode("utf-8"))
+    for item_type, item in items:
+        digest.update(f"{item_type}:{item.id};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _criterion_text(item_type: str, item: Any) -> str:
+    if item_type == "requirement":
+        return f"Requirement ({item.category}): {item.description}"
+    bounds = ""
+    if item.min_value:
+        bounds += f" (Min: {item.min_value} {item.measurement_unit or ''})"
+    if item.max_value:
+        bounds += f" (Max: {item.max_value} {item.measurement_unit or ''})"
+    return f"Technical specification ({item.category}): {item.name} - {item.description}{bounds}"
+
+
+def screen_bid(
+    requirements: List[Requirement],
+    tech_specs: List[TechnicalSpecification],
+    evidence_for: Callable[[str, int], str],
+    use_openai: bool
+) -> Dict[str, Any]:
+    """
+    Screen a bid against the RFP's mandatory criteria.
+
+    Args:
+        requirements: The RFP's requirements
+        tech_specs: The RFP's technical specifications
+        evidence_for: Returns the bid's evidence passages for an item type and ID,
+            or an empty string when no passage matched
+        use_openai: Whether to call OpenAI; without it, only numeric specs and
+            criteria the bid never addresses can fail
+
+    Returns:
+        Screening result with status, per-criterion verdicts and counts
+    """
+    items = mandatory_items(requirements, tech_specs)
+    verdicts: List[Dict[str, Any]] = []
+    llm_criteria = []
+
+    for item_type, item in items:
+        evidence = evidence_for(item_type, item.id)
+        verdict = {"type": item_type, "id": item.id, "criterion": _criterion_text(item_type, item)}
+
+        if item_type == "tech_spec":
+            numeric = check_numeric_spec(item, evidence)
+            if numeric:
+                verdicts.append({
+                    **verdict,
+                    "verdict": "pass" if numeric["score"] == 100 else "fail",
+                    "reason": numeric["explanation"],
+                    "method": "numeric"
+                })
+                continue
+
+        if use_openai:
+            llm_criteria.append((verdict, evidence))
+        elif not evidence:
+            verdicts.append({**verdict, "verdict": "fail", "reason": "The bid does not address this criterion", "method": "evidence"})
+        else:
+            verdicts.append({**verdict, "verdict": "unclear", "reason": "", "method": "evidence"})
+
+    if llm_criteria:
+        responses = screen_mandatory_criteria([
+            {"text": verdict["criterion"], "evidence": evidence[:settings.SCREENING_EVIDENCE_CHARS]}
+            for verdict, evidence in llm_criteria
+        ])
+        for (verdict, _), response in zip(llm_criteria, responses):
+            response = response or {"verdict": "unclear", "reason": "Screening call failed"}
+            verdicts.append({**verdict, **response, "method": "llm"})
+
+    failed = [verdict for verdict in verdicts if verdict["verdict"] == "fail"]
+    counts = {key: sum(1 for verdict in verdicts if verdict["verdict"] == key) for key in ("pass", "fail", "unclear")}
+    return {
+        "status": FAILED if failed else PASSED,
+        "fingerprint": screening_fingerprint(items),
+        "checked": len(verdicts),
+        "counts": counts,
+        "failed": failed,
+        "verdicts": verdicts,
+        "llm_calls": -(-len(llm_criteria) // settings.SCREENING_BATCH_SIZE) if llm_criteria else 0,
+        "screened_at": datetime.utcnow().isoformat()
+    }
@@ -0,0 +1,220 @@
+"""
+Bulk evaluation service for the UniSphere application.
+Evaluates every bid of an RFP as one background job. The RFP's requirements,
+specifications and evidence items are loaded once and shared read-only by a pool
+of workers, each evaluating one bid at a time in the batch LLM lane, so the bids
+together stay within the scheduler's global concurrency budget.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.services.bid_evaluator import evaluate_bid, load_rfp_context, RFPContext
+from app.services.evaluation_runs import evaluation_progress
+from app.utils.llm_scheduler import llm_lane, BATCH
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Job and per-bid statuses
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Latest job per RFP
+_jobs: Dict[int, "EvaluationJob"] = {}
+_jobs_lock = threading.Lock()
+
+
+class EvaluationJob:
+    """Progress of one evaluate-all job, updated by its workers."""
+
+    def __init__(self, rfp_id: int, bid_ids: List[int], incremental: bool):
+        self.id = uuid.uuid4().hex[:12]
+        self.rfp_id = rfp_id
+        self.incremental = incremental
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.bids: Dict[int, Dict[str, Any]] = {
+            bid_id: {"status": QUEUED, "elapsed": None, "error": None} for bid_id in bid_ids
+        }
+        self._lock = threading.Lock()
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def update_bid(self, bid_id: int, **fields: Any) -> None:
+        with self._lock:
+            self.bids[bid_id].update(fields)
+
+    def finish(self, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.status = FAILED if error else COMPLETED
+            self.error = error
+            self.finished_at = datetime.utcnow()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """A consistent copy of the job's state for reporting."""
+        with self._lock:
+            bids = {bid_id: dict(state) for bid_id, state in self.bids.items()}
+            counts = {
+                status: sum(1 for state in bids.values() if state["status"] == status)
+                for status in (QUEUED, RUNNING, COMPLETED, FAILED)
+            }
+            return {
+                "job_id": self.id,
+                "rfp_id": self.rfp_id,
+                "status": self.status,
+                "incremental": self.incremental,
+                "error": self.error,
+                "total_bids": len(bids),
+                "bids_by_status": counts,
+                "bids": bids,
+                "created_at": self.created_at.isoformat(),
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None
+            }
+
+
+def get_job(rfp_id: int) -> Optional[EvaluationJob]:
+    """The latest evaluate-all job of an RFP, if any was started since the process began."""
+    with _jobs_lock:
+        return _jobs.get(rfp_id)
+
+
+def start_evaluate_all(
+    engine: Engine,
+    rfp_id: int,
+    bid_ids: List[int],
+    incremental: bool = False
+) -> Optional[EvaluationJob]:
+    """
+    Start evaluating a list of an RFP's bids in the background.
+
+    Args:
+        engine: Database engine the workers open their sessions on
+        rfp_id: ID of the RFP
+        bid_ids: IDs of the bids to evaluate
+        incremental: Reuse each bid's previous results where the RFP is unchanged
+
+    Returns:
+        The new job, or None if an evaluate-all job of the RFP is still running
+    """
+    with _jobs_lock:
+        existing = _jobs.get(rfp_id)
+        if existing and existing.is_active:
+            logger.warning(f"RFP {rfp_id} already has a running evaluate-all job {existing.id}")
+            return None
+        job = EvaluationJob(rfp_id, bid_ids, incremental)
+        _jobs[rfp_id] = job
+
+    thread = threading.Thread(target=_run_job, args=(engine, job), name=f"evaluate-all-{job.id}", daemon=True)
+    thread.start()
+    logger.info(f"Started evaluate-all job {job.id} for {len(bid_ids)} bids of RFP {rfp_id}")
+    return job
+
+
+def _run_job(engine: Engine, job: EvaluationJob) -> None:
+    """Load the RFP context once and evaluate the job's bids on a worker pool."""
+    job.status = RUNNING
+    start = time.perf_counter()
+    try:
+        loader = Session(bind=engine)
+        try:
+            context = load_rfp_context(loader, job.rfp_id)
+        finally:
+            loader.close()
+        if context is None:
+            job.finish(f"RFP with ID {job.rfp_id} not found")
+            return
+
+        session_factory = sessionmaker(bind=engine)
+        workers = max(1, min(settings.EVALUATE_ALL_WORKERS, len(job.bids)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda bid_id: _evaluate_one(session_factory, job, bid_id, context), list(job.bids)))
+
+        failed = sum(1 for state in job.snapshot()["bids"].values() if state["status"] == FAILED)
+        logger.info(
+            f"Evaluate-all job {job.id} of RFP {job.rfp_id} finished in {time.perf_counter() - start:.2f}s: "
+            f"{len(job.bids) - failed} bids evaluated, {failed} failed"
+        )
+        job.finish()
+    except Exception as e:
+        logger.error(f"Error in evaluate-all job {job.id} of RFP {job.rfp_id}: {str(e)}")
+        job.finish(str(e))
+
+
+def _evaluate_one(session_factory: sessionmaker, job: EvaluationJob, bid_id: int, context: RFPContext) -> None:
+    """Evaluate one bid of a job in a session of its own."""
+    job.update_bid(bid_id, status=RUNNING)
+    start = time.perf_counter()
+    session = session_factory()
+    try:
+        with llm_lane(BATCH):
+            success = evaluate_bid(bid_id, session, incremental=job.incremental, context=context)
+        job.update_bid(
+            bid_id,
+            status=COMPLETED if success else FAILED,
+            error=None if success else "Evaluation failed or the bid is already being evaluated",
+            elapsed=round(time.perf_counter() - start, 3)
+        )
+    except Exception as e:
+        logger.error(f"Error evaluating bid {bid_id} in evaluate-all job {job.id}: {str(e)}")
+        job.update_bid(bid_id, status=FAILED, error=str(e), elapsed=round(time.perf_counter() - start, 3))
+    finally:
+        session.close()
+
+
+def competition_progress(db: Session, rfp_id: int, bid_ids: List[int]) -> Dict[str, Any]:
+    """
+    Progress of an RFP's bid evaluations, per bid and for the competition as a whole.
+
+    Args:
+        db: Database session
+        rfp_id: ID of the RFP
+        bid_ids: IDs of the RFP's bids
+
+    Returns:
+        The latest evaluate-all job, each bid's evaluation run progress, and item
+        and bid totals across all bids
+    """
+    job = get_job(rfp_id)
+    snapshot = job.snapshot() if job else None
+
+    bids = {}
+    total_items = completed_items = evaluated = 0
+    for bid_id in bid_ids:
+        progress = evaluation_progress(db, bid_id)
+        if snapshot and bid_id in snapshot["bids"]:
+            progress = {**(progress or {}), "job": snapshot["bids"][bid_id]}
+        bids[bid_id] = progress
+        if progress and progress.get("run_id"):
+            total_items += progress["total_items"] or 0
+            completed_items += progress["completed_items"]
+            evaluated += progress["status"] == COMPLETED
+
+    if snapshot:
+        snapshot.pop("bids")
+
+    return {
+        "rfp_id": rfp_id,
+        "job": snapshot,
+        "total_bids": len(bid_ids),
+        "bids_evaluated": evaluated,
+        "total_items": total_items,
+        "completed_items": completed_items,
+        "progress": round(completed_items / total_items, 3) if total_items else (1.0 if evaluated == len(bid_ids) else 0.0),
+        "bids": bids
+    }
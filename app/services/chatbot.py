@@ -14,6 +14,8 @@ import requests
 from app.config import Settings
 from app.database import get_db
 from app.models.document import RFPDocument, VendorBid
+from app.services.analysis_versions import current_analysis
+from app.utils.llm_scheduler import scheduler, INTERACTIVE
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -141,9 +143,9 @@ class ChatbotService:
             if bid:
                 context_parts.append(f"Vendor Bid: {bid.vendor_name}")
                 
-                # Add analysis results if available
-                if bid.analysis_results and len(bid.analysis_results) > 0:
-                    analysis = bid.analysis_results[0]
+                # Add the current analysis results if available
+                analysis = current_analysis(self.db, bid)
+                if analysis:
                     if analysis.strengths:
                         strengths = json.loads(analysis.strengths) if isinstance(analysis.strengths, str) else analysis.strengths
                         if strengths and len(strengths) > 0:
@@ -217,12 +219,13 @@ Your answers should be helpful for procurement officers and vendors. Do not make
         
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # do not change this unless explicitly requested by the user
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            temperature=0.3,
-            max_tokens=1000
-        )
+        with scheduler.slot(INTERACTIVE):
+            response = self.openai_client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages,
+                temperature=0.3,
+                max_tokens=1000
+            )
         
         return response.choices[0].message.content
 
@@ -252,11 +255,12 @@ Your answers should be helpful for procurement officers and vendors. Do not make
             "stream": False
         }
         
-        response = requests.post(
-            "https://api.perplexity.ai/chat/completions",
-            headers=headers,
-            json=data
-        )
+        with scheduler.slot(INTERACTIVE):
+            response = requests.post(
+                "https://api.perplexity.ai/chat/completions",
+                headers=headers,
+                json=data
+            )
         
         if response.status_code != 200:
             raise Exception(f"Perplexity API returned status code {response.status_code}: {response.text}")
@@ -0,0 +1,318 @@
+"""
+Security control catalog service for the UniSphere application.
+Loads the bundled, versioned catalog of NIST SP 800-53, NIST SP 800-171 and CMMC
+controls (FedRAMP baselines use the 800-53 controls) into an in-memory index by
+control ID, family and keyword, so control IDs cited in an RFP resolve by direct
+lookup instead of being reconstructed by the LLM.
+"""
+
+import json
+import logging
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from app.models.government import SecurityFramework
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_STOPWORDS = {
+    "and", "the", "for", "with", "from", "that", "this", "are", "such", "when", "into", "its", "their",
+    "system", "systems", "organizational", "information", "defined", "policy", "procedures", "use",
+    "ensure", "provide", "within", "other", "used", "any", "all", "both", "not", "only", "each",
+}
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9&-]+")
+_NIST_ID = re.compile(r"^([A-Z]{2})\s?-\s?0*(\d{1,2})(?:\s?\(\s?0*(\d{1,2})\s?\))?$")
+_CMMC_ID = re.compile(r"^([A-Z]{2})\.L([123])-(3\.\d{1,2}\.\d{1,2})$")
+_FAMILY_PREFIX = re.compile(r"^([A-Z]{2})[-.\s]")
+_NIST_171_ID = re.compile(r"^(?:NIST\s+(?:SP\s+)?800-171\s+)?(3\.\d{1,2}\.\d{1,2})$")
+
+# Documents must name 800-171, CMMC or CUI for a bare "3.1.1" to read as a control rather than a section number
+_NIST_171_CONTEXT = re.compile(r"800-171|\bCMMC\b|\bCUI\b|252\.204-7012", re.IGNORECASE)
+
+
+def cites_nist_171(text: str) -> bool:
+    """Whether a document names 800-171, CMMC or CUI, so bare "3.1.1" numbers in it may be controls."""
+    return bool(_NIST_171_CONTEXT.search(text))
+
+
+class Control:
+    """A control of the catalog."""
+
+    def __init__(
+        self,
+        control_id: str,
+        framework: SecurityFramework,
+        family: str,
+        family_name: str,
+        title: str,
+        description: str,
+        keywords: Set[str],
+        related: Optional[List[str]] = None,
+        level: Optional[int] = None
+    ):
+        self.control_id = control_id
+        self.framework = framework
+        self.family = family
+        self.family_name = family_name
+        self.title = title
+        self.description = description
+        self.keywords = keywords
+        self.related = related or []
+        self.level = level
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The control as a JSON-serialisable dict."""
+        return {
+            "control_id": self.control_id,
+            "framework": self.framework.value,
+            "family": self.family,
+            "family_name": self.family_name,
+            "title": self.title,
+            "description": self.description,
+            "related": self.related,
+            "level": self.level
+        }
+
+
+def _tokens(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def normalize_control_id(raw: str) -> Optional[tuple]:
+    """
+    Canonical form of a control ID as written in a document.
+
+    Args:
+        raw: E.g. "AC-2", "ac-02", "AC-2 (1)", "3.1.1" or "AC.L2-3.1.1"
+
+    Returns:
+        Tuple of (catalog ID, enhancement number or None), or None if it isn't a control ID
+    """
+    raw = raw.strip()
+    match = _NIST_ID.match(raw.upper())
+    if match:
+        return f"{match.group(1)}-{int(match.group(2))}", int(match.group(3)) if match.group(3) else None
+    match = _CMMC_ID.match(raw.upper())
+    if match:
+        return f"{match.group(1)}.L{match.group(2)}-{match.group(3)}", None
+    match = _NIST_171_ID.match(raw)
+    if match:
+        return match.group(1), None
+    return None
+
+
+class ControlCatalog:
+    """
+    In-memory index of the control catalog: by control ID, by family and by keyword.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Args:
+            data: The parsed catalog file
+        """
+        self.version = data.get("version")
+        self.sources = data.get("sources", {})
+        self.families: Dict[str, str] = data.get("families", {})
+        self.controls: Dict[str, Control] = {}
+
+        for entry in data.get("nist800_53", []):
+            family = entry["id"].split("-")[0]
+            self._add(Control(
+                entry["id"], SecurityFramework.NIST800_53, family, self.families.get(family, family),
+                entry["title"], entry.get("description") or entry["title"],
+                set(_tokens(f"{entry['title']} {entry.get('description', '')}")) | set(entry.get("keywords", []))
+            ))
+        for entry in data.get("nist800_171", []):
+            family = entry["family"]
+            keywords = set(_tokens(entry["title"])) | set(entry.get("keywords", []))
+            level = entry.get("cmmc_level")
+            cmmc_id = f"{family}.L{level}-{entry['id']}" if level else None
+            self._add(Control(
+                entry["id"], SecurityFramework.NIST800_171, family, self.families.get(family, family),
+                entry["title"], entry.get("description") or entry["title"], keywords,
+                related=[cmmc_id] if cmmc_id else None
+            ))
+            # CMMC Level 1 and 2 practices are the 800-171 requirements under another ID
+            if cmmc_id:
+                self._add(Control(
+                    cmmc_id, SecurityFramework.CMMC, family, self.families.get(family, family),
+                    entry["title"], entry.get("description") or entry["title"], keywords,
+                    related=[entry["id"]], level=level
+                ))
+
+        # Explicit keywords are distinctive security terms ("phishing", "siem"), unlike title words
+        self.term_controls: Dict[str, List[str]] = {}
+        for entry in data.get("nist800_53", []) + data.get("nist800_171", []):
+            for keyword in entry.get("keywords", []):
+                self.term_controls.setdefault(keyword, []).append(entry["id"])
+        self.terms: Set[str] = set(self.term_controls)
+
+        self.by_family: Dict[str, List[Control]] = {}
+        self.by_keyword: Dict[str, Set[str]] = {}
+        for control in self.controls.values():
+            self.by_family.setdefault(control.family, []).append(control)
+            for keyword in control.keywords:
+                self.by_keyword.setdefault(keyword, set()).add(control.control_id)
+
+        codes = "|".join(sorted(self.families))
+        self._mention = re.compile(
+            rf"\b(?:{codes})\.L[123]-3\.\d{{1,2}}\.\d{{1,2}}(?![\d.]*\d)"
+            rf"|\b(?:{codes})-\d{{1,2}}(?:\s?\(\d{{1,2}}\))?(?![\w-])"
+            r"|(?<![\w.])3\.\d{1,2}\.\d{1,2}(?![\w.]*\d)"
+        )
+
+    def _add(self, control: Control) -> None:
+        self.controls[control.control_id] = control
+
+    def get(self, control_id: str) -> Optional[Control]:
+        """
+        Look up a control by ID in any of the accepted spellings; enhancements such
+        as "AC-2(1)" resolve to their base control.
+        """
+        normalized = normalize_control_id(control_id or "")
+        return self.controls.get(normalized[0]) if normalized else None
+
+    def control_family(self, requirement_id: str) -> Optional[str]:
+        """
+        Family code of a control ID, e.g. "AC" for "AC-2(3)", "3.1.1" or "AC.L2-3.1.1",
+        also for IDs of a known family that the catalog lacks; None otherwise.
+        """
+        control = self.get(requirement_id)
+        if control:
+            return control.family
+        match = _FAMILY_PREFIX.match((requirement_id or "").strip().upper())
+        return match.group(1) if match and match.group(1) in self.families else None
+
+    def family(self, family: str, framework: Optional[SecurityFramework] = None) -> List[Control]:
+        """Controls of a family, e.g. "AC", optionally of one framework."""
+        controls = self.by_family.get(family.upper(), [])
+        return [control for control in controls if framework is None or control.framework == framework]
+
+    def search(
+        self,
+        query: str,
+        family: Optional[str] = None,
+        framework: Optional[SecurityFramework] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Controls matching the words of a query, best first.
+
+        Each query word a control has as a keyword counts by its rarity across the
+        catalog, so "multifactor" outweighs "access". A query that is a control ID,
+        such as "AC-2" or "3.1.1", puts that control first.
+
+        Returns:
+            Controls with their match score
+        """
+        scores: Dict[str, float] = {}
+        exact = self.get(query)
+        total = len(self.controls)
+        for token in set(_tokens(query)):
+            matches = self.by_keyword.get(token)
+            if not matches:
+                continue
+            idf = math.log(1 + total / len(matches))
+            for control_id in matches:
+                scores[control_id] = scores.get(control_id, 0.0) + idf
+
+        ranked = sorted(scores.items(), key=lambda entry: (-entry[1], entry[0]))
+        if exact:
+            ranked = [(exact.control_id, scores.get(exact.control_id, 0.0))] + [
+                entry for entry in ranked if entry[0] != exact.control_id
+            ]
+
+        results = []
+        for control_id, score in ranked:
+            control = self.controls[control_id]
+            if family and control.family != family.upper():
+                continue
+            if framework and control.framework != framework:
+                continue
+            results.append({**control.to_dict(), "score": round(score, 3)})
+            if len(results) >= limit:
+                break
+        return results
+
+    def security_terms(self, text: str) -> Set[str]:
+        """The catalog's distinctive security terms that occur in a text."""
+        return self.terms.intersection(_TOKEN.findall(text.lower()))
+
+    def find_mentions(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Control IDs cited in a document.
+
+        Bare 800-171 numbers like "3.1.1" count only when the document names 800-171,
+        CMMC or CUI, and never at the start of a line, where they number sections.
+
+        Returns:
+            Mentions in text order, each with the catalog's control (None for an ID
+            of a known family that the catalog lacks), the ID as written, its
+            enhancement number and offsets
+        """
+        allow_171 = cites_nist_171(text)
+        mentions = []
+        for match in self._mention.finditer(text):
+            written = match.group(0)
+            if written[0].isdigit():
+                line_start = text.rfind("\n", 0, match.start()) + 1
+                if not allow_171 or not text[line_start:match.start()].strip():
+                    continue
+            normalized = normalize_control_id(written)
+            mentions.append({
+                "control": self.controls.get(normalized[0]) if normalized else None,
+                "text": written,
+                "enhancement": normalized[1] if normalized else None,
+                "start": match.start(),
+                "end": match.end()
+            })
+        return mentions
+
+    def stats(self) -> Dict[str, Any]:
+        """Catalog version, sources and the number of controls per framework."""
+        counts: Dict[str, int] = {}
+        for control in self.controls.values():
+            counts[control.framework.value] = counts.get(control.framework.value, 0) + 1
+        return {
+            "version": self.version,
+            "sources": self.sources,
+            "controls": counts,
+            "families": self.families,
+            "keywords": len(self.by_keyword)
+        }
+
+
+_catalog: Optional[ControlCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def load_control_catalog(path: Optional[str] = None) -> ControlCatalog:
+    """
+    Load and index the control catalog, replacing the one in use.
+
+    Args:
+        path: Catalog file; defaults to settings.SECURITY_CONTROL_CATALOG
+
+    Returns:
+        The catalog
+    """
+    global _catalog
+    path = path or settings.SECURITY_CONTROL_CATALOG
+    with open(path, encoding="utf-8") as f:
+        catalog = ControlCatalog(json.load(f))
+    with _catalog_lock:
+        _catalog = catalog
+    logger.info(f"Loaded security control catalog {catalog.version}: {len(catalog.controls)} controls from {path}")
+    return catalog
+
+
+def get_control_catalog() -> ControlCatalog:
+    """The control catalog, loaded on first use if startup didn't load it."""
+    with _catalog_lock:
+        catalog = _catalog
+    return catalog or load_control_catalog()
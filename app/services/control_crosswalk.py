@@ -0,0 +1,202 @@
+"""
+Control crosswalk service for the UniSphere application.
+Loads the bundled mapping between security frameworks (NIST SP 800-53 as used by
+FedRAMP and FISMA, NIST SP 800-171 and CMMC, ISO/IEC 27001, SOC 2) into a graph of
+equivalence classes joined by partial-overlap edges, so a bid's evidence is
+evaluated once per class of equivalent controls rather than once per framework.
+"""
+
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.government import SecurityFramework
+from app.services.control_catalog import normalize_control_id
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Node = Tuple[str, str]
+
+# Frameworks whose IDs the catalog doesn't know, keyed as written
+_RAW_ID_FRAMEWORKS = {SecurityFramework.ISO_27001.value, SecurityFramework.SOC2.value}
+
+
+def control_node(framework: Any, requirement_id: Optional[str]) -> Optional[Node]:
+    """
+    The crosswalk node of a control: its framework and canonical ID.
+
+    FedRAMP and FISMA controls are their 800-53 controls, and CMMC practices their
+    800-171 requirements, so each control has one node whichever framework cites it.
+
+    Args:
+        framework: SecurityFramework or its value
+        requirement_id: Control ID as stored, e.g. "AC-2(1)", "IA.L2-3.5.3" or "A.8.5"
+
+    Returns:
+        Tuple of (framework value, control ID), or None for a requirement without a control ID
+    """
+    framework = framework.value if isinstance(framework, SecurityFramework) else str(framework or "")
+    requirement_id = (requirement_id or "").strip()
+    if not requirement_id:
+        return None
+    if framework in _RAW_ID_FRAMEWORKS:
+        return framework, requirement_id.upper()
+
+    normalized = normalize_control_id(requirement_id)
+    if not normalized:
+        return None
+    control_id, enhancement = normalized
+    if control_id[0].isdigit():
+        return SecurityFramework.NIST800_171.value, control_id
+    if ".L" in control_id:
+        return SecurityFramework.NIST800_171.value, control_id.split("-", 1)[1]
+    if enhancement:
+        control_id = f"{control_id}({enhancement})"
+    return SecurityFramework.NIST800_53.value, control_id
+
+
+class ControlCrosswalk:
+    """
+    Equivalence classes of controls across frameworks, and the partial overlaps between classes.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Args:
+            data: The parsed crosswalk file
+        """
+        self.version = data.get("version")
+        self.sources = data.get("sources", {})
+        self._parent: Dict[Node, Node] = {}
+        partial_edges: List[Tuple[Node, Node, float]] = []
+
+        for mapping in data.get("mappings", []):
+            for source_id, target_ids in mapping.get("pairs", {}).items():
+                source = control_node(mapping["source"], source_id)
+                for target_id in target_ids:
+                    target = control_node(mapping["target"], target_id)
+                    if not source or not target:
+                        logger.warning(f"Skipping unparseable crosswalk pair {source_id} -> {target_id}")
+                        continue
+                    if mapping.get("relation") == "equivalent":
+                        self._union(source, target)
+                    else:
+                        self._find(source)
+                        self._find(target)
+                        partial_edges.append((source, target, float(mapping.get("overlap", 0.5))))
+
+        self.classes: Dict[Node, List[Node]] = {}
+        for node in self._parent:
+            self.classes.setdefault(self._find(node), []).append(node)
+
+        # Overlaps between classes; where several controls of two classes overlap, the largest counts
+        self.overlaps: Dict[Node, Dict[Node, float]] = {}
+        for source, target, weight in partial_edges:
+            source, target = self._find(source), self._find(target)
+            if source == target:
+                continue
+            for a, b in ((source, target), (target, source)):
+                neighbours = self.overlaps.setdefault(a, {})
+                neighbours[b] = max(neighbours.get(b, 0.0), weight)
+
+    def _find(self, node: Node) -> Node:
+        parent = self._parent.setdefault(node, node)
+        if parent != node:
+            parent = self._parent[node] = self._find(parent)
+        return parent
+
+    def _union(self, a: Node, b: Node) -> None:
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            # Root classes at their 800-53 control, so class keys read as the common baseline
+            if root_a[0] == SecurityFramework.NIST800_53.value:
+                root_a, root_b = root_b, root_a
+            self._parent[root_a] = root_b
+
+    def class_key(self, framework: Any, requirement_id: Optional[str]) -> Optional[Node]:
+        """
+        The equivalence class of a control; controls the crosswalk lacks form a
+        class of their own, shared only with the same control cited by another framework.
+
+        Returns:
+            The class's key, or None for a requirement without a control ID
+        """
+        node = control_node(framework, requirement_id)
+        if node is None:
+            return None
+        return self._find(node) if node in self._parent else node
+
+    def overlapping(self, key: Node) -> Dict[Node, float]:
+        """Classes partially overlapping a class, with the overlap (0-1)."""
+        return self.overlaps.get(key, {})
+
+    def mappings(self, framework: Any, requirement_id: Optional[str]) -> Dict[str, Any]:
+        """
+        The controls a control maps to, for reviewers.
+
+        Returns:
+            Dict of equivalent controls and partially overlapping controls with their overlap
+        """
+        node = control_node(framework, requirement_id)
+        key = self.class_key(framework, requirement_id)
+        if key is None:
+            return {"equivalent": [], "partial": []}
+        return {
+            "equivalent": [
+                {"framework": other[0], "control_id": other[1]}
+                for other in self.classes.get(key, []) if other != node
+            ],
+            "partial": [
+                {"framework": other[0], "control_id": other[1], "overlap": weight}
+                for neighbour, weight in sorted(self.overlapping(key).items(), key=lambda entry: -entry[1])
+                for other in self.classes.get(neighbour, [neighbour])
+            ]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Crosswalk version, sources and graph size."""
+        return {
+            "version": self.version,
+            "sources": self.sources,
+            "controls": len(self._parent),
+            "classes": len(self.classes),
+            "partial_overlaps": sum(len(neighbours) for neighbours in self.overlaps.values()) // 2
+        }
+
+
+_crosswalk: Optional[ControlCrosswalk] = None
+_crosswalk_lock = threading.Lock()
+
+
+def load_control_crosswalk(path: Optional[str] = None) -> ControlCrosswalk:
+    """
+    Load the control crosswalk, replacing the one in use.
+
+    Args:
+        path: Crosswalk file; defaults to settings.SECURITY_CONTROL_CROSSWALK
+
+    Returns:
+        The crosswalk
+    """
+    global _crosswalk
+    path = path or settings.SECURITY_CONTROL_CROSSWALK
+    with open(path, encoding="utf-8") as f:
+        crosswalk = ControlCrosswalk(json.load(f))
+    with _crosswalk_lock:
+        _crosswalk = crosswalk
+    stats = crosswalk.stats()
+    logger.info(
+        f"Loaded control crosswalk {crosswalk.version}: {stats['classes']} classes "
+        f"of {stats['controls']} controls from {path}"
+    )
+    return crosswalk
+
+
+def get_control_crosswalk() -> ControlCrosswalk:
+    """The control crosswalk, loaded on first use if startup didn't load it."""
+    with _crosswalk_lock:
+        crosswalk = _crosswalk
+    return crosswalk or load_control_crosswalk()
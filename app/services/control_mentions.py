@@ -0,0 +1,338 @@
+"""
+Control mention service for the UniSphere application.
+Scans a bid's text once with an Aho-Corasick automaton built from the control
+catalog and lists of security terms, and stores an offset index of where the bid
+cites controls ("AC-2", "IA.L2-3.5.3"), security terms ("MFA", "FIPS 140-2") and
+certifications ("SOC 2 Type II"). The index points the security assessor at the
+passages citing each control and gives reviewers jump-to-evidence offsets.
+"""
+
+import bisect
+import hashlib
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.analysis import ControlMention, EvidenceLink
+from app.models.government import SecurityFramework, SecurityRequirement
+from app.services.bid_facts import claim_context
+from app.services.control_catalog import ControlCatalog, cites_nist_171, get_control_catalog
+from app.services.control_crosswalk import get_control_crosswalk
+from app.services.evidence_matrix import Evidence, split_passages
+from app.utils.aho_corasick import AhoCorasick
+from app.utils.db_bulk import bulk_insert
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bump when the scanner or its phrase lists change, so stored mentions are re-indexed
+SCANNER_VERSION = "1"
+
+# Security phrases a bid uses for what controls ask, with the 800-53 controls they evidence;
+# single-word terms come from the catalog's keywords
+SECURITY_PHRASES: Dict[str, List[str]] = {
+    "fips 140-2": ["SC-13"], "fips 140-3": ["SC-13"], "fips 199": ["RA-2"],
+    "multi-factor authentication": ["IA-2"], "multifactor authentication": ["IA-2"],
+    "two-factor authentication": ["IA-2"], "2fa": ["IA-2"], "single sign-on": ["IA-2"],
+    "encryption at rest": ["SC-28"], "encrypted at rest": ["SC-28"], "data at rest": ["SC-28"],
+    "encryption in transit": ["SC-8"], "encrypted in transit": ["SC-8"], "tls 1.2": ["SC-8"], "tls 1.3": ["SC-8"],
+    "penetration test": ["CA-8"], "penetration testing": ["CA-8"], "vulnerability scanning": ["RA-5"],
+    "incident response": ["IR-4"], "continuous monitoring": ["CA-7"], "authority to operate": ["CA-6"],
+    "least privilege": ["AC-6"], "role-based access": ["AC-3"], "account management": ["AC-2"],
+    "session lock": ["AC-11"], "audit logs": ["AU-2"], "audit logging": ["AU-2"],
+    "security awareness training": ["AT-2"], "background checks": ["PS-3"],
+    "configuration baseline": ["CM-2"], "baseline configuration": ["CM-2"],
+    "disaster recovery": ["CP-2"], "contingency plan": ["CP-2"], "supply chain risk": ["SR-2"],
+}
+
+# Certifications and attestations a bid claims, with the framework they evidence
+FRAMEWORK_PHRASES: Dict[str, SecurityFramework] = {
+    "fedramp": SecurityFramework.FEDRAMP, "fedramp high": SecurityFramework.FEDRAMP,
+    "fedramp moderate": SecurityFramework.FEDRAMP, "fedramp low": SecurityFramework.FEDRAMP,
+    "fisma": SecurityFramework.FISMA,
+    "nist 800-53": SecurityFramework.NIST800_53, "sp 800-53": SecurityFramework.NIST800_53,
+    "nist 800-171": SecurityFramework.NIST800_171, "sp 800-171": SecurityFramework.NIST800_171,
+    "cmmc": SecurityFramework.CMMC, "cmmc level 2": SecurityFramework.CMMC, "cmmc level 3": SecurityFramework.CMMC,
+    "hipaa": SecurityFramework.HIPAA,
+    "pci dss": SecurityFramework.PCI_DSS, "pci-dss": SecurityFramework.PCI_DSS,
+    "iso 27001": SecurityFramework.ISO_27001, "iso/iec 27001": SecurityFramework.ISO_27001,
+    "soc 2": SecurityFramework.SOC2, "soc2": SecurityFramework.SOC2,
+    "soc 2 type ii": SecurityFramework.SOC2, "soc 2 type 2": SecurityFramework.SOC2,
+}
+
+_ENHANCEMENT = re.compile(r"\s?\(\s?0*(\d{1,2})\s?\)")
+_PAGE_BREAK = re.compile("\f")
+
+# A matched phrase: (kind, canonical term, controls evidenced, framework value)
+Phrase = Tuple[str, str, Tuple[str, ...], Optional[str]]
+
+
+class ControlMentionScanner:
+    """
+    One automaton over every control ID of the catalog, in its usual spellings,
+    and every security term and certification phrase.
+    """
+
+    def __init__(self, catalog: ControlCatalog):
+        """
+        Args:
+            catalog: The control catalog the IDs and terms come from
+        """
+        self.catalog = catalog
+        phrases: Dict[str, Phrase] = {}
+        for control in catalog.controls.values():
+            phrase = ("control", control.control_id, (control.control_id,), control.framework.value)
+            phrases[control.control_id] = phrase
+            family, _, number = control.control_id.partition("-")
+            if control.framework == SecurityFramework.NIST800_53 and len(number) == 1:
+                phrases[f"{family}-0{number}"] = phrase
+        for term, control_ids in catalog.term_controls.items():
+            phrases[term] = ("keyword", term, tuple(control_ids), None)
+        for term, control_ids in SECURITY_PHRASES.items():
+            phrases[term] = ("keyword", term, tuple(control_ids), None)
+        for term, framework in FRAMEWORK_PHRASES.items():
+            phrases[term] = ("framework", term, (), framework.value)
+        self.automaton = AhoCorasick(phrases)
+
+    def scan(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Find the control mentions of a text in one pass.
+
+        Where matches overlap, the longest one starting first is kept, so "SOC 2 Type II"
+        is not also reported as "SOC 2". Bare 800-171 numbers follow the catalog's rule:
+        only in documents naming 800-171, CMMC or CUI, and never at the start of a line.
+
+        Args:
+            text: Extracted bid text; form feeds, if present, separate its pages
+
+        Returns:
+            Mentions in text order, each with kind, term, the controls it evidences,
+            framework, the text as written, its sentence, offsets and page
+        """
+        if not text:
+            return []
+        allow_171 = cites_nist_171(text)
+        matches = sorted(self.automaton.finditer(text), key=lambda match: (match[0], match[0] - match[1]))
+
+        mentions = []
+        covered_until = -1
+        page_breaks = [match.start() for match in _PAGE_BREAK.finditer(text)]
+        for start, end, (kind, term, control_ids, framework) in matches:
+            if start < covered_until:
+                continue
+            if framework == SecurityFramework.NIST800_171.value and kind == "control":
+                line_start = text.rfind("\n", 0, start) + 1
+                if not allow_171 or not text[line_start:start].strip():
+                    continue
+            if framework == SecurityFramework.NIST800_53.value and kind == "control":
+                enhancement = _ENHANCEMENT.match(text, end)
+                if enhancement:
+                    end = enhancement.end()
+                    term = f"{term}({int(enhancement.group(1))})"
+                    control_ids = (term,)
+            covered_until = end
+            context_start, context_end = claim_context(text, start, end)
+            mentions.append({
+                "kind": kind,
+                "term": term,
+                "control_ids": list(control_ids),
+                "framework": framework,
+                "text": text[start:end][:255],
+                "context": " ".join(text[context_start:context_end].split()),
+                "char_start": start,
+                "char_end": end,
+                "page": bisect.bisect_left(page_breaks, start) + 1 if page_breaks else None
+            })
+        return mentions
+
+
+_scanner: Optional[ControlMentionScanner] = None
+_scanner_lock = threading.Lock()
+
+
+def get_mention_scanner() -> ControlMentionScanner:
+    """The scanner of the current control catalog, built on first use and when the catalog is reloaded."""
+    global _scanner
+    catalog = get_control_catalog()
+    with _scanner_lock:
+        if _scanner is None or _scanner.catalog is not catalog:
+            _scanner = ControlMentionScanner(catalog)
+            logger.info(f"Built control mention scanner: {len(_scanner.automaton)} states")
+        return _scanner
+
+
+def source_hash(text: str) -> str:
+    """Identifies the bid text, scanner version and catalog version mentions were indexed from."""
+    catalog_version = get_control_catalog().version
+    return hashlib.sha256(f"{SCANNER_VERSION}:{catalog_version}:{text}".encode("utf-8")).hexdigest()
+
+
+def store_control_mentions(db: Session, bid_id: int, text: str) -> int:
+    """
+    Index a bid's control mentions and replace its stored ones, unless they are
+    already current for this text. Commits.
+
+    Args:
+        db: Database session
+        bid_id: ID of the bid
+        text: Extracted bid text
+
+    Returns:
+        Number of mention rows stored, or -1 when the stored mentions were already current
+    """
+    digest = source_hash(text)
+    current = (
+        db.query(ControlMention.id)
+        .filter(ControlMention.bid_id == bid_id, ControlMention.source_hash == digest)
+        .first()
+    )
+    if current:
+        return -1
+
+    rows = []
+    for mention in get_mention_scanner().scan(text):
+        row = {key: value for key, value in mention.items() if key != "control_ids"}
+        for control_id in mention["control_ids"] or [None]:
+            rows.append({**row, "control_id": control_id, "bid_id": bid_id, "source_hash": digest})
+    db.query(ControlMention).filter(ControlMention.bid_id == bid_id).delete(synchronize_session=False)
+    stored = bulk_insert(db, ControlMention, rows)
+    db.commit()
+    logger.info(f"Indexed {stored} control mentions of bid {bid_id}")
+    return stored
+
+
+def _control_keys(framework: Optional[str], control_id: Optional[str]) -> set:
+    """Crosswalk classes a control ID evidences: its own and, for an enhancement, its base control's."""
+    crosswalk = get_control_crosswalk()
+    keys = set()
+    for candidate in (control_id, (control_id or "").split("(")[0]):
+        key = crosswalk.class_key(framework, candidate)
+        if key:
+            keys.add(key)
+    return keys
+
+
+def list_control_mentions(
+    db: Session,
+    bid_id: int,
+    control_id: Optional[str] = None,
+    kind: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Stored mentions of a bid, in text order.
+
+    Args:
+        db: Database session
+        bid_id: ID of the bid
+        control_id: Only mentions evidencing this control or one equivalent to it
+            through the crosswalk, e.g. "AC-7" also finds "3.1.8"
+        kind: Only mentions of this kind
+
+    Returns:
+        Mentions with their offsets, page and sentence
+    """
+    query = db.query(ControlMention).filter(ControlMention.bid_id == bid_id)
+    if kind:
+        query = query.filter(ControlMention.kind == kind)
+    mentions = query.order_by(ControlMention.char_start, ControlMention.id).all()
+
+    if control_id:
+        wanted = _control_keys(None, control_id)
+        mentions = [
+            mention for mention in mentions
+            if mention.control_id and wanted & _control_keys(mention.framework, mention.control_id)
+        ]
+    return [mention_dict(mention) for mention in mentions]
+
+
+def mention_dict(mention: ControlMention) -> Dict[str, Any]:
+    """A stored mention as a JSON-serialisable dict."""
+    return {
+        "id": mention.id,
+        "kind": mention.kind,
+        "term": mention.term,
+        "control_id": mention.control_id,
+        "framework": mention.framework,
+        "text": mention.text,
+        "context": mention.context,
+        "page": mention.page,
+        "char_start": mention.char_start,
+        "char_end": mention.char_end
+    }
+
+
+def cited_evidence(
+    db: Session,
+    bid_id: int,
+    bid_text: str,
+    requirements: List[SecurityRequirement],
+    evidence: Evidence
+) -> Evidence:
+    """
+    Put the bid passages citing each security control ahead of its BM25 evidence.
+
+    A passage counts for a control when it mentions the control, a control
+    equivalent to it through the crosswalk, or a security term evidencing one; a
+    mention of a partially overlapping control counts half. At most
+    settings.CONTROL_MENTION_EVIDENCE_PASSAGES cited passages are added per control.
+
+    Args:
+        db: Database session
+        bid_id: ID of the bid, whose mentions are already stored
+        bid_text: Extracted bid text
+        requirements: Security requirements to select evidence for
+        evidence: The bid's evidence matrix
+
+    Returns:
+        A copy of the evidence with the cited passages first; they are not persisted
+    """
+    mentions = (
+        db.query(ControlMention.framework, ControlMention.control_id, ControlMention.char_start)
+        .filter(ControlMention.bid_id == bid_id, ControlMention.control_id.isnot(None))
+        .all()
+    )
+    if not mentions or not requirements:
+        return evidence
+
+    crosswalk = get_control_crosswalk()
+    passages = split_passages(bid_text)
+    passage_starts = [start for start, _ in passages]
+    cited: Dict[Tuple[str, str], Dict[int, int]] = {}  # class key -> passage index -> mentions
+    for framework, control_id, char_start in mentions:
+        passage_index = bisect.bisect_right(passage_starts, char_start) - 1
+        if passage_index < 0 or char_start >= passages[passage_index][1]:
+            continue
+        for key in _control_keys(framework, control_id):
+            counts = cited.setdefault(key, {})
+            counts[passage_index] = counts.get(passage_index, 0) + 1
+
+    augmented = dict(evidence)
+    limit = settings.CONTROL_MENTION_EVIDENCE_PASSAGES
+    for requirement in requirements:
+        direct = _control_keys(requirement.framework.value, requirement.requirement_id)
+        scores: Dict[int, float] = {}
+        for key in direct:
+            for passage_index, count in cited.get(key, {}).items():
+                scores[passage_index] = scores.get(passage_index, 0.0) + count
+            for neighbour in crosswalk.overlapping(key):
+                for passage_index, count in cited.get(neighbour, {}).items():
+                    scores[passage_index] = scores.get(passage_index, 0.0) + count / 2
+        if not scores:
+            continue
+
+        best = sorted(scores, key=lambda index: (-scores[index], index))[:limit]
+        links = [
+            EvidenceLink(
+                bid_id=bid_id, item_type="security", item_id=requirement.id, rank=rank, score=scores[index],
+                passage_index=index, passage_start=passages[index][0], passage_end=passages[index][1],
+                passage_text=bid_text[passages[index][0]:passages[index][1]]
+            )
+            for rank, index in enumerate(best)
+        ]
+        existing = [link for link in evidence.get(("security", requirement.id), []) if link.passage_index not in best]
+        augmented[("security", requirement.id)] = links + existing
+    return augmented
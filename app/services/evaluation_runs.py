@@ -0,0 +1,223 @@
+"""
+Evaluation run service for the UniSphere application.
+Checkpoints every finished requirement, specification and stage of a bid evaluation
+as it completes, so an interrupted evaluation can be resumed from the first
+unfinished item and its progress can be followed while it runs.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.evaluation import EvaluationRun, EvaluationCheckpoint
+from app.utils.db_bulk import bulk_upsert
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Checkpoint item types
+REQUIREMENT = "requirement"
+TECH_SPEC = "tech_spec"
+STAGE = "stage"
+
+# Run statuses
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def _last_activity(db: Session, run: EvaluationRun) -> datetime:
+    """Time of the run's latest checkpoint or status change."""
+    last_checkpoint = (
+        db.query(func.max(EvaluationCheckpoint.created_at))
+        .filter(EvaluationCheckpoint.run_id == run.id)
+        .scalar()
+    )
+    return max(filter(None, (run.updated_at, run.started_at, last_checkpoint)))
+
+
+def _is_stale(db: Session, run: EvaluationRun) -> bool:
+    """Whether a running run has made no progress for long enough to be presumed dead."""
+    timeout = timedelta(seconds=settings.EVALUATION_RUN_STALE_SECONDS)
+    return datetime.utcnow() - _last_activity(db, run) > timeout
+
+
+def start_run(
+    db: Session,
+    bid_id: int,
+    total_items: int,
+    resume: bool = True
+) -> Tuple[Optional[EvaluationRun], Dict[str, Dict[str, Any]]]:
+    """
+    Start an evaluation run for a bid, or resume its unfinished one.
+
+    Args:
+        db: Database session
+        bid_id: ID of the bid
+        total_items: Number of requirements and specs to evaluate
+        resume: Resume the latest failed or abandoned run instead of starting over
+
+    Returns:
+        The run, or None when another evaluation of the bid is still making progress,
+        and the checkpointed results of a resumed run by item type and item ID
+    """
+    unfinished = (
+        db.query(EvaluationRun)
+        .filter(EvaluationRun.bid_id == bid_id, EvaluationRun.status != COMPLETED)
+        .order_by(EvaluationRun.id.desc())
+        .first()
+    )
+
+    if unfinished and unfinished.status == RUNNING and not _is_stale(db, unfinished):
+        logger.warning(f"Bid {bid_id} is already being evaluated by run {unfinished.id}")
+        return None, {}
+
+    if unfinished and resume:
+        unfinished.status = RUNNING
+        unfinished.error = None
+        unfinished.attempts = (unfinished.attempts or 1) + 1
+        unfinished.total_items = total_items
+        checkpoints = load_checkpoints(db, unfinished.id)
+        db.commit()
+        done = len(checkpoints[REQUIREMENT]) + len(checkpoints[TECH_SPEC])
+        logger.info(f"Resuming evaluation run {unfinished.id} of bid {bid_id} (attempt {unfinished.attempts}, {done} items done)")
+        return unfinished, checkpoints
+
+    if unfinished:
+        unfinished.status = FAILED
+        unfinished.error = unfinished.error or "Superseded by a new evaluation run"
+        unfinished.finished_at = datetime.utcnow()
+
+    run = EvaluationRun(bid_id=bid_id, status=RUNNING, total_items=total_items)
+    db.add(run)
+    db.commit()
+    return run, {REQUIREMENT: {}, TECH_SPEC: {}, STAGE: {}}
+
+
+def load_checkpoints(db: Session, run_id: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Results checkpointed by a run.
+
+    Args:
+        db: Database session
+        run_id: ID of the evaluation run
+
+    Returns:
+        Mapping of item type to a mapping of item ID to result
+    """
+    checkpoints = {REQUIREMENT: {}, TECH_SPEC: {}, STAGE: {}}
+    rows = (
+        db.query(EvaluationCheckpoint.item_type, EvaluationCheckpoint.item_id, EvaluationCheckpoint.result)
+        .filter(EvaluationCheckpoint.run_id == run_id)
+        .all()
+    )
+    for item_type, item_id, result in rows:
+        checkpoints.setdefault(item_type, {})[item_id] = result
+    return checkpoints
+
+
+def record_checkpoints(db: Session, run_id: int, item_type: str, results: Dict[str, Any]) -> int:
+    """
+    Checkpoint several results at once; items the run already has are kept.
+
+    The caller commits.
+
+    Returns:
+        Number of rows written
+    """
+    return bulk_upsert(db, EvaluationCheckpoint, [
+        {"run_id": run_id, "item_type": item_type, "item_id": str(item_id), "result": result}
+        for item_id, result in results.items()
+    ], key_columns=("run_id", "item_type", "item_id"), update_columns=[])
+
+
+def checkpoint_writer(db: Session, run_id: int, item_type: str) -> Callable[[str, Any], None]:
+    """
+    Callback that commits one result at a time, for use inside an evaluation stage.
+
+    Args:
+        db: A session owned by the stage's thread
+        run_id: ID of the evaluation run
+        item_type: REQUIREMENT or TECH_SPEC
+
+    Returns:
+        Function taking an item ID and its result
+    """
+    def write(item_id: str, result: Any) -> None:
+        try:
+            bulk_upsert(db, EvaluationCheckpoint, [
+                {"run_id": run_id, "item_type": item_type, "item_id": str(item_id), "result": result}
+            ], key_columns=("run_id", "item_type", "item_id"), update_columns=("result",))
+            db.commit()
+        except Exception as e:
+            # A lost checkpoint only costs a repeated call on resume
+            logger.error(f"Error checkpointing {item_type} {item_id} of run {run_id}: {str(e)}")
+            db.rollback()
+    return write
+
+
+def finish_run(db: Session, run: EvaluationRun, error: Optional[str] = None) -> None:
+    """
+    Mark a run completed, or failed with an error; the caller commits.
+    """
+    run.status = FAILED if error else COMPLETED
+    run.error = error
+    run.finished_at = datetime.utcnow()
+
+
+def evaluation_progress(db: Session, bid_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Progress of a bid's latest evaluation run.
+
+    Args:
+        db: Database session
+        bid_id: ID of the bid
+
+    Returns:
+        Status, item counts, finished stages and timings, or None if the bid was never evaluated
+    """
+    run = (
+        db.query(EvaluationRun)
+        .filter(EvaluationRun.bid_id == bid_id)
+        .order_by(EvaluationRun.id.desc())
+        .first()
+    )
+    if not run:
+        return None
+
+    counts = dict(
+        db.query(EvaluationCheckpoint.item_type, func.count(EvaluationCheckpoint.id))
+        .filter(EvaluationCheckpoint.run_id == run.id)
+        .group_by(EvaluationCheckpoint.item_type)
+        .all()
+    )
+    stages = [
+        item_id for (item_id,) in
+        db.query(EvaluationCheckpoint.item_id)
+        .filter(EvaluationCheckpoint.run_id == run.id, EvaluationCheckpoint.item_type == STAGE)
+        .order_by(EvaluationCheckpoint.id)
+    ]
+    completed_items = counts.get(REQUIREMENT, 0) + counts.get(TECH_SPEC, 0)
+
+    return {
+        "run_id": run.id,
+        "bid_id": bid_id,
+        "analysis_id": run.analysis_id,
+        "status": run.status,
+        "stale": run.status == RUNNING and _is_stale(db, run),
+        "attempts": run.attempts,
+        "total_items": run.total_items,
+        "completed_items": completed_items,
+        "requirements_done": counts.get(REQUIREMENT, 0),
+        "tech_specs_done": counts.get(TECH_SPEC, 0),
+        "progress": round(completed_items / run.total_items, 3) if run.total_items else 1.0,
+        "stages_done": stages,
+        "error": run.error,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "updated_at": _last_activity(db, run).isoformat(),
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None
+    }
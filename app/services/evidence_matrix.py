@@ -0,0 +1,333 @@
+"""
+Evidence matrix service for the UniSphere application.
+This module scores every requirement, technical specification and security control
+of an RFP against every passage of a vendor bid in one vectorised pass, and persists
+the top-k passages per item. All evaluators read their bid evidence from it, so the
+selection cost is paid once per bid rather than once per evaluator per item.
+"""
+
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.analysis import EvidenceMatrix, EvidenceLink
+from app.models.document import VendorBid, RFPDocument, Requirement, TechnicalSpecification
+from app.models.government import SecurityRequirement
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"[.!?]\s")
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to
+will with shall must should may can all any each other such their these those than
+which who vendor contractor offeror proposal bid solution system provide provided
+""".split())
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+RFPItem = Tuple[str, int, str]  # (item_type, item_id, text)
+Evidence = Dict[Tuple[str, int], List[EvidenceLink]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case content tokens; keeps identifiers such as "ac-2" or "99.9"."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def split_passages(text: str, passage_size: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Split text into passages, preferring paragraph, then sentence, then word breaks.
+
+    Args:
+        text: Bid text
+        passage_size: Maximum passage length in characters
+
+    Returns:
+        List of (start, end) character offsets
+    """
+    passage_size = passage_size or settings.EVIDENCE_PASSAGE_SIZE
+    passages = []
+    start = 0
+    length = len(text)
+
+    while start < length:
+        end = min(start + passage_size, length)
+        if end < length:
+            window = text[start + passage_size // 2:end]
+            breaks = [m.end() for m in _PARAGRAPH_BREAK.finditer(window)]
+            if not breaks:
+                breaks = [m.end() for m in _SENTENCE_END.finditer(window)]
+            if not breaks:
+                space = window.rfind(" ")
+                breaks = [space + 1] if space != -1 else []
+            if breaks:
+                end = start + passage_size // 2 + breaks[-1]
+        if text[start:end].strip():
+            passages.append((start, end))
+        start = end
+
+    return passages
+
+
+def collect_rfp_items(rfp: RFPDocument, db: Session) -> List[RFPItem]:
+    """
+    Gather the requirements, technical specifications and security controls of an RFP.
+
+    Args:
+        rfp: RFP document
+        db: Database session
+
+    Returns:
+        List of (item_type, item_id, text) tuples
+    """
+    items: List[RFPItem] = []
+
+    for req in db.query(Requirement).filter(Requirement.rfp_id == rfp.id).all():
+        items.append(("requirement", req.id, f"{req.category or ''} {req.description or ''}"))
+
+    for spec in db.query(TechnicalSpecification).filter(TechnicalSpecification.rfp_id == rfp.id).all():
+        items.append((
+            "tech_spec", spec.id,
+            f"{spec.name or ''} {spec.description or ''} {spec.measurement_unit or ''}"
+        ))
+
+    if rfp.agency_id:
+        security_requirements = (
+            db.query(SecurityRequirement)
+            .filter(SecurityRequirement.agency_id == rfp.agency_id)
+            .all()
+        )
+        for control in security_requirements:
+            items.append((
+                "security", control.id,
+                f"{control.requirement_id or ''} {control.title or ''} {control.description or ''}"
+            ))
+
+    return items
+
+
+def score_passages(item_texts: List[str], passage_texts: List[str]) -> np.ndarray:
+    """
+    Score every item against every passage with BM25.
+
+    The term-frequency matrix is restricted to the items' vocabulary, so its size
+    depends on the RFP rather than on the length of the bid.
+
+    Args:
+        item_texts: Query text of each item
+        passage_texts: Text of each passage
+
+    Returns:
+        Array of shape (items, passages) with relevance scores
+    """
+    item_tokens = [set(tokenize(text)) for text in item_texts]
+    vocabulary = {term: i for i, term in enumerate(sorted(set().union(*item_tokens)))} if item_tokens else {}
+    if not vocabulary or not passage_texts:
+        return np.zeros((len(item_texts), len(passage_texts)), dtype=np.float32)
+
+    term_freq = np.zeros((len(passage_texts), len(vocabulary)), dtype=np.float32)
+    lengths = np.zeros(len(passage_texts), dtype=np.float32)
+    for p, text in enumerate(passage_texts):
+        tokens = tokenize(text)
+        lengths[p] = len(tokens)
+        columns = [vocabulary[token] for token in tokens if token in vocabulary]
+        if columns:
+            np.add.at(term_freq[p], columns, 1)
+
+    passage_count = len(passage_texts)
+    doc_freq = np.count_nonzero(term_freq, axis=0)
+    idf = np.log1p((passage_count - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+    avg_length = max(float(lengths.mean()), 1.0)
+    norm = _K1 * (1 - _B + _B * lengths / avg_length)
+    saturated = term_freq * (_K1 + 1) / (term_freq + norm[:, None])
+
+    queries = np.zeros((len(item_texts), len(vocabulary)), dtype=np.float32)
+    for i, tokens in enumerate(item_tokens):
+        queries[i, [vocabulary[token] for token in tokens]] = 1.0
+    queries *= idf
+
+    return queries @ saturated.T
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest-scoring passages per row, best first."""
+    k = min(k, scores.shape[1])
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def _digest(parts: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def build_evidence_matrix(
+    bid: VendorBid,
+    bid_text: str,
+    db: Session,
+    items: Optional[List[RFPItem]] = None,
+    top_k: Optional[int] = None
+) -> Evidence:
+    """
+    Build (or reuse) the evidence matrix for a bid and return its top-k evidence.
+
+    Args:
+        bid: Vendor bid
+        bid_text: Extracted text of the bid
+        db: Database session
+        items: RFP items to score; defaults to every item of the bid's RFP
+        top_k: Passages to keep per item
+
+    Returns:
+        Mapping of (item_type, item_id) to the item's evidence links, best first
+    """
+    top_k = top_k or settings.EVIDENCE_TOP_K
+    if items is None:
+        items = collect_rfp_items(bid.rfp_document, db)
+
+    bid_text_hash = _digest([bid_text])
+    items_hash = _digest(f"{item_type}:{item_id}:{text}" for item_type, item_id, text in sorted(items))
+
+    matrix = db.query(EvidenceMatrix).filter(EvidenceMatrix.bid_id == bid.id).first()
+    if matrix and matrix.bid_text_hash == bid_text_hash and matrix.items_hash == items_hash and matrix.top_k == top_k:
+        return load_evidence(db, bid.id)
+
+    if matrix:
+        db.delete(matrix)
+        db.flush()
+
+    passages = split_passages(bid_text)
+    passage_texts = [bid_text[start:end] for start, end in passages]
+    scores = score_passages([text for _, _, text in items], passage_texts)
+
+    matrix = EvidenceMatrix(
+        bid_id=bid.id,
+        bid_text_hash=bid_text_hash,
+        items_hash=items_hash,
+        passage_count=len(passages),
+        item_count=len(items),
+        top_k=top_k
+    )
+    db.add(matrix)
+    db.flush()
+
+    links = []
+    if items and passages:
+        best = _top_k(scores, top_k)
+        for row, (item_type, item_id, _) in enumerate(items):
+            for rank, passage_index in enumerate(best[row]):
+                score = float(scores[row, passage_index])
+                if score <= 0:
+                    break
+                start, end = passages[passage_index]
+                links.append(EvidenceLink(
+                    matrix_id=matrix.id,
+                    bid_id=bid.id,
+                    item_type=item_type,
+                    item_id=item_id,
+                    rank=rank,
+                    score=score,
+                    passage_index=int(passage_index),
+                    passage_start=start,
+                    passage_end=end,
+                    passage_text=passage_texts[passage_index]
+                ))
+    db.add_all(links)
+    db.commit()
+
+    logger.info(f"Built evidence matrix for bid {bid.id}: {len(items)} items x {len(passages)} passages, {len(links)} links kept")
+    return load_evidence(db, bid.id)
+
+
+def load_evidence(db: Session, bid_id: int) -> Evidence:
+    """
+    Load the persisted top-k evidence of a bid with one query.
+
+    Args:
+        db: Database session
+        bid_id: ID of the bid
+
+    Returns:
+        Mapping of (item_type, item_id) to the item's evidence links, best first
+    """
+    evidence: Evidence = defaultdict(list)
+    links = (
+        db.query(EvidenceLink)
+        .filter(EvidenceLink.bid_id == bid_id)
+        .order_by(EvidenceLink.item_type, EvidenceLink.item_id, EvidenceLink.rank)
+        .all()
+    )
+    for link in links:
+        evidence[(link.item_type, link.item_id)].append(link)
+    return dict(evidence)
+
+
+def evidence_text(evidence: Evidence, item_type: str, item_id: int, max_chars: Optional[int] = None) -> str:
+    """
+    Join the evidence passages of one item, best first, up to a character budget.
+
+    Args:
+        evidence: Evidence mapping from build_evidence_matrix or load_evidence
+        item_type: "requirement", "tech_spec" or "security"
+        item_id: ID of the item
+        max_chars: Character budget
+
+    Returns:
+        Evidence text, or an empty string when no passage matched
+    """
+    max_chars = max_chars or settings.EVIDENCE_MAX_CHARS
+    parts = []
+    size = 0
+    for link in evidence.get((item_type, item_id), []):
+        if size + len(link.passage_text) > max_chars:
+            break
+        parts.append(link.passage_text.strip())
+        size += len(link.passage_text)
+    return "\n...\n".join(parts)
+
+
+def evidence_digest(evidence: Evidence, item_types: Iterable[str], max_chars: Optional[int] = None) -> str:
+    """
+    The best passage of every item of the given types, without repeats.
+
+    Args:
+        evidence: Evidence mapping from build_evidence_matrix or load_evidence
+        item_types: Item types to include
+        max_chars: Character budget
+
+    Returns:
+        Evidence text in bid order
+    """
+    max_chars = max_chars or settings.EVIDENCE_MAX_CHARS
+    item_types = set(item_types)
+    best = {}
+    for (item_type, _), links in evidence.items():
+        if item_type in item_types and links:
+            best[links[0].passage_index] = links[0]
+
+    parts = []
+    size = 0
+    for passage_index in sorted(best):
+        text = best[passage_index].passage_text.strip()
+        if size + len(text) > max_chars:
+            break
+        parts.append(text)
+        size += len(text)
+    return "\n...\n".join(parts)
@@ -13,7 +13,10 @@ from sqlalchemy.orm import Session
 
 from app.database import db
 from app.models.review import HumanReview, ReviewStatus, ReviewPriority, ReviewType
-from app.models.document import VendorBid, RFPDocument, AnalysisResult
+from app.models.document import VendorBid, RFPDocument
+from app.services.analysis_versions import current_analysis, new_analysis
+from app.services.score_overrides import remove_score_override, set_score_override, rescore_bid
+from app.services.scoring import apply_overrides, load_overrides
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -241,7 +244,7 @@ def submit_review(
         # Update the related bid's analysis with the human-reviewed assessment if applicable
         if review.bid_id and status in [ReviewStatus.APPROVED, ReviewStatus.MODIFIED]:
             if review.review_type == ReviewType.BID_EVALUATION:
-                _update_bid_evaluation(review.bid_id, human_assessment or review.ai_assessment, session)
+                _update_bid_evaluation(review.bid_id, human_assessment or review.ai_assessment, session, review)
             elif review.review_type == ReviewType.SECURITY_ASSESSMENT:
                 _update_bid_security(review.bid_id, human_assessment or review.ai_assessment, session)
             elif review.review_type == ReviewType.RISK_ASSESSMENT:
@@ -260,31 +263,68 @@ def submit_review(
         return False, str(e)
 
 
-def _update_bid_evaluation(bid_id: int, assessment: Dict[str, Any], session: Session) -> None:
-    """Helper function to update bid evaluation with human-reviewed assessment."""
-    # Implementation depends on specific data structure of assessment
-    # This is a simplified example
+def _update_bid_evaluation(
+    bid_id: int,
+    assessment: Dict[str, Any],
+    session: Session,
+    review: Optional[HumanReview] = None
+) -> None:
+    """
+    Helper function to update bid evaluation with human-reviewed assessment.
+    
+    Requirement and spec scores the reviewer changed become score overrides and the
+    bid is rescored from its stored results; the model's results themselves are kept.
+    Restoring the model's score of an overridden item removes its override.
+    """
     bid = session.query(VendorBid).filter(VendorBid.id == bid_id).first()
     if not bid:
         return
     
-    # Update total score if provided
-    if "overall_score" in assessment:
-        bid.total_score = assessment["overall_score"]
-    
-    # Get or create analysis result
-    analysis = session.query(AnalysisResult).filter(AnalysisResult.bid_id == bid_id).first()
+    # Get or create the bid's current analysis
+    analysis = current_analysis(session, bid)
     if not analysis:
-        analysis = AnalysisResult(bid_id=bid_id)
-        session.add(analysis)
+        analysis = new_analysis(session, bid_id, use_openai=False)
+        analysis.model_version = "human review"
+        session.flush()
+        bid.current_analysis_id = analysis.id
+    
+    # Record changed item scores as overrides, and drop overrides the reviewer reverted
+    overrides = load_overrides(session, [bid.id]).get(bid.id, [])
+    overridden = {(override.item_type, override.item_id) for override in overrides}
+    effective_requirements, effective_specs, _ = apply_overrides(
+        analysis.requirement_compliance, analysis.technical_compliance, overrides
+    )
+    effective = {"requirement_compliance": effective_requirements, "technical_compliance": effective_specs}
+    changed = 0
+    for item_type, field in (("requirement", "requirement_compliance"), ("tech_spec", "technical_compliance")):
+        stored = getattr(analysis, field) or {}
+        for item_id, result in (assessment.get(field) or {}).items():
+            score = (result or {}).get("score")
+            if score is None or (effective[field].get(str(item_id)) or {}).get("score") == score:
+                continue
+            if (item_type, str(item_id)) in overridden and (stored.get(str(item_id)) or {}).get("score") == score:
+                remove_score_override(session, bid, item_type, str(item_id))
+                changed += 1
+                continue
+            try:
+                set_score_override(
+                    session, bid, item_type, str(item_id), float(score),
+                    explanation=(result or {}).get("explanation"),
+                    review_id=review.id if review else None,
+                    created_by=review.completed_by if review else None
+                )
+                changed += 1
+            except ValueError as e:
+                logger.warning(f"Ignoring reviewed score of {item_type} {item_id} for bid {bid_id}: {str(e)}")
+    
+    if changed:
+        rescore_bid(session, bid)
+    elif "overall_score" in assessment:
+        # Update total score if provided
+        bid.total_score = assessment["overall_score"]
+        analysis.overall_score = assessment["overall_score"]
     
     # Update analysis fields with assessment data
-    if "requirement_compliance" in assessment:
-        analysis.requirement_compliance = assessment["requirement_compliance"]
-    
-    if "technical_compliance" in assessment:
-        analysis.technical_compliance = assessment["technical_compliance"]
-    
     if "strengths" in assessment:
         analysis.strengths = assessment["strengths"]
     
@@ -293,9 +333,6 @@ def _update_bid_evaluation(bid_id: int, assessment: Dict[str, Any], session: Ses
     
     if "gap_analysis" in assessment:
         analysis.gap_analysis = assessment["gap_analysis"]
-    
-    if "overall_score" in assessment:
-        analysis.overall_score = assessment["overall_score"]
 
 
 def _update_bid_security(bid_id: int, assessment: Dict[str, Any], session: Session) -> None:
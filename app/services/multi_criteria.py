@@ -0,0 +1,225 @@
+"""
+Multi-criteria bid ranking service for the UniSphere application.
+Compares an RFP's bids on cost, compliance, security and risk at once: the Pareto
+frontier of bids no other bid beats on every criterion, how many bids each one
+dominates, and a TOPSIS ranking by closeness to the ideal bid. Results are cached
+per RFP and recomputed when any bid's analysis, scores or attributes change.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.document import VendorBid
+from app.models.government import BidSecurityCompliance
+from app.models.review import ScoreOverride
+from app.services.scoring import score_rfp_bids, scoring_weights
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Criteria and whether a higher value is better
+CRITERIA = {
+    "cost": False,
+    "compliance": True,
+    "security": True,
+    "risk": False,
+}
+
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _bid_state(db: Session, rfp_id: int) -> tuple:
+    """
+    Cheap inputs that change whenever a bid's ranking inputs do, for the cache key,
+    plus the bids' security averages, which are needed anyway.
+    """
+    bids = (
+        db.query(VendorBid.id, VendorBid.vendor_name, VendorBid.current_analysis_id, VendorBid.total_score,
+                 VendorBid.proposed_cost, VendorBid.risk_score)
+        .filter(VendorBid.rfp_id == rfp_id)
+        .order_by(VendorBid.id)
+        .all()
+    )
+    bid_ids = [bid.id for bid in bids]
+    security = dict(
+        db.query(BidSecurityCompliance.bid_id, func.avg(BidSecurityCompliance.compliance_score))
+        .filter(BidSecurityCompliance.bid_id.in_(bid_ids))
+        .group_by(BidSecurityCompliance.bid_id)
+        .all()
+    ) if bid_ids else {}
+    overrides = (
+        db.query(func.count(ScoreOverride.id), func.max(ScoreOverride.updated_at))
+        .filter(ScoreOverride.bid_id.in_(bid_ids))
+        .one()
+    ) if bid_ids else (0, None)
+    return bids, security, overrides
+
+
+def _cache_key(rfp_id: int, bids: List, security: Dict, overrides: tuple, criteria: List[str], weights: Dict[str, float]) -> str:
+    state = {
+        "rfp_id": rfp_id,
+        "bids": [list(bid) for bid in bids],
+        "security": sorted((bid_id, round(float(score or 0), 4)) for bid_id, score in security.items()),
+        "overrides": [overrides[0], str(overrides[1])],
+        "criteria": criteria,
+        "weights": weights,
+        "scoring": scoring_weights()
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def pareto_dominance(values: np.ndarray, higher_is_better: np.ndarray) -> np.ndarray:
+    """
+    Dominance matrix of bids over criteria.
+
+    Args:
+        values: Bids × criteria matrix
+        higher_is_better: Per criterion, whether higher values are better
+
+    Returns:
+        Boolean bids × bids matrix whose entry [i, j] says bid i dominates bid j:
+        at least as good on every criterion and better on one
+    """
+    oriented = np.where(higher_is_better, values, -values)
+    at_least = (oriented[:, None, :] >= oriented[None, :, :]).all(axis=2)
+    better = (oriented[:, None, :] > oriented[None, :, :]).any(axis=2)
+    return at_least & better
+
+
+def topsis(values: np.ndarray, higher_is_better: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    TOPSIS closeness of each bid to the ideal bid.
+
+    Args:
+        values: Bids × criteria matrix
+        higher_is_better: Per criterion, whether higher values are better
+        weights: Per-criterion weights
+
+    Returns:
+        Closeness per bid in [0, 1], 1 for a bid that is best on every criterion
+    """
+    norms = np.linalg.norm(values, axis=0)
+    normalised = np.divide(values, norms, out=np.zeros_like(values), where=norms > 0) * weights
+    ideal = np.where(higher_is_better, normalised.max(axis=0), normalised.min(axis=0))
+    anti_ideal = np.where(higher_is_better, normalised.min(axis=0), normalised.max(axis=0))
+    to_ideal = np.linalg.norm(normalised - ideal, axis=1)
+    to_anti_ideal = np.linalg.norm(normalised - anti_ideal, axis=1)
+    total = to_ideal + to_anti_ideal
+    return np.divide(to_anti_ideal, total, out=np.ones_like(total), where=total > 0)
+
+
+def rank_bids(
+    db: Session,
+    rfp_id: int,
+    criteria: Optional[List[str]] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    Pareto frontier, dominance counts and TOPSIS ranks of an RFP's bids.
+
+    Bids without an analysis are left out. A requested criterion some remaining bid
+    has no value for (no proposed cost, no security assessment or risk prediction)
+    is skipped and reported, rather than guessed.
+
+    Args:
+        db: Database session
+        rfp_id: ID of the RFP
+        criteria: Criteria to compare on; defaults to all of CRITERIA
+        weights: TOPSIS weight per criterion; defaults to settings.MCDA_WEIGHTS
+
+    Returns:
+        Criteria used and skipped, and per bid its criterion values, dominance
+        counts, frontier membership, TOPSIS closeness and rank
+
+    Raises:
+        ValueError: For unknown criteria or negative weights
+    """
+    criteria = list(criteria or CRITERIA)
+    unknown = set(criteria) - set(CRITERIA)
+    if unknown:
+        raise ValueError(f"Unknown criteria: {', '.join(sorted(unknown))}")
+    weights = {name: float(value) for name, value in {**settings.MCDA_WEIGHTS, **(weights or {})}.items() if name in criteria}
+    if any(value < 0 for value in weights.values()):
+        raise ValueError("Criterion weights must be non-negative")
+
+    bids, security, overrides = _bid_state(db, rfp_id)
+    key = _cache_key(rfp_id, bids, security, overrides, criteria, weights)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return {**_cache[key], "cached": True}
+
+    result = _compute(db, rfp_id, bids, security, criteria, weights)
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > settings.MCDA_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return {**result, "cached": False}
+
+
+def _compute(db: Session, rfp_id: int, bids: List, security: Dict, criteria: List[str], weights: Dict[str, float]) -> Dict[str, Any]:
+    compliance = score_rfp_bids(db, rfp_id)
+    bids = [bid for bid in bids if bid.id in compliance]
+    columns = {
+        "cost": [bid.proposed_cost for bid in bids],
+        "compliance": [compliance[bid.id]["total_score"] for bid in bids],
+        "security": [security.get(bid.id) for bid in bids],
+        "risk": [bid.risk_score for bid in bids]
+    }
+
+    skipped = {}
+    used = []
+    for name in criteria:
+        missing = [bid.vendor_name for bid, value in zip(bids, columns[name]) if value is None]
+        if missing:
+            skipped[name] = f"No value for {len(missing)} bids: {', '.join(missing[:5])}"
+        else:
+            used.append(name)
+
+    result = {
+        "rfp_id": rfp_id,
+        "criteria": [{"name": name, "higher_is_better": CRITERIA[name], "weight": weights.get(name, 1.0)} for name in used],
+        "skipped_criteria": skipped,
+        "frontier": [],
+        "bids": []
+    }
+    if not bids or not used:
+        return result
+
+    values = np.array([[float(value) for value in columns[name]] for name in used]).T
+    higher_is_better = np.array([CRITERIA[name] for name in used])
+    dominance = pareto_dominance(values, higher_is_better)
+    dominates = dominance.sum(axis=1)
+    dominated_by = dominance.sum(axis=0)
+
+    criterion_weights = np.array([weights.get(name, 1.0) for name in used])
+    if criterion_weights.sum() > 0:
+        criterion_weights = criterion_weights / criterion_weights.sum()
+    closeness = topsis(values, higher_is_better, criterion_weights)
+    ranks = (closeness[None, :] > closeness[:, None]).sum(axis=1) + 1
+
+    for row in np.argsort(-closeness, kind="stable"):
+        bid = bids[row]
+        result["bids"].append({
+            "bid_id": bid.id,
+            "vendor_name": bid.vendor_name,
+            "values": {name: round(float(values[row, col]), 2) for col, name in enumerate(used)},
+            "pareto_optimal": bool(dominated_by[row] == 0),
+            "dominates": int(dominates[row]),
+            "dominated_by": int(dominated_by[row]),
+            "topsis_score": round(float(closeness[row]), 4),
+            "topsis_rank": int(ranks[row])
+        })
+    result["frontier"] = [entry["bid_id"] for entry in result["bids"] if entry["pareto_optimal"]]
+    logger.info(f"Multi-criteria ranking of RFP {rfp_id}: {len(bids)} bids on {len(used)} criteria, {len(result['frontier'])} on the frontier")
+    return result
@@ -0,0 +1,253 @@
+"""
+Requirement library service for the UniSphere application.
+Links the requirements of every RFP to canonical requirements keyed by their
+normalised text, and reuses compliance results across RFPs: when a vendor is
+evaluated against a canonical requirement with the same evidence and prompt as
+before, the stored result is returned, with its provenance, instead of calling the LLM.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.document import Requirement, VendorBid
+from app.models.library import CanonicalRequirement, CanonicalComplianceResult
+from app.utils.db_bulk import bulk_upsert
+from app.utils.prompt_templates import get_prompt
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_SUBJECT = re.compile(
+    r"\b(?:the\s+)?(?:successful\s+)?(?:vendor|contractor|offeror|proposer|bidder|provider|respondent|supplier)s?\b"
+)
+_PUNCTUATION = re.compile(r"[^\w%./\-\s]|(?<!\d)[./](?!\d)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_requirement_text(text: str) -> str:
+    """
+    Normalise a requirement description for cross-RFP matching.
+
+    Case, punctuation, whitespace and the name used for the vendor ("Contractor",
+    "the Offeror") are ignored; numbers and identifiers such as "140-2" are kept.
+    """
+    text = _SUBJECT.sub("vendor", (text or "").lower())
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def requirement_hash(text: str) -> str:
+    """Hash of the normalised requirement text."""
+    return hashlib.sha256(normalize_requirement_text(text).encode("utf-8")).hexdigest()
+
+
+def vendor_key(vendor_name: str) -> str:
+    """Normalised vendor name used to match a vendor's bids across RFPs."""
+    return _WHITESPACE.sub(" ", (vendor_name or "").lower()).strip()[:255]
+
+
+def evaluation_hash(requirement: Requirement, evidence: str) -> str:
+    """
+    Hash of everything a requirement compliance result depends on.
+
+    Covers the evidence passages, the requirement's category and priority (both are
+    part of the prompt and the priority steers model routing) and the prompt version.
+    """
+    digest = hashlib.sha256()
+    for part in (
+        get_prompt("requirement_compliance").fingerprint,
+        requirement.category or "",
+        requirement.priority or "",
+        evidence
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def link_canonical_requirements(db: Session, rfp_id: int) -> Dict[str, int]:
+    """
+    Link an RFP's requirements to canonical requirements, creating missing ones.
+
+    Args:
+        db: Database session
+        rfp_id: ID of the RFP
+
+    Returns:
+        Number of requirements linked and how many of them matched a requirement of
+        an earlier RFP
+    """
+    requirements = (
+        db.query(Requirement)
+        .filter(Requirement.rfp_id == rfp_id, Requirement.canonical_id.is_(None))
+        .all()
+    )
+    if not requirements:
+        return {"linked": 0, "shared": 0}
+
+    by_hash: Dict[str, List[Requirement]] = {}
+    for req in requirements:
+        by_hash.setdefault(requirement_hash(req.description), []).append(req)
+
+    existing = {
+        text_hash for (text_hash,) in
+        db.query(CanonicalRequirement.text_hash).filter(CanonicalRequirement.text_hash.in_(list(by_hash)))
+    }
+    bulk_upsert(db, CanonicalRequirement, [
+        {
+            "text_hash": text_hash,
+            "normalized_text": normalize_requirement_text(reqs[0].description),
+            "category": reqs[0].category,
+            "first_rfp_id": rfp_id
+        }
+        for text_hash, reqs in by_hash.items() if text_hash not in existing
+    ], key_columns=("text_hash",), update_columns=[])
+
+    ids = dict(
+        db.query(CanonicalRequirement.text_hash, CanonicalRequirement.id)
+        .filter(CanonicalRequirement.text_hash.in_(list(by_hash)))
+        .all()
+    )
+    for text_hash, reqs in by_hash.items():
+        for req in reqs:
+            req.canonical_id = ids[text_hash]
+    db.flush()
+
+    shared = sum(len(reqs) for text_hash, reqs in by_hash.items() if text_hash in existing)
+    logger.info(f"Linked {len(requirements)} requirements of RFP {rfp_id} to the library; {shared} were already known")
+    return {"linked": len(requirements), "shared": shared}
+
+
+def find_reusable_results(
+    db: Session,
+    bid: VendorBid,
+    requirements: List[Requirement],
+    evidence_for: Callable[[Requirement], str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up stored results for the bid's vendor with one query.
+
+    Args:
+        db: Database session
+        bid: Bid being evaluated
+        requirements: Requirements still to evaluate
+        evidence_for: Returns the bid text the requirement would be evaluated against
+
+    Returns:
+        Mapping of requirement ID (as a string) to the reused result, with a
+        "provenance" entry naming the evaluation it came from
+    """
+    keys = {
+        req.id: (req.canonical_id, evaluation_hash(req, evidence_for(req)))
+        for req in requirements if req.canonical_id
+    }
+    if not keys:
+        return {}
+
+    rows = (
+        db.query(CanonicalComplianceResult)
+        .filter(
+            CanonicalComplianceResult.vendor_key == vendor_key(bid.vendor_name),
+            CanonicalComplianceResult.canonical_id.in_({canonical_id for canonical_id, _ in keys.values()})
+        )
+        .all()
+    )
+    index = {(row.canonical_id, row.evidence_hash): row for row in rows}
+
+    reused = {}
+    for req in requirements:
+        row = index.get(keys.get(req.id))
+        if not row:
+            continue
+        result = dict(row.result)
+        # No model was called for a reused result, so it must not count towards routing cost
+        result.pop("routing", None)
+        result["provenance"] = {
+            "reused": True,
+            "canonical_id": row.canonical_id,
+            "source_rfp_id": row.source_rfp_id,
+            "source_bid_id": row.source_bid_id,
+            "source_requirement_id": row.source_requirement_id,
+            "evaluated_at": row.created_at.isoformat() if row.created_at else None
+        }
+        row.reuse_count = (row.reuse_count or 0) + 1
+        reused[str(req.id)] = result
+
+    if reused:
+        logger.info(f"Reused {len(reused)} library compliance results for bid {bid.id}")
+    return reused
+
+
+def record_results(
+    db: Session,
+    bid: VendorBid,
+    requirements: List[Requirement],
+    results: Dict[str, Dict[str, Any]],
+    evidence_for: Callable[[Requirement], str]
+) -> int:
+    """
+    Store fresh compliance results in the library for later reuse.
+
+    Failed and reused results are not stored.
+
+    Args:
+        db: Database session
+        bid: Evaluated bid
+        requirements: Requirements that were evaluated
+        results: Mapping of requirement ID (as a string) to compliance result
+        evidence_for: Returns the bid text each requirement was evaluated against
+
+    Returns:
+        Number of results stored
+    """
+    rows = []
+    for req in requirements:
+        result = results.get(str(req.id))
+        if not req.canonical_id or not isinstance(result, dict):
+            continue
+        if "error" in result or "score" not in result or "provenance" in result:
+            continue
+        rows.append({
+            "canonical_id": req.canonical_id,
+            "vendor_key": vendor_key(bid.vendor_name),
+            "evidence_hash": evaluation_hash(req, evidence_for(req)),
+            "result": result,
+            "source_bid_id": bid.id,
+            "source_requirement_id": req.id,
+            "source_rfp_id": bid.rfp_id
+        })
+    return bulk_upsert(
+        db, CanonicalComplianceResult, rows,
+        key_columns=("canonical_id", "vendor_key", "evidence_hash"),
+        update_columns=("result", "source_bid_id", "source_requirement_id", "source_rfp_id")
+    )
+
+
+def library_stats(db: Session) -> Dict[str, Any]:
+    """
+    Size of the requirement library and how much it is reused.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Counts of canonical requirements, linked and shared requirements, stored results and reuses
+    """
+    rfps_per_canonical = (
+        db.query(Requirement.canonical_id, func.count(func.distinct(Requirement.rfp_id)).label("rfps"))
+        .filter(Requirement.canonical_id.isnot(None))
+        .group_by(Requirement.canonical_id)
+        .subquery()
+    )
+    return {
+        "canonical_requirements": db.query(func.count(CanonicalRequirement.id)).scalar() or 0,
+        "linked_requirements": db.query(func.count(Requirement.id)).filter(Requirement.canonical_id.isnot(None)).scalar() or 0,
+        "shared_canonical_requirements": db.query(func.count()).select_from(rfps_per_canonical).filter(rfps_per_canonical.c.rfps > 1).scalar() or 0,
+        "stored_results": db.query(func.count(CanonicalComplianceResult.id)).scalar() or 0,
+        "total_reuses": db.query(func.coalesce(func.sum(CanonicalComplianceResult.reuse_count), 0)).scalar() or 0
+    }
@@ -0,0 +1,249 @@
+"""
+RFP amendment service for the UniSphere application.
+An amendment is uploaded as a new RFPDocument linked to the RFP it supersedes. The
+two versions are compared section by section: only added or changed sections are
+re-extracted, requirements and specifications of unchanged sections are carried
+over with their stable ids, and bid evaluations are invalidated only for the items
+that actually changed.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.document import RFPDocument, Requirement, TechnicalSpecification, VendorBid
+from app.services.analysis_versions import current_analysis, new_analysis, publish_analysis
+from app.services.evidence_matrix import score_passages
+from app.services.scoring import apply_overrides, load_overrides, score_bid
+from app.utils.db_bulk import bulk_insert
+from app.utils.section_utils import diff_sections, normalize_section_text
+from app.utils.units import normalize_spec_bounds
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def requirement_signature(category: Optional[str], priority: Optional[str], description: Optional[str]) -> str:
+    """Normalised content of a requirement; equal signatures mean an unchanged requirement."""
+    return normalize_section_text(f"{category or ''}|{priority or ''}|{description or ''}")
+
+
+def spec_signature(spec: Dict[str, Any]) -> str:
+    """Normalised content of a technical specification."""
+    fields = ("name", "category", "description", "measurement_unit", "min_value", "max_value", "is_mandatory")
+    return normalize_section_text("|".join(str(spec.get(field) or "") for field in fields))
+
+
+def _spec_fields(spec: TechnicalSpecification) -> Dict[str, Any]:
+    return {
+        "name": spec.name,
+        "category": spec.category,
+        "description": spec.description,
+        "measurement_unit": spec.measurement_unit,
+        "min_value": spec.min_value,
+        "max_value": spec.max_value,
+        "is_mandatory": spec.is_mandatory
+    }
+
+
+def assign_section_keys(items: List[Dict[str, Any]], sections: List[Dict], text_of: Callable[[Dict[str, Any]], str]) -> None:
+    """
+    Attribute each extracted item to the section its text best matches.
+
+    Args:
+        items: Extracted requirement or specification dicts; a "section_key" entry is set on
+            each item that does not have one yet
+        sections: Sections from segment_sections
+        text_of: Returns the matching text of an item
+    """
+    items = [item for item in items if not item.get("section_key")]
+    if not items or not sections:
+        return
+    scores = score_passages([text_of(item) for item in items], [section["text"] for section in sections])
+    for item, row in zip(items, scores):
+        item["section_key"] = sections[int(row.argmax())]["key"]
+
+
+def plan_amendment(predecessor: RFPDocument, section_digests: Dict[str, str]) -> Optional[Dict[str, List[str]]]:
+    """
+    Diff an amendment's sections against its predecessor.
+
+    Args:
+        predecessor: The RFP the amendment supersedes
+        section_digests: Section key to content hash of the amendment
+
+    Returns:
+        Section keys grouped as added, changed, removed and unchanged, or None when
+        the predecessor was analyzed before section digests were recorded
+    """
+    if not predecessor.section_digests:
+        logger.info(f"RFP {predecessor.id} has no section digests; the amendment is analyzed in full")
+        return None
+    return diff_sections(predecessor.section_digests, section_digests)
+
+
+def carry_over_items(predecessor: RFPDocument, rfp: RFPDocument, unchanged_keys: List[str], db: Session) -> Tuple[int, int]:
+    """
+    Copy the requirements and specifications of unchanged sections to the amendment.
+
+    Args:
+        predecessor: The RFP the amendment supersedes
+        rfp: The amendment
+        unchanged_keys: Keys of the sections whose content did not change
+        db: Database session
+
+    Returns:
+        Number of requirements and specifications carried over
+    """
+    unchanged = set(unchanged_keys)
+    requirements = [req for req in predecessor.requirements if req.section_key in unchanged]
+    specs = [spec for spec in predecessor.tech_specs if spec.section_key in unchanged]
+
+    bulk_insert(db, Requirement, [
+        {
+            "rfp_id": rfp.id,
+            "category": req.category,
+            "description": req.description,
+            "priority": req.priority,
+            "section": req.section,
+            "stable_id": req.stable_id,
+            "section_key": req.section_key,
+            # Offsets point into the predecessor's text, so they are not carried over
+            "source_start": None,
+            "source_end": None
+        }
+        for req in requirements
+    ])
+    bulk_insert(db, TechnicalSpecification, [
+        {
+            "rfp_id": rfp.id,
+            "stable_id": spec.stable_id,
+            "section_key": spec.section_key,
+            **_spec_fields(spec),
+            **normalize_spec_bounds(spec.min_value, spec.max_value, spec.measurement_unit)
+        }
+        for spec in specs
+    ])
+
+    return len(requirements), len(specs)
+
+
+def match_stable_ids(predecessor: RFPDocument, requirements: List[Dict[str, Any]], tech_specs: List[Dict[str, Any]], carried: List[str]) -> None:
+    """
+    Give re-extracted items that are unchanged from the predecessor its stable id.
+
+    A requirement is unchanged when its category, priority and description are
+    identical after normalisation, wherever in the document it now appears.
+
+    Args:
+        predecessor: The RFP the amendment supersedes
+        requirements: Newly extracted requirement dicts; "stable_id" is set on matches
+        tech_specs: Newly extracted specification dicts; "stable_id" is set on matches
+        carried: Stable ids already carried over, which must not be reused
+    """
+    taken = set(carried)
+    available_requirements: Dict[str, List[str]] = {}
+    for req in predecessor.requirements:
+        if req.stable_id not in taken:
+            signature = requirement_signature(req.category, req.priority, req.description)
+            available_requirements.setdefault(signature, []).append(req.stable_id)
+    for req in requirements:
+        signature = requirement_signature(req.get("category"), req.get("priority"), req.get("description"))
+        if available_requirements.get(signature):
+            req["stable_id"] = available_requirements[signature].pop(0)
+
+    available_specs: Dict[str, List[str]] = {}
+    for spec in predecessor.tech_specs:
+        if spec.stable_id not in taken:
+            available_specs.setdefault(spec_signature(_spec_fields(spec)), []).append(spec.stable_id)
+    for spec in tech_specs:
+        signature = spec_signature(spec)
+        if available_specs.get(signature):
+            spec["stable_id"] = available_specs[signature].pop(0)
+
+
+def _id_map(old_rows: List[Any], new_rows: List[Any]) -> Dict[str, str]:
+    """Map old row ids to new row ids through their stable ids."""
+    new_ids = {row.stable_id: row.id for row in new_rows}
+    return {str(row.id): str(new_ids[row.stable_id]) for row in old_rows if row.stable_id in new_ids}
+
+
+def rebase_bids(predecessor: RFPDocument, rfp: RFPDocument, db: Session) -> Dict[str, Any]:
+    """
+    Move the predecessor's bids to the amendment, keeping still-valid evaluations.
+
+    Compliance results of unchanged requirements and specifications are re-keyed to
+    the amendment's row ids and stored as a new analysis version of each bid, scored
+    against the amendment; results of changed or removed items are left out, so an
+    incremental re-evaluation only has to score what changed. Earlier versions keep
+    the ids they were scored with. Reviewer score overrides of unchanged items are
+    re-keyed the same way; overrides of changed or removed items are dropped, since
+    the reviewer scored text the amendment no longer has.
+
+    Args:
+        predecessor: The RFP the amendment supersedes
+        rfp: The amendment, with its requirements and specifications already flushed
+        db: Database session
+
+    Returns:
+        Stable ids of the changed items, the number of bids moved and the
+        number of overrides dropped
+    """
+    requirement_map = _id_map(predecessor.requirements, rfp.requirements)
+    spec_map = _id_map(predecessor.tech_specs, rfp.tech_specs)
+
+    old_ids = {row.stable_id for row in predecessor.requirements + predecessor.tech_specs}
+    new_ids = {row.stable_id for row in rfp.requirements + rfp.tech_specs}
+
+    bids = db.query(VendorBid).filter(VendorBid.rfp_id == predecessor.id).all()
+    overrides = load_overrides(db, [bid.id for bid in bids])
+    item_maps = {"requirement": requirement_map, "tech_spec": spec_map}
+    dropped = 0
+    for bid in bids:
+        bid.rfp_id = rfp.id
+        kept = []
+        for override in overrides.get(bid.id, []):
+            new_id = item_maps.get(override.item_type, {}).get(override.item_id)
+            if new_id is None:
+                db.delete(override)
+                dropped += 1
+                continue
+            override.item_id = new_id
+            kept.append(override)
+
+        previous = current_analysis(db, bid)
+        if previous is None:
+            continue
+
+        analysis = new_analysis(db, bid.id, use_openai=False)
+        # The results were produced by the previous version's model and prompts
+        analysis.model_version = previous.model_version
+        analysis.prompt_version = previous.prompt_version
+        analysis.strengths = previous.strengths
+        analysis.weaknesses = previous.weaknesses
+        analysis.gap_analysis = previous.gap_analysis
+        analysis.requirement_compliance = {
+            requirement_map[key]: value
+            for key, value in (previous.requirement_compliance or {}).items()
+            if key in requirement_map
+        }
+        analysis.technical_compliance = {
+            spec_map[key]: value
+            for key, value in (previous.technical_compliance or {}).items()
+            if key in spec_map
+        }
+        scored_requirements, scored_specs, applied_overrides = apply_overrides(
+            analysis.requirement_compliance, analysis.technical_compliance, kept
+        )
+        analysis.overall_score = score_bid(rfp.requirements, rfp.tech_specs, scored_requirements, scored_specs)
+        analysis.score_overrides = applied_overrides
+        bid.total_score = analysis.overall_score
+        db.flush()
+        publish_analysis(db, bid, analysis)
+
+    return {
+        "changed_stable_ids": sorted(old_ids ^ new_ids),
+        "bids_moved": len(bids),
+        "overrides_dropped": dropped
+    }
@@ -1,22 +1,133 @@
 import logging
 import json
 import os
-from typing import List, Dict, Any
+import uuid
+from typing import List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 
 from app.models.document import RFPDocument, Requirement, TechnicalSpecification
 from app.utils.pdf_utils import extract_text_from_pdf, extract_text_from_docx, extract_text_from_txt
 from app.utils.llm_utils import analyze_text_with_llm, chunk_text
-from app.utils.openai_utils import extract_requirements, extract_technical_specifications
+from app.utils.openai_utils import extract_requirements, extract_technical_specifications, classify_requirements
+from app.utils.requirement_rules import extract_requirement_candidates
+from app.utils.prompt_templates import render_prompt
+from app.utils.section_utils import segment_sections
+from app.utils.dedup_utils import dedupe_requirements, dedupe_tech_specs
+from app.utils.db_bulk import bulk_insert
+from app.utils.units import normalize_spec_bounds
+from app.services.requirement_library import link_canonical_requirements
+from app.services.rfp_amendments import (
+    plan_amendment,
+    assign_section_keys,
+    carry_over_items,
+    match_stable_ids,
+    rebase_bids
+)
 from app.config import settings
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+def _extract_items(text: str, sections: List[Dict]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Extract requirements and technical specifications from RFP text.
+    
+    Requirements are found by the rule-based extractor; the LLM only classifies
+    them, or reads the whole text when the rules find nothing. Without an API key
+    the rule-based candidates are used as they are.
+    
+    Args:
+        text: RFP text, either the whole document or the sections to re-extract
+        sections: The sections making up the text
+        
+    Returns:
+        Extracted requirement dicts and technical specification dicts
+    """
+    # Check if OpenAI API key is available for enhanced analysis
+    use_openai = settings.OPENAI_API_KEY != ""
+    all_requirements = []
+    all_tech_specs = []
+    
+    candidates = extract_requirement_candidates(sections) if settings.REQUIREMENT_RULES_ENABLED else []
+    if candidates:
+        logger.info(f"Rule-based extractor found {len(candidates)} requirement candidates in {len(sections)} sections")
+    
+    if use_openai:
+        logger.info("Using OpenAI for RFP analysis")
+        try:
+            # Use OpenAI-powered extraction
+            if candidates:
+                all_requirements = classify_requirements(candidates)
+            else:
+                all_requirements = extract_requirements(text)
+            all_tech_specs = extract_technical_specifications(text)
+            
+            # Log success
+            logger.info(f"Successfully extracted {len(all_requirements)} requirements and {len(all_tech_specs)} specs using OpenAI")
+            
+        except Exception as e:
+            logger.error(f"Error using OpenAI for extraction: {str(e)}")
+            use_openai = False  # Fall back to simulated mode
+    
+    # If OpenAI failed or isn't available, use simulated mode
+    if not use_openai:
+        logger.warning("Using simulated LLM responses for RFP analysis")
+        # Chunk the text for processing
+        text_chunks = chunk_text(text)
+        
+        # Rule-based candidates stand in for LLM extraction when no model is available
+        all_requirements = list(candidates)
+        if candidates:
+            logger.info("Using rule-based requirement extraction")
+        
+        if not candidates:
+            # Extract requirements
+            requirements_prompt = render_prompt("requirement_extraction")
+        
+            for chunk in text_chunks:
+                chunk_requirements = analyze_text_with_llm(
+                    prompt=requirements_prompt,
+                    text=chunk,
+                    output_format="json"
+                )
+            
+                try:
+                    if isinstance(chunk_requirements, str):
+                        chunk_requirements = json.loads(chunk_requirements)
+                    if isinstance(chunk_requirements, list):
+                        all_requirements.extend(chunk_requirements)
+                except (json.JSONDecodeError, TypeError) as e:
+                    logger.error(f"Error parsing requirements JSON: {e}")
+                    continue
+        
+        # Extract technical specifications
+        tech_specs_prompt = render_prompt("tech_spec_extraction")
+        
+        for chunk in text_chunks:
+            chunk_specs = analyze_text_with_llm(
+                prompt=tech_specs_prompt,
+                text=chunk,
+                output_format="json"
+            )
+            
+            try:
+                if isinstance(chunk_specs, str):
+                    chunk_specs = json.loads(chunk_specs)
+                if isinstance(chunk_specs, list):
+                    all_tech_specs.extend(chunk_specs)
+            except (json.JSONDecodeError, TypeError) as e:
+                logger.error(f"Error parsing technical specifications JSON: {e}")
+                continue
+    
+    return all_requirements, all_tech_specs
+
 def analyze_rfp(rfp_id: int, db: Session) -> bool:
     """
     Analyze an RFP document to extract requirements and technical specifications.
     
+    When the RFP is an amendment of an earlier RFP, only its added or changed
+    sections are extracted and the predecessor's bids are moved to it.
+    
     Args:
         rfp_id: ID of the RFP to analyze
         db: Database session
@@ -49,131 +160,101 @@ def analyze_rfp(rfp_id: int, db: Session) -> bool:
             logger.error(f"Unsupported file format: {file_ext}")
             return False
         
-        # Check if OpenAI API key is available for enhanced analysis
-        use_openai = settings.OPENAI_API_KEY != ""
-        all_requirements = []
-        all_tech_specs = []
+        # Segment into sections so amendments can be diffed against their predecessor
+        sections = segment_sections(extracted_text)
+        rfp.section_digests = {section["key"]: section["hash"] for section in sections}
         
-        if use_openai:
-            logger.info("Using OpenAI for RFP analysis")
-            try:
-                # Use OpenAI-powered extraction
-                all_requirements = extract_requirements(extracted_text)
-                all_tech_specs = extract_technical_specifications(extracted_text)
-                
-                # Log success
-                logger.info(f"Successfully extracted {len(all_requirements)} requirements and {len(all_tech_specs)} specs using OpenAI")
-                
-            except Exception as e:
-                logger.error(f"Error using OpenAI for extraction: {str(e)}")
-                use_openai = False  # Fall back to simulated mode
-        
-        # If OpenAI failed or isn't available, use simulated mode
-        if not use_openai:
-            logger.warning("Using simulated LLM responses for RFP analysis")
-            # Chunk the text for processing
-            text_chunks = chunk_text(extracted_text)
-            
-            # Extract requirements
-            requirements_prompt = """
-            You are an expert in government procurement. Analyze this RFP document section and identify all requirements. For each requirement, provide:
-            1. Category (Technical, Financial, Compliance, etc.)
-            2. Description (the actual requirement text)
-            3. Priority (Must-have, Should-have, or Nice-to-have)
-            4. Section (which part of the RFP this was found in)
-            
-            Respond with a JSON array of requirements in the following format:
-            [
-                {
-                    "category": "Technical",
-                    "description": "The system must support 10Gbps throughput",
-                    "priority": "Must-have",
-                    "section": "Network Requirements"
-                }
-            ]
-            """
-            
-            for chunk in text_chunks:
-                chunk_requirements = analyze_text_with_llm(
-                    prompt=requirements_prompt,
-                    text=chunk,
-                    output_format="json"
-                )
-                
-                try:
-                    if isinstance(chunk_requirements, str):
-                        chunk_requirements = json.loads(chunk_requirements)
-                    if isinstance(chunk_requirements, list):
-                        all_requirements.extend(chunk_requirements)
-                except (json.JSONDecodeError, TypeError) as e:
-                    logger.error(f"Error parsing requirements JSON: {e}")
-                    continue
-            
-            # Extract technical specifications
-            tech_specs_prompt = """
-            You are an expert in technology procurement for government connectivity projects. Analyze this RFP document section and identify all technical specifications. For each specification, provide:
-            1. Name (short identifier)
-            2. Description (detailed specification)
-            3. Category (Network, Hardware, Software, Security, etc.)
-            4. Measurement unit (if applicable)
-            5. Minimum value (if applicable)
-            6. Maximum value (if applicable)
-            7. Is mandatory (true/false)
-            
-            Respond with a JSON array of technical specifications in the following format:
-            [
-                {
-                    "name": "Network Throughput",
-                    "description": "Minimum network throughput for backbone connections",
-                    "category": "Network",
-                    "measurement_unit": "Gbps",
-                    "min_value": "10",
-                    "max_value": null,
-                    "is_mandatory": true
-                }
-            ]
-            """
-            
-            for chunk in text_chunks:
-                chunk_specs = analyze_text_with_llm(
-                    prompt=tech_specs_prompt,
-                    text=chunk,
-                    output_format="json"
+        predecessor = rfp.predecessor if rfp.predecessor_id else None
+        diff = plan_amendment(predecessor, rfp.section_digests) if predecessor else None
+        
+        if diff is not None:
+            # Only added or changed sections need extraction; the rest is carried over
+            reextract = set(diff["added"]) | set(diff["changed"])
+            target_sections = [section for section in sections if section["key"] in reextract]
+            text_to_extract = "\n\n".join(section["text"] for section in target_sections)
+            logger.info(f"Amendment {rfp_id} of RFP {predecessor.id}: {len(diff['added'])} added, {len(diff['changed'])} changed, {len(diff['removed'])} removed, {len(diff['unchanged'])} unchanged sections")
+        else:
+            target_sections = sections
+            text_to_extract = extracted_text
+        
+        all_requirements, all_tech_specs = _extract_items(text_to_extract, target_sections) if text_to_extract.strip() else ([], [])
+        
+        # Overlapping chunks report the same item several times; each copy would cost a compliance call per bid
+        extracted_requirements, extracted_specs = len(all_requirements), len(all_tech_specs)
+        all_requirements, collapsed_requirements = dedupe_requirements(all_requirements)
+        all_tech_specs, collapsed_specs = dedupe_tech_specs(all_tech_specs)
+        rfp.extraction_stats = {
+            "requirements_extracted": extracted_requirements,
+            "requirements_collapsed": collapsed_requirements,
+            "specs_extracted": extracted_specs,
+            "specs_collapsed": collapsed_specs
+        }
+        logger.info(f"Collapsed {collapsed_requirements} of {extracted_requirements} requirements and {collapsed_specs} of {extracted_specs} specs as near-duplicates")
+        
+        assign_section_keys(all_requirements, target_sections, lambda req: f"{req.get('category', '')} {req.get('description', '')}")
+        assign_section_keys(all_tech_specs, target_sections, lambda spec: f"{spec.get('name', '')} {spec.get('description', '')}")
+        
+        carried_requirements, carried_specs = 0, 0
+        if diff is not None:
+            carried_requirements, carried_specs = carry_over_items(predecessor, rfp, diff["unchanged"], db)
+            carried_ids = [row.stable_id for row in predecessor.requirements + predecessor.tech_specs if row.section_key in diff["unchanged"]]
+            match_stable_ids(predecessor, all_requirements, all_tech_specs, carried_ids)
+        elif predecessor:
+            match_stable_ids(predecessor, all_requirements, all_tech_specs, [])
+        
+        # Save requirements and technical specifications with batched inserts
+        bulk_insert(db, Requirement, [
+            {
+                "rfp_id": rfp_id,
+                "category": req_data.get("category", "Uncategorized"),
+                "description": req_data.get("description", ""),
+                "priority": req_data.get("priority", "Should-have"),
+                "section": req_data.get("section", "General"),
+                "stable_id": req_data.get("stable_id") or uuid.uuid4().hex,
+                "section_key": req_data.get("section_key"),
+                "source_start": req_data.get("start"),
+                "source_end": req_data.get("end")
+            }
+            for req_data in all_requirements
+        ])
+        
+        bulk_insert(db, TechnicalSpecification, [
+            {
+                "rfp_id": rfp_id,
+                "name": spec_data.get("name", ""),
+                "description": spec_data.get("description", ""),
+                "category": spec_data.get("category", "Uncategorized"),
+                "measurement_unit": spec_data.get("measurement_unit"),
+                "min_value": spec_data.get("min_value"),
+                "max_value": spec_data.get("max_value"),
+                "is_mandatory": spec_data.get("is_mandatory", True),
+                "stable_id": spec_data.get("stable_id") or uuid.uuid4().hex,
+                "section_key": spec_data.get("section_key"),
+                **normalize_spec_bounds(
+                    spec_data.get("min_value"), spec_data.get("max_value"), spec_data.get("measurement_unit")
                 )
-                
-                try:
-                    if isinstance(chunk_specs, str):
-                        chunk_specs = json.loads(chunk_specs)
-                    if isinstance(chunk_specs, list):
-                        all_tech_specs.extend(chunk_specs)
-                except (json.JSONDecodeError, TypeError) as e:
-                    logger.error(f"Error parsing technical specifications JSON: {e}")
-                    continue
+            }
+            for spec_data in all_tech_specs
+        ])
         
-        # Save requirements to database
-        for req_data in all_requirements:
-            requirement = Requirement(
-                rfp_id=rfp_id,
-                category=req_data.get("category", "Uncategorized"),
-                description=req_data.get("description", ""),
-                priority=req_data.get("priority", "Should-have"),
-                section=req_data.get("section", "General")
-            )
-            db.add(requirement)
-        
-        # Save technical specifications to database
-        for spec_data in all_tech_specs:
-            tech_spec = TechnicalSpecification(
-                rfp_id=rfp_id,
-                name=spec_data.get("name", ""),
-                description=spec_data.get("description", ""),
-                category=spec_data.get("category", "Uncategorized"),
-                measurement_unit=spec_data.get("measurement_unit"),
-                min_value=spec_data.get("min_value"),
-                max_value=spec_data.get("max_value"),
-                is_mandatory=spec_data.get("is_mandatory", True)
-            )
-            db.add(tech_spec)
+        # Link requirements to the cross-RFP library so earlier evaluations can be reused
+        library = link_canonical_requirements(db, rfp_id)
+        rfp.extraction_stats = {**(rfp.extraction_stats or {}), "library": library}
+        
+        if predecessor:
+            # Keep existing bid evaluations for every requirement that did not change
+            db.flush()
+            db.refresh(rfp)
+            rebase = rebase_bids(predecessor, rfp, db)
+            rfp.amendment_summary = {
+                "predecessor_id": predecessor.id,
+                "sections": {key: len(keys) for key, keys in diff.items()} if diff is not None else None,
+                "requirements_carried": carried_requirements,
+                "specs_carried": carried_specs,
+                "requirements_extracted": len(all_requirements),
+                "specs_extracted": len(all_tech_specs),
+                **rebase
+            }
         
         db.commit()
         
@@ -0,0 +1,170 @@
+"""
+Score override service for the UniSphere application.
+Reviewers can change the score of individual requirements and specifications of
+a bid. Their overrides are stored separately from the model's results and the bid
+is rescored from its stored compliance data, without any LLM calls.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.document import VendorBid, Requirement, TechnicalSpecification
+from app.models.review import ScoreOverride
+from app.services.analysis_versions import current_analysis
+from app.services.scoring import apply_overrides, load_overrides, score_bid, score_rfp_bids
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ITEM_TYPES = ("requirement", "tech_spec")
+
+
+def set_score_override(
+    db: Session,
+    bid: VendorBid,
+    item_type: str,
+    item_id: str,
+    score: float,
+    explanation: Optional[str] = None,
+    review_id: Optional[int] = None,
+    created_by: Optional[str] = None
+) -> ScoreOverride:
+    """
+    Set a reviewer's score for one requirement or spec of a bid, replacing any earlier
+    override of the same item. The caller rescores the bid and commits.
+
+    Args:
+        db: Database session
+        bid: Vendor bid
+        item_type: "requirement" or "tech_spec"
+        item_id: ID of the requirement or spec
+        score: The score, 0-100
+        explanation: Why the reviewer changed the score
+        review_id: The human review the override came from, if any
+        created_by: The reviewer
+
+    Returns:
+        The override
+
+    Raises:
+        ValueError: If the item does not belong to the bid's RFP or the score is out of range
+    """
+    if item_type not in ITEM_TYPES:
+        raise ValueError(f"Item type must be one of: {', '.join(ITEM_TYPES)}")
+    if not 0 <= score <= 100:
+        raise ValueError("Score must be between 0 and 100")
+
+    model = Requirement if item_type == "requirement" else TechnicalSpecification
+    item = db.query(model).filter(model.id == int(item_id), model.rfp_id == bid.rfp_id).first()
+    if not item:
+        raise ValueError(f"{item_type} {item_id} does not belong to the RFP of bid {bid.id}")
+
+    override = (
+        db.query(ScoreOverride)
+        .filter(ScoreOverride.bid_id == bid.id, ScoreOverride.item_type == item_type, ScoreOverride.item_id == str(item_id))
+        .first()
+    )
+    if override is None:
+        override = ScoreOverride(bid_id=bid.id, item_type=item_type, item_id=str(item_id))
+        db.add(override)
+    override.score = float(score)
+    override.explanation = explanation
+    override.review_id = review_id
+    override.created_by = created_by
+    db.flush()
+    return override
+
+
+def remove_score_override(db: Session, bid: VendorBid, item_type: str, item_id: str) -> bool:
+    """
+    Remove a bid's override of one item; the caller rescores the bid and commits.
+
+    Returns:
+        Whether there was an override to remove
+    """
+    deleted = (
+        db.query(ScoreOverride)
+        .filter(ScoreOverride.bid_id == bid.id, ScoreOverride.item_type == item_type, ScoreOverride.item_id == str(item_id))
+        .delete(synchronize_session=False)
+    )
+    db.flush()
+    return bool(deleted)
+
+
+def list_score_overrides(db: Session, bid: VendorBid) -> List[Dict[str, Any]]:
+    """
+    A bid's score overrides, oldest first.
+    """
+    overrides = (
+        db.query(ScoreOverride)
+        .filter(ScoreOverride.bid_id == bid.id)
+        .order_by(ScoreOverride.id)
+        .all()
+    )
+    return [
+        {
+            "id": override.id,
+            "item_type": override.item_type,
+            "item_id": override.item_id,
+            "score": override.score,
+            "explanation": override.explanation,
+            "review_id": override.review_id,
+            "created_by": override.created_by,
+            "updated_at": override.updated_at.isoformat() if override.updated_at else None
+        }
+        for override in overrides
+    ]
+
+
+def rescore_bid(db: Session, bid: VendorBid) -> Optional[Dict[str, Any]]:
+    """
+    Recompute a bid's overall score from its current analysis and score overrides.
+
+    The analysis keeps the model's results; its overall score, the bid's total score
+    and the list of overrides the score was computed with are updated. The caller commits.
+
+    Args:
+        db: Database session
+        bid: Vendor bid
+
+    Returns:
+        The previous and new score, the overrides applied and the RFP's updated
+        ranking, or None if the bid has no analysis to rescore
+    """
+    analysis = current_analysis(db, bid)
+    if not analysis:
+        return None
+
+    requirements = db.query(Requirement).filter(Requirement.rfp_id == bid.rfp_id).order_by(Requirement.id).all()
+    tech_specs = (
+        db.query(TechnicalSpecification)
+        .filter(TechnicalSpecification.rfp_id == bid.rfp_id)
+        .order_by(TechnicalSpecification.id)
+        .all()
+    )
+    requirement_compliance, technical_compliance, applied = apply_overrides(
+        analysis.requirement_compliance, analysis.technical_compliance, load_overrides(db, [bid.id]).get(bid.id, [])
+    )
+
+    previous = analysis.overall_score
+    overall_score = score_bid(requirements, tech_specs, requirement_compliance, technical_compliance)
+    analysis.overall_score = overall_score
+    analysis.score_overrides = applied
+    bid.total_score = overall_score
+    db.flush()
+
+    ranking = score_rfp_bids(db, bid.rfp_id)
+    logger.info(f"Rescored bid {bid.id} with {len(applied)} overrides: {previous} -> {overall_score}")
+    return {
+        "bid_id": bid.id,
+        "analysis_id": analysis.id,
+        "previous_score": previous,
+        "overall_score": overall_score,
+        "overrides": applied,
+        "ranking": [
+            {"bid_id": bid_id, "rank": scores["rank"], "total_score": scores["total_score"]}
+            for bid_id, scores in sorted(ranking.items(), key=lambda entry: entry[1]["rank"])
+        ]
+    }
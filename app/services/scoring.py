@@ -0,0 +1,293 @@
+"""
+Bid scoring engine for the UniSphere application.
+Scores all bids of an RFP together: their stored requirement and specification
+compliance is laid out as one bids × items matrix, weighted by item category,
+priority and mandatory flag, and reduced to totals, ranks and normalised scores
+in a single vectorised pass. Reviewer score overrides are applied on top of the
+stored results, so rescoring never needs the LLM.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.document import VendorBid, Requirement, TechnicalSpecification
+from app.models.review import ScoreOverride
+from app.services.analysis_versions import current_analyses
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class ScoreMatrix:
+    """
+    Compliance scores of several bids against an RFP's requirements and specs.
+
+    Columns are the RFP's requirements followed by its specs. A bid's score for an
+    item it has no result for is NaN, and the item is left out of its averages.
+    """
+
+    def __init__(
+        self,
+        bid_ids: List[int],
+        requirements: List[Requirement],
+        tech_specs: List[TechnicalSpecification],
+        compliance: Dict[int, tuple]
+    ):
+        """
+        Args:
+            bid_ids: Row order of the matrix
+            requirements: The RFP's requirements
+            tech_specs: The RFP's technical specifications
+            compliance: Mapping of bid ID to its (requirement_compliance, technical_compliance)
+        """
+        self.bid_ids = list(bid_ids)
+        self.override_counts: Dict[int, int] = {}
+        self.requirement_ids = [str(req.id) for req in requirements]
+        self.spec_ids = [str(spec.id) for spec in tech_specs]
+        req_count = len(requirements)
+
+        self.scores = np.full((len(self.bid_ids), req_count + len(tech_specs)), np.nan)
+        for row, bid_id in enumerate(self.bid_ids):
+            req_compliance, tech_compliance = compliance.get(bid_id) or ({}, {})
+            for col, item_id in enumerate(self.requirement_ids):
+                result = (req_compliance or {}).get(item_id)
+                if result is not None:
+                    self.scores[row, col] = result.get("score", 0) or 0
+            for col, item_id in enumerate(self.spec_ids, start=req_count):
+                result = (tech_compliance or {}).get(item_id)
+                if result is not None:
+                    self.scores[row, col] = result.get("score", 0) or 0
+
+        category_weights = settings.SCORING_CATEGORY_WEIGHTS
+        self.weights = np.array(
+            [
+                category_weights.get(req.category, 1.0) * settings.SCORING_PRIORITY_WEIGHTS.get(req.priority, 1.0)
+                for req in requirements
+            ] + [
+                category_weights.get(spec.category, 1.0) * (settings.SCORING_MANDATORY_WEIGHT if spec.is_mandatory else 1.0)
+                for spec in tech_specs
+            ],
+            dtype=float
+        )
+        self.categories = [req.category or "Uncategorized" for req in requirements] + [
+            spec.category or "Uncategorized" for spec in tech_specs
+        ]
+        self.is_requirement = np.arange(self.scores.shape[1]) < req_count
+        self.is_mandatory = np.array([False] * req_count + [bool(spec.is_mandatory) for spec in tech_specs])
+
+
+def weighted_mean(scores: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Row-wise weighted mean over the non-NaN entries; 0 for rows without any."""
+    present = ~np.isnan(scores)
+    weight_sums = (present * weights).sum(axis=1)
+    totals = (np.where(present, scores, 0.0) * weights).sum(axis=1)
+    return np.divide(totals, weight_sums, out=np.zeros_like(totals), where=weight_sums > 0)
+
+
+def score_matrix(matrix: ScoreMatrix) -> Dict[int, Dict[str, Any]]:
+    """
+    Totals, ranks and normalised scores of every bid in a score matrix.
+
+    The total is the weighted mean of a bid's item scores, reduced by a penalty when
+    its mandatory specs average below settings.SCORING_MANDATORY_THRESHOLD (a missing
+    mandatory spec counts as 0). Ranks are competition ranks, 1 for the best total;
+    normalised scores spread the totals over 0-100 between the lowest and the highest.
+
+    Args:
+        matrix: Scores of the bids
+
+    Returns:
+        Mapping of bid ID to its total, rank, normalised score, requirement and
+        technical averages, mandatory average and penalty
+    """
+    if not matrix.bid_ids:
+        return {}
+    scores = matrix.scores
+
+    base = weighted_mean(scores, matrix.weights)
+    requirement_scores = weighted_mean(scores[:, matrix.is_requirement], matrix.weights[matrix.is_requirement])
+    technical_scores = weighted_mean(scores[:, ~matrix.is_requirement], matrix.weights[~matrix.is_requirement])
+
+    threshold = settings.SCORING_MANDATORY_THRESHOLD
+    if matrix.is_mandatory.any():
+        mandatory_avg = np.nan_to_num(scores[:, matrix.is_mandatory], nan=0.0).mean(axis=1)
+        penalty = np.clip(threshold - mandatory_avg, 0, None) / 100
+    else:
+        mandatory_avg = np.full(len(matrix.bid_ids), np.nan)
+        penalty = np.zeros(len(matrix.bid_ids))
+    totals = base * (1 - penalty)
+
+    # Competition ranking: bids with equal totals share the better rank
+    ranks = (totals[None, :] > totals[:, None]).sum(axis=1) + 1
+    spread = totals.max() - totals.min()
+    normalised = (totals - totals.min()) / spread * 100 if spread > 0 else np.full(len(totals), 100.0)
+
+    return {
+        bid_id: {
+            "total_score": round(float(totals[row]), 2),
+            "rank": int(ranks[row]),
+            "normalized_score": round(float(normalised[row]), 2),
+            "requirement_score": round(float(requirement_scores[row]), 2),
+            "technical_score": round(float(technical_scores[row]), 2),
+            "mandatory_average": None if np.isnan(mandatory_avg[row]) else round(float(mandatory_avg[row]), 2),
+            "mandatory_penalty": round(float(penalty[row]), 4),
+            "items_scored": int((~np.isnan(scores[row])).sum())
+        }
+        for row, bid_id in enumerate(matrix.bid_ids)
+    }
+
+
+def score_bid(
+    requirements: List[Requirement],
+    tech_specs: List[TechnicalSpecification],
+    requirement_compliance: Dict[str, Dict],
+    technical_compliance: Dict[str, Dict]
+) -> float:
+    """
+    Total score of a single bid's compliance results, as score_matrix computes it.
+    """
+    matrix = ScoreMatrix([0], requirements, tech_specs, {0: (requirement_compliance, technical_compliance)})
+    return score_matrix(matrix)[0]["total_score"]
+
+
+def load_overrides(db: Session, bid_ids: List[int]) -> Dict[int, List[ScoreOverride]]:
+    """
+    Reviewer score overrides of several bids.
+
+    Returns:
+        Mapping of bid ID to its overrides; bids without any are left out
+    """
+    overrides: Dict[int, List[ScoreOverride]] = {}
+    if not bid_ids:
+        return overrides
+    for override in db.query(ScoreOverride).filter(ScoreOverride.bid_id.in_(list(bid_ids))).all():
+        overrides.setdefault(override.bid_id, []).append(override)
+    return overrides
+
+
+def apply_overrides(
+    requirement_compliance: Optional[Dict[str, Dict]],
+    technical_compliance: Optional[Dict[str, Dict]],
+    overrides: List[ScoreOverride]
+) -> tuple:
+    """
+    Compliance results with reviewer overrides applied, leaving the originals untouched.
+
+    Args:
+        requirement_compliance: Stored requirement results by requirement ID
+        technical_compliance: Stored spec results by spec ID
+        overrides: The bid's score overrides
+
+    Returns:
+        Tuple of (requirement_compliance, technical_compliance, applied), where applied
+        lists each override with the score it replaced
+    """
+    effective = {
+        "requirement": dict(requirement_compliance or {}),
+        "tech_spec": dict(technical_compliance or {})
+    }
+    applied = []
+    for override in overrides:
+        results = effective.get(override.item_type)
+        if results is None:
+            continue
+        original = results.get(override.item_id)
+        results[override.item_id] = {
+            **(original or {}),
+            "score": override.score,
+            "explanation": override.explanation or (original or {}).get("explanation"),
+            "override_id": override.id
+        }
+        applied.append({
+            "id": override.id,
+            "item_type": override.item_type,
+            "item_id": override.item_id,
+            "score": override.score,
+            "original_score": (original or {}).get("score"),
+            "review_id": override.review_id,
+            "created_by": override.created_by
+        })
+    return effective["requirement"], effective["tech_spec"], applied
+
+
+def rfp_score_matrix(
+    db: Session,
+    rfp_id: int,
+    bids: Optional[List[VendorBid]] = None
+) -> Optional[ScoreMatrix]:
+    """
+    Score matrix of every evaluated bid of an RFP, from its current analysis and score overrides.
+
+    Args:
+        db: Database session
+        rfp_id: ID of the RFP
+        bids: The RFP's bids, if already loaded
+
+    Returns:
+        The matrix with one row per evaluated bid, or None if no bid has an analysis
+    """
+    if bids is None:
+        bids = db.query(VendorBid).filter(VendorBid.rfp_id == rfp_id).all()
+    analyses = current_analyses(db, bids)
+    if not analyses:
+        return None
+
+    requirements = db.query(Requirement).filter(Requirement.rfp_id == rfp_id).order_by(Requirement.id).all()
+    tech_specs = (
+        db.query(TechnicalSpecification)
+        .filter(TechnicalSpecification.rfp_id == rfp_id)
+        .order_by(TechnicalSpecification.id)
+        .all()
+    )
+    bid_ids = [bid.id for bid in bids if bid.id in analyses]
+    overrides = load_overrides(db, bid_ids)
+    compliance = {}
+    for bid_id in bid_ids:
+        analysis = analyses[bid_id]
+        requirement_compliance, technical_compliance, _ = apply_overrides(
+            analysis.requirement_compliance, analysis.technical_compliance, overrides.get(bid_id, [])
+        )
+        compliance[bid_id] = (requirement_compliance, technical_compliance)
+
+    matrix = ScoreMatrix(bid_ids, requirements, tech_specs, compliance)
+    matrix.override_counts = {bid_id: len(overrides.get(bid_id, [])) for bid_id in bid_ids}
+    return matrix
+
+
+def score_rfp_bids(
+    db: Session,
+    rfp_id: int,
+    bids: Optional[List[VendorBid]] = None
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Score every evaluated bid of an RFP from its current analysis and score overrides.
+
+    Args:
+        db: Database session
+        rfp_id: ID of the RFP
+        bids: The RFP's bids, if already loaded
+
+    Returns:
+        Mapping of bid ID to its scores; bids without an analysis are left out
+    """
+    matrix = rfp_score_matrix(db, rfp_id, bids)
+    if matrix is None:
+        return {}
+    scores = score_matrix(matrix)
+    for bid_id in matrix.bid_ids:
+        scores[bid_id]["overrides"] = matrix.override_counts[bid_id]
+    return scores
+
+
+def scoring_weights() -> Dict[str, Any]:
+    """The weights scores are currently computed with, for reports."""
+    return {
+        "category": dict(settings.SCORING_CATEGORY_WEIGHTS),
+        "priority": dict(settings.SCORING_PRIORITY_WEIGHTS),
+        "mandatory": settings.SCORING_MANDATORY_WEIGHT,
+        "mandatory_threshold": settings.SCORING_MANDATORY_THRESHOLD
+    }
@@ -5,6 +5,7 @@ This module handles security requirement assessment and risk prediction for vend
 
 import logging
 import json
+import re
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
@@ -19,13 +20,32 @@ from app.models.government import (
     ComplianceLevel
 )
 from app.utils.llm_utils import chunk_text
-from app.utils.openai_utils import analyze_with_openai
+from app.utils.pdf_utils import extract_document_text
+from app.utils.openai_utils import analyze_with_openai, evaluate_security_family
+from app.utils.prompt_templates import render_prompt
+from app.utils.db_bulk import bulk_upsert, prefetch_by_key
+from app.utils.section_utils import segment_sections
+from app.utils.requirement_rules import extract_requirement_candidates
+from app.services.evidence_matrix import build_evidence_matrix, load_evidence, evidence_text
+from app.services.control_catalog import Control, get_control_catalog
+from app.services.control_crosswalk import get_control_crosswalk
+from app.services.control_mentions import store_control_mentions, cited_evidence
+from app.services.summarizer import get_document_digest
 from app.utils.perplexity_utils import analyze_with_perplexity, analyze_bid_sentiment as perplexity_analyze_sentiment
+from app.config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Compliance level of a cited control, from the modal phrase of the sentence citing it
+_PRIORITY_LEVELS = {
+    "Must-have": ComplianceLevel.REQUIRED,
+    "Should-have": ComplianceLevel.RECOMMENDED,
+    "Nice-to-have": ComplianceLevel.OPTIONAL
+}
+_FEDRAMP = re.compile(r"\bFedRAMP\b", re.IGNORECASE)
+
 def assess_security_compliance(bid_id: int, db: Session) -> bool:
     """
     Assess a vendor bid against security requirements from the RFP.
@@ -70,37 +90,43 @@ def assess_security_compliance(bid_id: int, db: Session) -> bool:
             # Extract security requirements from RFP using LLM
             extracted_requirements = extract_security_requirements(bid.rfp_document, db)
             security_requirements.extend(extracted_requirements)
+        
+        # Select the bid passages relevant to each control once, from the shared evidence matrix,
+        # with the passages that cite a control put first
+        bid_text = extract_document_text(bid.file_path)
+        evidence = build_evidence_matrix(bid, bid_text, db)
+        store_control_mentions(db, bid.id, bid_text)
+        evidence = cited_evidence(db, bid.id, bid_text, security_requirements, evidence)
             
-        # Assess bid against each security requirement
-        for requirement in security_requirements:
-            # Check if assessment already exists
-            existing = (
-                db.query(BidSecurityCompliance)
-                .filter(
-                    BidSecurityCompliance.bid_id == bid.id,
-                    BidSecurityCompliance.requirement_id == requirement.id
-                )
-                .first()
-            )
-            
-            if existing:
-                continue  # Skip if already assessed
-                
-            # Evaluate compliance
-            compliance_result = evaluate_security_compliance(requirement, bid, db)
-            
-            # Record compliance result
-            compliance = BidSecurityCompliance(
-                bid_id=bid.id,
-                requirement_id=requirement.id,
-                compliance_score=compliance_result["score"],
-                compliance_notes=compliance_result["explanation"],
-                is_compliant=compliance_result["score"] >= 70,  # Threshold for compliance
-                verification_status="pending"
-            )
-            
-            db.add(compliance)
+        # Load every existing assessment of the bid with one query instead of one per requirement
+        assessed = prefetch_by_key(
+            db, BidSecurityCompliance, ("requirement_id",),
+            BidSecurityCompliance.bid_id == bid.id
+        )
+        # Requirements whose assessment failed are retried
+        pending = [
+            requirement for requirement in security_requirements
+            if (requirement.id,) not in assessed or assessed[(requirement.id,)].verification_status == "error"
+        ]
+        
+        # Assess each class of equivalent controls once, in one call per family, and map the results
+        results = _assess_with_crosswalk(pending, security_requirements, assessed, bid, evidence, db)
+        rows = [
+            {
+                "bid_id": bid.id,
+                "requirement_id": requirement.id,
+                "compliance_score": results[requirement.id]["score"],
+                "compliance_notes": results[requirement.id]["explanation"],
+                "is_compliant": results[requirement.id]["score"] >= 70,  # Threshold for compliance
+                "verification_status": "error" if results[requirement.id].get("status") == "error" else "pending",
+                "confidence": results[requirement.id].get("confidence"),
+                "source_requirement_id": results[requirement.id].get("source_requirement_id"),
+                "mapping": results[requirement.id].get("mapping")
+            }
+            for requirement in pending
+        ]
         
+        bulk_upsert(db, BidSecurityCompliance, rows, key_columns=("bid_id", "requirement_id"))
         db.commit()
         return True
         
@@ -109,7 +135,213 @@ def assess_security_compliance(bid_id: int, db: Session) -> bool:
         db.rollback()
         return False
 
-def evaluate_security_compliance(requirement: SecurityRequirement, bid: VendorBid, db: Session) -> Dict:
+def _mapped_result(result: Dict, source: SecurityRequirement, mapping: str, overlap: float = 1.0) -> Dict:
+    """A control's result taken from another control's assessment, at confidence reduced by their overlap."""
+    confidence = result.get("confidence")
+    if mapping == "partial":
+        confidence = round((confidence if confidence is not None else 1.0) * overlap, 3)
+    source_name = f"{source.framework.value} {source.requirement_id}"
+    return {
+        "score": result["score"],
+        "explanation": f"{result['explanation']} (Propagated from {source_name} via {mapping} mapping)",
+        "confidence": confidence,
+        "status": result.get("status"),
+        "source_requirement_id": source.id,
+        "mapping": mapping
+    }
+
+def _assess_with_crosswalk(
+    pending: List[SecurityRequirement],
+    requirements: List[SecurityRequirement],
+    assessed: Dict,
+    bid: VendorBid,
+    evidence: Dict,
+    db: Session
+) -> Dict[int, Dict]:
+    """
+    Assess pending requirements once per class of equivalent controls.
+    
+    Controls equivalent through the control crosswalk (e.g. FedRAMP AC-7, NIST
+    800-171 3.1.8 and CMMC AC.L2-3.1.8) share one assessment: a class the bid was
+    already assessed on takes that result, otherwise one of its controls is assessed
+    and the rest take its result. A class overlapping an assessed class by at least
+    settings.CROSSWALK_PARTIAL_MIN_OVERLAP takes that result at reduced confidence;
+    results are only ever taken from direct assessments that succeeded, and results
+    taken from a failed assessment are marked failed too, so they are retried with it.
+    
+    Args:
+        pending: Requirements to assess
+        requirements: All the bid's security requirements
+        assessed: The bid's existing assessments, keyed by (requirement ID,)
+        bid: Vendor bid
+        evidence: The bid's evidence matrix
+        db: Database session
+        
+    Returns:
+        Mapping of requirement ID to its compliance result
+    """
+    if not settings.CROSSWALK_ENABLED:
+        return _assess_by_family(pending, bid, evidence, db)
+    
+    crosswalk = get_control_crosswalk()
+    class_keys = {
+        requirement.id: crosswalk.class_key(requirement.framework, requirement.requirement_id)
+        or ("requirement", str(requirement.id))
+        for requirement in requirements
+    }
+    
+    # Classes the bid already has a direct assessment for
+    sources: Dict = {}
+    for requirement in requirements:
+        row = assessed.get((requirement.id,))
+        if (
+            row is not None and row.mapping is None and row.verification_status != "error"
+            and class_keys[requirement.id] not in sources
+        ):
+            sources[class_keys[requirement.id]] = (requirement, {
+                "score": row.compliance_score,
+                "explanation": row.compliance_notes or "",
+                "confidence": row.confidence
+            })
+    
+    classes: Dict = {}
+    for requirement in pending:
+        classes.setdefault(class_keys[requirement.id], []).append(requirement)
+    
+    # One representative per class is assessed, unless the class overlaps enough with an assessed one
+    representatives: Dict = {}
+    overlaps: Dict = {}
+    for key, members in classes.items():
+        if key in sources:
+            continue
+        neighbours = [
+            (weight, neighbour) for neighbour, weight in crosswalk.overlapping(key).items()
+            if weight >= settings.CROSSWALK_PARTIAL_MIN_OVERLAP and (neighbour in sources or neighbour in representatives)
+        ]
+        if neighbours:
+            overlaps[key] = max(neighbours)
+        else:
+            representatives[key] = members[0]
+    
+    assessed_results = _assess_by_family(list(representatives.values()), bid, evidence, db)
+    for key, representative in representatives.items():
+        sources[key] = (representative, assessed_results[representative.id])
+    
+    results: Dict[int, Dict] = {}
+    for key, members in classes.items():
+        for requirement in members:
+            if representatives.get(key) is requirement:
+                results[requirement.id] = assessed_results[requirement.id]
+            elif key in overlaps:
+                weight, neighbour = overlaps[key]
+                source, result = sources[neighbour]
+                results[requirement.id] = _mapped_result(result, source, "partial", weight)
+            else:
+                source, result = sources[key]
+                results[requirement.id] = _mapped_result(result, source, "equivalent")
+    
+    mapped = sum(1 for result in results.values() if result.get("mapping"))
+    logger.info(f"Assessed {len(representatives)} control classes of bid {bid.id}; {mapped} results taken through the crosswalk")
+    return results
+
+def _family_passages(requirements: List[SecurityRequirement], evidence: Dict) -> Tuple[List[str], Dict[int, List[int]]]:
+    """
+    The bid passages of a family's controls, each passage once, taken best rank first
+    across the controls until settings.SECURITY_FAMILY_EVIDENCE_CHARS is used up.
+    
+    Returns:
+        Tuple of (passage texts, mapping of requirement ID to the indexes of its passages)
+    """
+    passages: List[str] = []
+    positions: Dict[int, int] = {}  # passage_index in the bid -> position in passages
+    control_passages: Dict[int, List[int]] = {requirement.id: [] for requirement in requirements}
+    budget = settings.SECURITY_FAMILY_EVIDENCE_CHARS
+    links = {requirement.id: evidence.get(("security", requirement.id), []) for requirement in requirements}
+    depth = max((len(requirement_links) for requirement_links in links.values()), default=0)
+    
+    for rank in range(depth):
+        for requirement in requirements:
+            if rank >= len(links[requirement.id]):
+                continue
+            link = links[requirement.id][rank]
+            if link.passage_index not in positions:
+                text = link.passage_text.strip()
+                if len(text) > budget:
+                    continue
+                budget -= len(text)
+                positions[link.passage_index] = len(passages)
+                passages.append(text)
+            control_passages[requirement.id].append(positions[link.passage_index])
+    return passages, control_passages
+
+def _assess_by_family(
+    requirements: List[SecurityRequirement],
+    bid: VendorBid,
+    evidence: Dict,
+    db: Session
+) -> Dict[int, Dict]:
+    """
+    Assess a bid against security requirements with one LLM call per control family.
+    
+    Requirements are grouped by the family of their control ID; those without one
+    form a group of their own. Families larger than settings.SECURITY_FAMILY_BATCH_SIZE
+    are split. Controls a response leaves out, and the controls of a family whose
+    call fails, are assessed one by one.
+    
+    Args:
+        requirements: Requirements to assess
+        bid: Vendor bid
+        evidence: The bid's evidence matrix
+        db: Database session
+        
+    Returns:
+        Mapping of requirement ID to its compliance result
+    """
+    catalog = get_control_catalog()
+    families: Dict[str, List[SecurityRequirement]] = {}
+    for requirement in requirements:
+        family = catalog.control_family(requirement.requirement_id) or ""
+        families.setdefault(family, []).append(requirement)
+    
+    results: Dict[int, Dict] = {}
+    batch_size = settings.SECURITY_FAMILY_BATCH_SIZE
+    for family, family_requirements in families.items():
+        family_name = catalog.families.get(family, "Other security requirements")
+        for offset in range(0, len(family_requirements), batch_size):
+            batch = family_requirements[offset:offset + batch_size]
+            passages, control_passages = _family_passages(batch, evidence)
+            controls = [
+                {
+                    "requirement_id": requirement.requirement_id,
+                    "title": requirement.title,
+                    "description": requirement.description,
+                    "framework": requirement.framework.value,
+                    "passages": control_passages[requirement.id]
+                }
+                for requirement in batch
+            ]
+            try:
+                batch_results = evaluate_security_family(family_name, controls, passages)
+            except Exception as e:
+                logger.error(f"Error assessing the {family_name} controls of bid {bid.id}, assessing them one by one: {str(e)}")
+                batch_results = [None] * len(batch)
+            
+            for requirement, result in zip(batch, batch_results):
+                if result is None:
+                    result = evaluate_security_compliance(
+                        requirement, bid, db,
+                        evidence=evidence_text(evidence, "security", requirement.id)
+                    )
+                results[requirement.id] = result
+        logger.info(f"Assessed {len(family_requirements)} {family_name} controls of bid {bid.id}")
+    return results
+
+def evaluate_security_compliance(
+    requirement: SecurityRequirement,
+    bid: VendorBid,
+    db: Session,
+    evidence: Optional[str] = None
+) -> Dict:
     """
     Evaluate how well a bid complies with a specific security requirement.
     
@@ -117,41 +349,25 @@ def evaluate_security_compliance(requirement: SecurityRequirement, bid: VendorBi
         requirement: Security requirement details
         bid: Vendor bid to evaluate
         db: Database session
+        evidence: Bid passages relevant to the requirement; loaded from the
+            bid's evidence matrix when not given
         
     Returns:
         Compliance score, explanation, and status
     """
     try:
-        # Extract text from bid document for analysis
-        # This would typically use a utils function to read the file
-        # For now, we'll assume we have the text content
-        bid_text = "Sample bid text"  # Replace with actual bid text extraction
+        if evidence is None:
+            evidence = evidence_text(load_evidence(db, bid.id), "security", requirement.id)
+        bid_text = evidence or "No passage of the bid mentions this requirement."
         
         # Create prompt for LLM
-        prompt = f"""
-        Analyze this bid's compliance with the following security requirement:
-        
-        Requirement: {requirement.title}
-        Description: {requirement.description}
-        Framework: {requirement.framework.value}
-        ID: {requirement.requirement_id}
-        
-        Provide a compliance score from 0-100, where:
-        - 0-39: Non-compliant, does not address the requirement
-        - 40-69: Partially compliant, addresses some aspects but has gaps
-        - 70-89: Mostly compliant, addresses most aspects with minor gaps
-        - 90-100: Fully compliant, comprehensively addresses all aspects
-        
-        Also provide a detailed explanation of your assessment and any evidence found in the bid.
-        
-        Format your response as valid JSON with the following structure:
-        {{
-            "score": number,
-            "explanation": string,
-            "evidence": string,
-            "status": string
-        }}
-        """
+        prompt = render_prompt(
+            "security_compliance",
+            title=requirement.title,
+            description=requirement.description,
+            framework=requirement.framework.value,
+            requirement_id=requirement.requirement_id
+        )
         
         # Analyze using LLM
         response = analyze_with_openai(prompt, bid_text, 'json')
@@ -177,9 +393,35 @@ def evaluate_security_compliance(requirement: SecurityRequirement, bid: VendorBi
             "status": "error"
         }
 
+def _requirements_agency(rfp: RFPDocument, db: Session) -> GovernmentAgency:
+    """The RFP's agency, created from the RFP's details if it has none."""
+    if rfp.agency_id:
+        return db.query(GovernmentAgency).filter(GovernmentAgency.id == rfp.agency_id).first()
+    
+    agency = GovernmentAgency(
+        name=rfp.agency or "Unknown Agency",
+        description=f"Auto-created from RFP: {rfp.title}"
+    )
+    db.add(agency)
+    db.flush()  # Get ID without committing
+    
+    # Update RFP with agency ID
+    rfp.agency_id = agency.id
+    return agency
+
+def _catalog_framework(control: Control, fedramp: bool) -> SecurityFramework:
+    # FedRAMP baselines are made of 800-53 controls; an RFP that asks for FedRAMP means them
+    if fedramp and control.framework == SecurityFramework.NIST800_53:
+        return SecurityFramework.FEDRAMP
+    return control.framework
+
 def extract_security_requirements(rfp: RFPDocument, db: Session) -> List[SecurityRequirement]:
     """
-    Extract security requirements from RFP document using LLM analysis.
+    Extract security requirements from an RFP document.
+    
+    Control IDs the RFP cites (e.g. "AC-2", "3.5.3" or "IA.L2-3.5.3") are resolved
+    by lookup in the control catalog. Only the security requirements stated in
+    free text, without a known control ID, are extracted by the LLM.
     
     Args:
         rfp: RFP document
@@ -189,66 +431,88 @@ def extract_security_requirements(rfp: RFPDocument, db: Session) -> List[Securit
         List of security requirements
     """
     try:
-        # Get RFP text for analysis
-        # This would typically use a utils function to read the file
-        # For now, we'll assume we have the text content
-        rfp_text = "Sample RFP text"  # Replace with actual RFP text extraction
-        
-        # Create prompt for LLM
-        prompt = """
-        Extract all security requirements from this RFP.
-        For each requirement, identify:
-        1. The security framework it belongs to (e.g., NIST, FedRAMP, CMMC, etc.)
-        2. The requirement ID if available (e.g., AC-2, IA-4)
-        3. The requirement title
-        4. The detailed description
-        5. The compliance level (required, recommended, or optional)
-        
-        Format your response as a JSON array of objects with the following structure:
-        [
-            {
-                "framework": string,
-                "requirement_id": string,
-                "title": string,
-                "description": string,
-                "compliance_level": string
-            }
-        ]
-        """
+        rfp_text = extract_document_text(rfp.file_path) if rfp.file_path else ""
+        catalog = get_control_catalog()
+        fedramp = bool(_FEDRAMP.search(rfp_text))
         
-        # Analyze using LLM
-        response = analyze_with_openai(prompt, rfp_text, 'json')
+        candidates = extract_requirement_candidates(segment_sections(rfp_text))
+        mentions = catalog.find_mentions(rfp_text)
         
-        # Create SecurityRequirement objects
+        agency = None
         requirements = []
+        seen = set()
+        
+        # Cited controls: the sentence citing them sets the compliance level
+        cited_candidates = set()
+        uncited_candidates = set()
+        for mention in mentions:
+            candidate_index = next(
+                (index for index, candidate in enumerate(candidates)
+                 if candidate["start"] <= mention["start"] < candidate["end"]),
+                None
+            )
+            candidate = candidates[candidate_index] if candidate_index is not None else None
+            control = mention["control"]
+            if candidate_index is not None:
+                (cited_candidates if control else uncited_candidates).add(candidate_index)
+            if control is None:
+                continue
+            
+            requirement_id = control.control_id
+            if mention["enhancement"]:
+                requirement_id = f"{requirement_id}({mention['enhancement']})"
+            if requirement_id in seen:
+                continue
+            seen.add(requirement_id)
+            
+            agency = agency or _requirements_agency(rfp, db)
+            requirement = SecurityRequirement(
+                agency_id=agency.id if agency else None,
+                framework=_catalog_framework(control, fedramp),
+                requirement_id=requirement_id,
+                title=control.title[:255],
+                description=control.description,
+                compliance_level=_PRIORITY_LEVELS.get(candidate["priority"] if candidate else None, ComplianceLevel.REQUIRED),
+                implementation_guidance=candidate["description"] if candidate else None
+            )
+            db.add(requirement)
+            requirements.append(requirement)
+        
+        # Only security requirements without a known cited control are left for the LLM; if
+        # the rule-based parser finds neither, the LLM reads the whole RFP as before
+        free_text = [
+            candidate["description"] for index, candidate in enumerate(candidates)
+            if index not in cited_candidates and (
+                index in uncited_candidates
+                or candidate["category"] == "Security"
+                or catalog.security_terms(candidate["description"])
+            )
+        ]
+        if free_text:
+            llm_text = "\n".join(f"- {sentence}" for sentence in free_text)
+        elif not requirements:
+            llm_text = rfp_text
+        else:
+            llm_text = ""
+        logger.info(
+            f"RFP {rfp.id}: {len(requirements)} security controls resolved from the catalog, "
+            f"{len(free_text)} free-text security requirements left for the LLM"
+        )
+        
+        response = None
+        if llm_text:
+            # Create prompt for LLM
+            prompt = render_prompt("security_requirement_extraction")
+            
+            # Analyze using LLM
+            response = analyze_with_openai(prompt, llm_text, 'json')
         
         if isinstance(response, list):
-            # Create agency if not exists
-            agency = None
-            if not rfp.agency_id:
-                # Create a new agency based on RFP details
-                agency = GovernmentAgency(
-                    name=rfp.agency or "Unknown Agency",
-                    description=f"Auto-created from RFP: {rfp.title}"
-                )
-                db.add(agency)
-                db.flush()  # Get ID without committing
-                
-                # Update RFP with agency ID
-                rfp.agency_id = agency.id
-            else:
-                agency = db.query(GovernmentAgency).filter(GovernmentAgency.id == rfp.agency_id).first()
+            agency = agency or _requirements_agency(rfp, db)
             
             # Process each extracted requirement
             for req_data in response:
                 try:
-                    # Map framework string to enum
-                    framework = SecurityFramework.OTHER
-                    for enum_value in SecurityFramework:
-                        if enum_value.value.lower() in req_data.get("framework", "").lower():
-                            framework = enum_value
-                            break
-                    
                     # Map compliance level string to enum
                     compliance_level = ComplianceLevel.REQUIRED
                     if "recommend" in req_data.get("compliance_level", "").lower():
@@ -256,15 +520,37 @@ def extract_security_requirements(rfp: RFPDocument, db: Session) -> List[Securit
                     elif "option" in req_data.get("compliance_level", "").lower():
                         compliance_level = ComplianceLevel.OPTIONAL
                     
-                    # Create requirement
-                    requirement = SecurityRequirement(
-                        agency_id=agency.id if agency else None,
-                        framework=framework,
-                        requirement_id=req_data.get("requirement_id", ""),
-                        title=req_data.get("title", "Unknown Requirement"),
-                        description=req_data.get("description", ""),
-                        compliance_level=compliance_level
-                    )
+                    # A control ID the LLM names is taken from the catalog rather than its own wording
+                    control = catalog.get(req_data.get("requirement_id", ""))
+                    if control:
+                        if control.control_id in seen:
+                            continue
+                        seen.add(control.control_id)
+                        requirement = SecurityRequirement(
+                            agency_id=agency.id if agency else None,
+                            framework=_catalog_framework(control, fedramp),
+                            requirement_id=control.control_id,
+                            title=control.title[:255],
+                            description=control.description,
+                            compliance_level=compliance_level,
+                            implementation_guidance=req_data.get("description") or None
+                        )
+                    else:
+                        # Map framework string to enum
+                        framework = SecurityFramework.OTHER
+                        for enum_value in SecurityFramework:
+                            if enum_value.value.lower() in req_data.get("framework", "").lower():
+                                framework = enum_value
+                                break
+                        
+                        requirement = SecurityRequirement(
+                            agency_id=agency.id if agency else None,
+                            framework=framework,
+                            requirement_id=req_data.get("requirement_id", ""),
+                            title=req_data.get("title", "Unknown Requirement"),
+                            description=req_data.get("description", ""),
+                            compliance_level=compliance_level
+                        )
                     
                     db.add(requirement)
                     requirements.append(requirement)
@@ -272,9 +558,8 @@ def extract_security_requirements(rfp: RFPDocument, db: Session) -> List[Securit
                 except Exception as e:
                     logger.error(f"Error processing requirement: {str(e)}")
                     continue
-            
-            db.flush()  # Get IDs without committing
         
+        db.flush()  # Get IDs without committing
         return requirements
         
     except Exception as e:
@@ -313,41 +598,18 @@ def predict_bid_risks(bid_id: int, db: Session) -> Dict:
                 "risks": []
             }
         
-        # Extract text from bid document for analysis
-        # This would typically use a utils function to read the file
-        # For now, we'll assume we have the text content
-        bid_text = "Sample bid text"  # Replace with actual bid text extraction
-        rfp_text = "Sample RFP text"  # Replace with actual RFP text extraction
+        # Whole-bid analysis reads the cached summary tree of the bid's extracted text
+        bid_text = get_document_digest(extract_document_text(bid.file_path), db) if bid.file_path else ""
+        if not bid_text:
+            logger.error(f"No text could be extracted from bid {bid_id}")
+            return {
+                "success": False,
+                "message": "No text could be extracted from the bid",
+                "risks": []
+            }
         
         # Create prompt for risk prediction using LLM
-        prompt = f"""
-        Analyze this vendor bid for the following risk categories:
-        1. Financial stability risks (e.g., insufficient resources, pricing inconsistencies)
-        2. Technical capability risks (e.g., unproven technology, insufficient expertise)
-        3. Delivery timeline risks (e.g., unrealistic deadlines, resource constraints)
-        4. Compliance risks (e.g., regulatory issues, certification gaps)
-        5. Security risks (e.g., data protection vulnerabilities, access control issues)
-        
-        For each risk identified:
-        - Provide a clear title
-        - Rate the severity (High, Medium, Low)
-        - Provide a detailed explanation
-        - Suggest mitigation strategies
-        
-        Format your response as valid JSON with the following structure:
-        {{
-            "overall_risk_score": number,  // 0-100 where 0 is lowest risk
-            "risks": [
-                {{
-                    "category": string,
-                    "title": string,
-                    "severity": string,
-                    "explanation": string,
-                    "mitigation": string
-                }}
-            ]
-        }}
-        """
+        prompt = render_prompt("bid_risk_prediction")
         
         # Try to use Perplexity API first (if available) as it's better for longer context
         try:
@@ -360,6 +622,11 @@ def predict_bid_risks(bid_id: int, db: Session) -> Dict:
         
         # Validate response
         if isinstance(response, dict) and "risks" in response:
+            # Keep the score for multi-criteria ranking of the RFP's bids, only when the model gave one
+            if isinstance(response.get("overall_risk_score"), (int, float)):
+                bid.risk_score = response["overall_risk_score"]
+                db.commit()
+            
             return {
                 "success": True,
                 "message": "Risk analysis completed successfully",
@@ -412,41 +679,7 @@ def analyze_bid_sentiment(bid_id: int, db: Session) -> Dict:
         bid_text = "Sample bid text"  # Replace with actual bid text extraction
         
         # Create prompt for sentiment analysis using LLM
-        prompt = """
-        Analyze the sentiment and language patterns in this vendor bid. 
-        Identify potential issues such as:
-        
-        1. Uncertainty or lack of confidence (e.g., hedging language, excessive qualifiers)
-        2. Overcommitment (e.g., unrealistic promises, lack of specificity in delivery)
-        3. Ambiguity (e.g., vague terms, undefined scope)
-        4. Reluctance (e.g., excessive caveats, limitations)
-        5. Negative sentiment (e.g., complaints about requirements, defensive tone)
-        
-        For each section of the bid, identify the overall sentiment and confidence level.
-        Also identify any concerning patterns or red flags.
-        
-        Format your response as valid JSON with the following structure:
-        {
-            "overall_sentiment": string,  // "positive", "neutral", or "negative"
-            "confidence_score": number,   // 0-100 where 100 is highest confidence
-            "key_findings": [
-                {
-                    "finding": string,
-                    "evidence": string,
-                    "significance": string,
-                    "recommendation": string
-                }
-            ],
-            "section_analysis": [
-                {
-                    "section": string,
-                    "sentiment": string,
-                    "confidence": number,
-                    "notable_patterns": string
-                }
-            ]
-        }
-        """
+        prompt = render_prompt("bid_sentiment")
         
         # Use our dedicated Perplexity sentiment analysis function
         try:
@@ -0,0 +1,289 @@
+"""
+Award sensitivity service for the UniSphere application.
+Answers "would the ranking change under different weights?" from stored compliance
+scores alone. Each bid's scores are averaged per category once; every weighting
+of the categories is then a matrix product, so thousands of random or grid
+weightings are ranked in one vectorised pass. For each category it also finds the
+exact weights at which the winner changes.
+"""
+
+import itertools
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.document import VendorBid
+from app.services.scoring import ScoreMatrix, rfp_score_matrix, score_matrix, weighted_mean
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SENSITIVITY_MODES = ("random", "grid")
+
+
+class CategoryScores:
+    """
+    Bids' scores averaged per category, and the category weights the scoring
+    engine implies: each category's share of the total item weight.
+    """
+
+    def __init__(self, matrix: ScoreMatrix):
+        self.bid_ids = matrix.bid_ids
+        self.categories = sorted(set(matrix.categories))
+        columns = np.array([self.categories.index(category) for category in matrix.categories], dtype=int)
+
+        self.scores = np.zeros((len(self.bid_ids), len(self.categories)))
+        self.baseline = np.zeros(len(self.categories))
+        for index in range(len(self.categories)):
+            in_category = columns == index
+            self.scores[:, index] = weighted_mean(matrix.scores[:, in_category], matrix.weights[in_category])
+            self.baseline[index] = matrix.weights[in_category].sum()
+        if self.baseline.sum() > 0:
+            self.baseline = self.baseline / self.baseline.sum()
+
+        # The mandatory-spec penalty doesn't depend on the weights, so it scales each bid's total
+        engine_scores = score_matrix(matrix)
+        self.factors = np.array([1 - engine_scores[bid_id]["mandatory_penalty"] for bid_id in self.bid_ids])
+
+    def totals(self, weights: np.ndarray) -> np.ndarray:
+        """Totals of every bid under each weighting: (weightings × categories) -> (weightings × bids)."""
+        return (weights @ self.scores.T) * self.factors
+
+
+def _ranks(totals: np.ndarray) -> np.ndarray:
+    """Ranks (1 = best) of each row of a (weightings × bids) matrix of totals; ties go to the earlier bid."""
+    order = np.argsort(-totals, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, totals.shape[1] + 1)[None, :].repeat(len(totals), axis=0), axis=1)
+    return ranks
+
+
+def _random_weights(categories: int, samples: int, concentration: float, baseline: np.ndarray, seed: Optional[int]) -> np.ndarray:
+    """
+    Random weightings: uniform over all weightings, or with a concentration, Dirichlet
+    draws centred on the baseline weights (higher concentration, closer to the baseline).
+    """
+    rng = np.random.default_rng(seed)
+    if concentration > 0:
+        alpha = np.maximum(baseline * concentration, 1e-3)
+    else:
+        alpha = np.ones(categories)
+    return rng.dirichlet(alpha, size=samples)
+
+
+def _grid_weights(categories: int, step: float, max_samples: int) -> np.ndarray:
+    """All weightings whose weights are multiples of step and sum to 1."""
+    if not 0 < step <= 0.5:
+        raise ValueError(f"Grid step must be greater than 0 and at most 0.5, got {step}")
+    parts = int(round(1 / step))
+    if not math.isclose(parts * step, 1.0, rel_tol=1e-9):
+        raise ValueError(f"Grid step must divide 1 into equal parts (e.g. 0.1, 0.125, 0.25), got {step}")
+    count = 1
+    for k in range(1, categories):
+        count = count * (parts + k) // k
+    if count > max_samples:
+        raise ValueError(
+            f"A grid step of {step} over {categories} categories gives {count} weightings; "
+            f"use a larger step or random sampling (limit {max_samples})"
+        )
+    # Compositions of parts into categories non-negative parts, via stars and bars
+    weights = []
+    for bars in itertools.combinations(range(parts + categories - 1), categories - 1):
+        edges = (-1,) + bars + (parts + categories - 1,)
+        weights.append([edges[i + 1] - edges[i] - 1 for i in range(categories)])
+    return np.array(weights, dtype=float) / parts
+
+
+def winner_thresholds(scores: CategoryScores, index: int) -> List[Dict[str, Any]]:
+    """
+    Weights of one category at which the winner changes, with the other categories
+    keeping their baseline proportions.
+
+    Each bid's total is linear in the category's weight t, so the winner over t in
+    [0, 1] is the upper envelope of one line per bid, walked from t = 0.
+
+    Args:
+        scores: Category scores of the bids
+        index: Index of the category
+
+    Returns:
+        The winner at weight 0, then each change as the weight where it happens and the new winner
+    """
+    others = scores.baseline.copy()
+    others[index] = 0
+    if others.sum() > 0:
+        others = others / others.sum()
+    elif len(others) > 1:
+        others = np.where(np.arange(len(others)) == index, 0.0, 1.0 / (len(others) - 1))
+    intercepts = (scores.scores @ others) * scores.factors
+    slopes = scores.scores[:, index] * scores.factors - intercepts
+
+    # Ties at t = 0 go to the bid whose total grows fastest
+    winner = int(np.lexsort((slopes, intercepts))[-1])
+    points = [{"weight": 0.0, "winner": scores.bid_ids[winner]}]
+    t = 0.0
+    while True:
+        gaining = slopes > slopes[winner] + 1e-12
+        if not gaining.any():
+            break
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossings = (intercepts[winner] - intercepts) / (slopes - slopes[winner])
+        crossings = np.where(gaining & (crossings >= t), crossings, np.inf)
+        t_next = crossings.min()
+        if t_next > 1:
+            break
+        candidates = np.flatnonzero(crossings == t_next)
+        winner = int(candidates[np.argmax(slopes[candidates])])
+        t = float(t_next)
+        points.append({"weight": round(t, 4), "winner": scores.bid_ids[winner]})
+    return points
+
+
+def _what_if_weights(scores: CategoryScores, weights: Dict[str, float]) -> np.ndarray:
+    """
+    A full weighting from weights given for some categories; the rest share what is
+    left in their baseline proportions.
+    """
+    unknown = set(weights) - set(scores.categories)
+    if unknown:
+        raise ValueError(f"Unknown categories: {', '.join(sorted(unknown))}")
+    fixed = np.array([category in weights for category in scores.categories])
+    given = np.array([float(weights.get(category, 0)) for category in scores.categories])
+    if (given < 0).any() or given.sum() > 1 + 1e-9:
+        raise ValueError("Category weights must be non-negative and sum to at most 1")
+
+    result = given.copy()
+    remaining = 1 - given.sum()
+    rest = np.where(fixed, 0.0, scores.baseline)
+    if (~fixed).any() and remaining > 0:
+        result += remaining * (rest / rest.sum() if rest.sum() > 0 else (~fixed) / (~fixed).sum())
+    return result / result.sum() if result.sum() > 0 else scores.baseline
+
+
+def _ranking(scores: CategoryScores, totals: np.ndarray, names: Dict[int, str]) -> List[Dict[str, Any]]:
+    ranks = _ranks(totals[None, :])[0]
+    return [
+        {
+            "bid_id": scores.bid_ids[row],
+            "vendor_name": names.get(scores.bid_ids[row]),
+            "total_score": round(float(totals[row]), 2),
+            "rank": int(ranks[row])
+        }
+        for row in np.argsort(ranks, kind="stable")
+    ]
+
+
+def analyze_sensitivity(
+    db: Session,
+    rfp_id: int,
+    mode: str = "random",
+    samples: Optional[int] = None,
+    step: Optional[float] = None,
+    concentration: float = 0.0,
+    weights: Optional[Dict[str, float]] = None,
+    seed: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Test how stable an RFP's bid ranking is under alternative category weightings.
+
+    Args:
+        db: Database session
+        rfp_id: ID of the RFP
+        mode: "random" for sampled weightings, "grid" for every weighting on a grid
+        samples: Number of random weightings; defaults to settings.SENSITIVITY_SAMPLES
+        step: Grid step; defaults to settings.SENSITIVITY_GRID_STEP
+        concentration: For random mode, 0 samples all weightings uniformly; higher
+            values keep them closer to the baseline weights
+        weights: Optional what-if weights for some categories, e.g. {"Security": 0.3}
+        seed: Random seed, for reproducible results
+
+    Returns:
+        Categories with baseline weights, the baseline and what-if rankings, per-bid
+        rank stability and the winner thresholds per category, or None if no bid of
+        the RFP has been evaluated
+
+    Raises:
+        ValueError: For an unknown mode, unknown categories, invalid weights or an invalid grid step
+    """
+    if mode not in SENSITIVITY_MODES:
+        raise ValueError(f"Mode must be one of: {', '.join(SENSITIVITY_MODES)}")
+
+    start = time.perf_counter()
+    bids = db.query(VendorBid).filter(VendorBid.rfp_id == rfp_id).all()
+    matrix = rfp_score_matrix(db, rfp_id, bids)
+    if matrix is None:
+        return None
+    names = {bid.id: bid.vendor_name for bid in bids}
+    scores = CategoryScores(matrix)
+    bid_count, category_count = len(scores.bid_ids), len(scores.categories)
+
+    if mode == "grid":
+        step = step if step is not None else settings.SENSITIVITY_GRID_STEP
+        simulated = _grid_weights(category_count, step, settings.SENSITIVITY_MAX_SAMPLES)
+    else:
+        samples = min(samples or settings.SENSITIVITY_SAMPLES, settings.SENSITIVITY_MAX_SAMPLES)
+        simulated = _random_weights(category_count, samples, concentration, scores.baseline, seed)
+
+    # Rank every bid under every weighting, then count how often each bid takes each rank
+    ranks = _ranks(scores.totals(simulated))
+    rank_counts = np.zeros((bid_count, bid_count), dtype=int)
+    np.add.at(rank_counts, (np.broadcast_to(np.arange(bid_count), ranks.shape), ranks - 1), 1)
+    weighting_count = len(simulated)
+
+    baseline_totals = scores.totals(scores.baseline[None, :])[0]
+    baseline_ranks = _ranks(baseline_totals[None, :])[0]
+
+    stability = []
+    for row, bid_id in enumerate(scores.bid_ids):
+        observed = np.flatnonzero(rank_counts[row])
+        stability.append({
+            "bid_id": bid_id,
+            "vendor_name": names.get(bid_id),
+            "baseline_rank": int(baseline_ranks[row]),
+            "win_probability": round(float(rank_counts[row, 0] / weighting_count), 4),
+            "top3_probability": round(float(rank_counts[row, :3].sum() / weighting_count), 4),
+            "baseline_rank_probability": round(float(rank_counts[row, baseline_ranks[row] - 1] / weighting_count), 4),
+            "mean_rank": round(float((rank_counts[row] * np.arange(1, bid_count + 1)).sum() / weighting_count), 2),
+            "best_rank": int(observed.min() + 1),
+            "worst_rank": int(observed.max() + 1),
+            "rank_distribution": rank_counts[row].tolist()
+        })
+    stability.sort(key=lambda entry: entry["baseline_rank"])
+
+    result = {
+        "rfp_id": rfp_id,
+        "mode": mode,
+        "weightings": weighting_count,
+        "categories": [
+            {"name": category, "baseline_weight": round(float(scores.baseline[index]), 4)}
+            for index, category in enumerate(scores.categories)
+        ],
+        "baseline": _ranking(scores, baseline_totals, names),
+        "stability": stability,
+        "thresholds": [
+            {
+                "category": category,
+                "baseline_weight": round(float(scores.baseline[index]), 4),
+                "winners": [
+                    {**point, "vendor_name": names.get(point["winner"])}
+                    for point in winner_thresholds(scores, index)
+                ]
+            }
+            for index, category in enumerate(scores.categories)
+        ]
+    }
+    if weights:
+        what_if = _what_if_weights(scores, weights)
+        result["what_if"] = {
+            "weights": {category: round(float(what_if[index]), 4) for index, category in enumerate(scores.categories)},
+            "ranking": _ranking(scores, scores.totals(what_if[None, :])[0], names)
+        }
+
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(f"Sensitivity analysis of RFP {rfp_id}: {weighting_count} weightings of {bid_count} bids in {result['elapsed_ms']}ms")
+    return result
@@ -0,0 +1,107 @@
+"""
+Deterministic technical specification checker for the UniSphere application.
+When a specification has numeric bounds and the bid's evidence for it states
+comparable values, compliance is decided by comparing the normalised numbers.
+Specifications without bounds, without comparable claims, or with conflicting
+claims are left to the LLM.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from app.models.document import TechnicalSpecification
+from app.utils.units import find_quantities, format_quantity
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Dimensions whose claims often measure something else (delivery times, discounts),
+# so a claim only counts when the specification's own words appear next to it
+_OVERLOADED_DIMENSIONS = {"time", "percentage"}
+_DIMENSION_KEYWORDS = {
+    "time": {"latency", "response", "delay", "jitter", "restore", "recovery", "resolution"},
+    "percentage": {"uptime", "availability", "available", "sla", "packet", "loss"},
+}
+_KEYWORD_WINDOW = 80
+_WORD = re.compile(r"[a-z]{4,}")
+
+
+def _meets(value: float, minimum: Optional[float], maximum: Optional[float]) -> bool:
+    return (minimum is None or value >= minimum) and (maximum is None or value <= maximum)
+
+
+def _closeness(value: float, minimum: Optional[float], maximum: Optional[float]) -> float:
+    """How close a failing value comes to the violated bound, between 0 and 1."""
+    if minimum is not None and value < minimum:
+        return max(value, 0.0) / minimum if minimum > 0 else 0.0
+    if maximum is not None and value > maximum:
+        return maximum / value if value > 0 else 0.0
+    return 1.0
+
+
+def _relevant_claims(spec: TechnicalSpecification, evidence: str) -> List[Dict[str, Any]]:
+    claims = [claim for claim in find_quantities(evidence) if claim["dimension"] == spec.dimension]
+    if spec.dimension not in _OVERLOADED_DIMENSIONS:
+        return claims
+
+    keywords = set(_WORD.findall(f"{spec.name or ''} {spec.description or ''}".lower()))
+    keywords |= _DIMENSION_KEYWORDS[spec.dimension]
+    lowered = evidence.lower()
+    relevant = []
+    for claim in claims:
+        window = lowered[max(claim["start"] - _KEYWORD_WINDOW, 0):claim["end"] + _KEYWORD_WINDOW]
+        if keywords & set(_WORD.findall(window)):
+            relevant.append(claim)
+    return relevant
+
+
+def check_numeric_spec(spec: TechnicalSpecification, evidence: str) -> Optional[Dict[str, Any]]:
+    """
+    Decide a specification's compliance locally from numeric claims in its evidence.
+
+    Args:
+        spec: Technical specification with normalised numeric bounds
+        evidence: The bid passages selected for the specification
+
+    Returns:
+        A compliance result in the same format as evaluate_technical_compliance, or
+        None when the specification must be evaluated by the LLM
+    """
+    if not evidence or not spec.dimension or (spec.min_numeric is None and spec.max_numeric is None):
+        return None
+
+    claims = _relevant_claims(spec, evidence)
+    if not claims:
+        return None
+
+    verdicts = [_meets(claim["value"], spec.min_numeric, spec.max_numeric) for claim in claims]
+    if all(verdicts):
+        claim = claims[0]
+        score = 100
+        outcome = "meets"
+    elif not any(verdicts):
+        claim = max(claims, key=lambda c: _closeness(c["value"], spec.min_numeric, spec.max_numeric))
+        # Failing values score up to 50, in proportion to how close they come to the bound
+        score = round(50 * _closeness(claim["value"], spec.min_numeric, spec.max_numeric))
+        outcome = "does not meet"
+    else:
+        # The bid states both passing and failing values; let the LLM read the context
+        return None
+
+    bounds = []
+    if spec.min_numeric is not None:
+        bounds.append(f"minimum {format_quantity(spec.min_numeric, spec.canonical_unit)}")
+    if spec.max_numeric is not None:
+        bounds.append(f"maximum {format_quantity(spec.max_numeric, spec.canonical_unit)}")
+
+    return {
+        "score": score,
+        "confidence": 1.0,
+        "explanation": (
+            f"The bid states {claim['text']} ({format_quantity(claim['value'], claim['unit'])}), "
+            f"which {outcome} the required {' and '.join(bounds)}."
+        ),
+        "method": "numeric",
+        "claims": [c["text"] for c in claims]
+    }
@@ -0,0 +1,291 @@
+"""
+Hierarchical summarisation service for the UniSphere application.
+This module builds a map-reduce summary tree over long documents (chunk summaries,
+then section summaries, then a document summary) so whole-document analyses can
+work on a compact but complete representation instead of a truncated prefix.
+"""
+
+import hashlib
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.analysis import SummaryNode
+from app.utils.db_bulk import bulk_upsert
+from app.utils.openai_utils import analyze_with_openai
+from app.utils.prompt_templates import get_prompt
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Extractive fallback budgets (characters) when the LLM is unavailable
+_FALLBACK_BUDGET = {"chunk": 600, "section": 1200, "document": 2000}
+
+
+def _hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def split_into_leaves(text: str, target_size: Optional[int] = None) -> List[str]:
+    """
+    Split a document into leaf chunks with content-defined boundaries.
+
+    Pages (form feeds) or paragraphs are grouped until a chunk reaches half the
+    target size and a unit whose hash hits the boundary condition ends it, or the
+    target size is exceeded. Because boundaries depend on content rather than on
+    absolute offsets, an edit on one page leaves the other chunks unchanged.
+
+    Args:
+        text: Document text
+        target_size: Approximate chunk size in characters
+
+    Returns:
+        List of leaf chunks
+    """
+    if not text:
+        return []
+
+    target_size = target_size or settings.SUMMARY_CHUNK_SIZE
+    separator = "\f" if "\f" in text else "\n\n"
+    units = text.split("\f") if separator == "\f" else _PARAGRAPH_BREAK.split(text)
+
+    leaves = []
+    current: List[str] = []
+    current_size = 0
+    for unit in units:
+        unit = unit.strip()
+        if not unit:
+            continue
+        # Units larger than a chunk are cut on their own
+        while len(unit) > target_size:
+            if current:
+                leaves.append(separator.join(current))
+                current, current_size = [], 0
+            leaves.append(unit[:target_size])
+            unit = unit[target_size:]
+        current.append(unit)
+        current_size += len(unit)
+        boundary = int(_hash(unit)[:8], 16) % 4 == 0
+        if current_size >= target_size or (boundary and current_size >= target_size // 2):
+            leaves.append(separator.join(current))
+            current, current_size = [], 0
+    if current:
+        leaves.append(separator.join(current))
+
+    return leaves
+
+
+def _group_children(child_hashes: Sequence[str], fanout: int) -> List[List[str]]:
+    """Group child hashes into parents with content-defined boundaries."""
+    groups = []
+    current: List[str] = []
+    for child_hash in child_hashes:
+        current.append(child_hash)
+        boundary = int(child_hash[:8], 16) % fanout == 0
+        if len(current) >= fanout * 2 or (boundary and len(current) >= max(2, fanout // 2)):
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _extractive_summary(text: str, budget: int) -> str:
+    """Lead sentences of each paragraph up to a character budget."""
+    summary = []
+    size = 0
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        sentences = _SENTENCE_END.split(paragraph.strip())
+        lead = " ".join(sentences[0].split()) if sentences and sentences[0] else ""
+        if not lead:
+            continue
+        if size + len(lead) > budget:
+            break
+        summary.append(lead)
+        size += len(lead) + 1
+    return "\n".join(summary) if summary else " ".join(text.split())[:budget]
+
+
+def _summarize(level: str, text: str) -> Optional[str]:
+    """Summarise one node's input with the LLM; None without an API key or when the call fails."""
+    if not settings.OPENAI_API_KEY:
+        return None
+    result = analyze_with_openai(get_prompt(f"{level}_summary").static, text)
+    if isinstance(result, str) and not result.startswith("Error analyzing text"):
+        return result.strip()
+    logger.warning(f"LLM {level} summary failed, using extractive summary")
+    return None
+
+
+def _summarize_missing(
+    level: str,
+    inputs: Dict[str, str],
+    cache: Dict[str, SummaryNode],
+    children: Dict[str, List[str]],
+    db: Session,
+    max_workers: int,
+    summarize: Callable[[str, str], Optional[str]],
+    degraded: Set[str]
+) -> None:
+    """
+    Summarise the nodes of one tree level that are not cached yet, in parallel.
+
+    A node summarised extractively, because the LLM was unavailable, or built on such
+    a node is only kept in memory and added to degraded; it is not stored, so the next
+    build with the LLM available summarises it properly.
+    """
+    missing = [node_hash for node_hash in inputs if node_hash not in cache]
+    if not missing:
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        summaries = list(executor.map(lambda node_hash: summarize(level, inputs[node_hash]), missing))
+
+    rows = []
+    for node_hash, summary in zip(missing, summaries):
+        node_children = children.get(node_hash, [])
+        if summary is None:
+            summary = _extractive_summary(inputs[node_hash], _FALLBACK_BUDGET[level])
+            degraded.add(node_hash)
+        elif degraded.intersection(node_children):
+            degraded.add(node_hash)
+        row = {
+            "content_hash": node_hash,
+            "level": level,
+            "summary": summary,
+            "child_hashes": node_children,
+            "source_chars": len(inputs[node_hash])
+        }
+        if node_hash in degraded:
+            cache[node_hash] = SummaryNode(**row)
+        else:
+            rows.append(row)
+
+    # Concurrent builds may store the same node; the first stored summary wins
+    bulk_upsert(db, SummaryNode, rows, key_columns=("content_hash",), update_columns=[])
+    stored = [row["content_hash"] for row in rows]
+    if stored:
+        for node in db.query(SummaryNode).filter(SummaryNode.content_hash.in_(stored)).all():
+            cache[node.content_hash] = node
+    logger.info(
+        f"Summarised {len(missing)} new {level} nodes ({len(inputs) - len(missing)} reused from cache, "
+        f"{len(missing) - len(rows)} extractive and not stored)"
+    )
+
+
+def build_summary_tree(
+    text: str,
+    db: Session,
+    max_workers: Optional[int] = None,
+    summarize: Callable[[str, str], Optional[str]] = _summarize
+) -> Dict:
+    """
+    Build (or load from cache) the summary tree of a document.
+
+    Every node is keyed by a content hash, so a document that was summarised before
+    costs one query, and a document that changed on one page only re-summarises that
+    page's chunk and its ancestors.
+
+    Args:
+        text: Document text
+        db: Database session
+        max_workers: Parallel LLM calls per tree level
+        summarize: Function mapping (level, text) to a summary, or None to fall back to
+            an extractive summary that is not stored
+
+    Returns:
+        Dictionary with the document hash and summary, and the section summaries
+    """
+    max_workers = max_workers or settings.SUMMARY_MAX_WORKERS
+    leaves = split_into_leaves(text)
+    if not leaves:
+        return {"document_hash": None, "summary": "", "sections": []}
+
+    chunk_version = get_prompt("chunk_summary").fingerprint
+    leaf_inputs = {}
+    leaf_order = []
+    for leaf in leaves:
+        leaf_hash = _hash("chunk", chunk_version, " ".join(leaf.split()))
+        leaf_inputs[leaf_hash] = leaf
+        leaf_order.append(leaf_hash)
+
+    section_version = get_prompt("section_summary").fingerprint
+    section_children = {}
+    section_order = []
+    for group in _group_children(leaf_order, settings.SUMMARY_SECTION_FANOUT):
+        section_hash = _hash("section", section_version, *group)
+        section_children[section_hash] = group
+        section_order.append(section_hash)
+
+    document_hash = _hash("document", get_prompt("document_summary").fingerprint, *section_order)
+
+    # One query for every node of the tree
+    all_hashes = set(leaf_order) | set(section_order) | {document_hash}
+    cache = {
+        node.content_hash: node
+        for node in db.query(SummaryNode).filter(SummaryNode.content_hash.in_(all_hashes)).all()
+    }
+
+    if document_hash not in cache:
+        degraded: Set[str] = set()
+        # Only chunks under a section that is not cached need summarising
+        needed_leaves = {
+            leaf_hash: leaf_inputs[leaf_hash]
+            for section_hash, children in section_children.items() if section_hash not in cache
+            for leaf_hash in children
+        }
+        _summarize_missing("chunk", needed_leaves, cache, {}, db, max_workers, summarize, degraded)
+
+        section_inputs = {
+            section_hash: "\n\n".join(cache[child].summary for child in children)
+            for section_hash, children in section_children.items() if section_hash not in cache
+        }
+        _summarize_missing("section", section_inputs, cache, section_children, db, max_workers, summarize, degraded)
+
+        document_input = "\n\n".join(cache[section_hash].summary for section_hash in section_order)
+        _summarize_missing(
+            "document", {document_hash: document_input}, cache,
+            {document_hash: section_order}, db, max_workers, summarize, degraded
+        )
+        db.commit()
+
+    return {
+        "document_hash": document_hash,
+        "summary": cache[document_hash].summary,
+        "sections": [
+            {"hash": section_hash, "summary": cache[section_hash].summary}
+            for section_hash in section_order
+        ]
+    }
+
+
+def get_document_digest(text: str, db: Session) -> str:
+    """
+    Get a compact representation of a whole document for LLM analysis.
+
+    Args:
+        text: Document text
+        db: Database session
+
+    Returns:
+        The document summary followed by every section summary
+    """
+    tree = build_summary_tree(text, db)
+    if not tree["document_hash"]:
+        return ""
+
+    parts = [f"Document summary:\n{tree['summary']}"]
+    for i, section in enumerate(tree["sections"]):
+        parts.append(f"Section {i + 1} summary:\n{section['summary']}")
+    return "\n\n".join(parts)
@@ -309,8 +309,8 @@ function updateBidSummaryUI(comparisonData) {
   // Clear existing content
   bidSummaryContent.innerHTML = '';
   
-  // Sort bids by total score (descending)
-  const bids = [...comparisonData.bids].sort((a, b) => (b.total_score || 0) - (a.total_score || 0));
+  // Bids come ranked by the scoring engine
+  const bids = [...comparisonData.bids].sort((a, b) => a.rank - b.rank);
   
   // Create a list group for the bids
   const bidList = document.createElement('div');
@@ -318,7 +318,7 @@ function updateBidSummaryUI(comparisonData) {
   
   bids.forEach((bid, index) => {
     const scoreClass = getScoreColorClass(bid.total_score || 0);
-    const rank = index + 1;
+    const rank = bid.rank;
     
     const bidItem = document.createElement('a');
     bidItem.href = `#bid-details-${bid.id}`;
@@ -399,8 +399,8 @@ function updateBidComparisonUI(comparisonData) {
   bidComparisonContent.innerHTML = '';
   gapAnalysisContent.innerHTML = '';
   
-  // Sort bids by total score (descending)
-  const bids = [...comparisonData.bids].sort((a, b) => (b.total_score || 0) - (a.total_score || 0));
+  // Bids come ranked by the scoring engine
+  const bids = [...comparisonData.bids].sort((a, b) => a.rank - b.rank);
   
   // Create requirement comparison tables
   if (comparisonData.requirement_categories) {
@@ -448,8 +448,8 @@ function updateBidComparisonUI(comparisonData) {
         
         // Add scores for each bid
         bids.forEach(bid => {
-          const reqCompliance = bid.requirement_compliance || {};
-          const reqScore = reqCompliance[req.id] ? reqCompliance[req.id].score : null;
+          const reqScores = bid.requirement_scores || {};
+          const reqScore = reqScores[req.id] ?? null;
           
           if (reqScore !== null) {
             const scoreClass = getScoreCellClass(reqScore);
@@ -512,8 +512,8 @@ function updateBidComparisonUI(comparisonData) {
         
         // Add scores for each bid
         bids.forEach(bid => {
-          const techCompliance = bid.technical_compliance || {};
-          const specScore = techCompliance[spec.id] ? techCompliance[spec.id].score : null;
+          const techScores = bid.technical_scores || {};
+          const specScore = techScores[spec.id] ?? null;
           
           if (specScore !== null) {
             const scoreClass = getScoreCellClass(specScore);
@@ -603,45 +603,17 @@ function renderBidComparisonChart(comparisonData) {
     ]
   };
   
-  // Sort bids by total score (descending)
-  const bids = [...comparisonData.bids].sort((a, b) => (b.total_score || 0) - (a.total_score || 0));
+  // Bids come ranked by the scoring engine
+  const bids = [...comparisonData.bids].sort((a, b) => a.rank - b.rank);
   
-  // Calculate average technical and requirement compliance scores for each bid
+  // Add overall, technical and requirement scores for each bid
   bids.forEach(bid => {
     chartData.labels.push(bid.vendor_name);
     chartData.datasets[0].data.push(bid.total_score || 0);
     
-    // Calculate average technical compliance
-    let techTotal = 0;
-    let techCount = 0;
-    
-    if (bid.technical_compliance) {
-      for (const key in bid.technical_compliance) {
-        if (bid.technical_compliance[key].score) {
-          techTotal += bid.technical_compliance[key].score;
-          techCount++;
-        }
-      }
-    }
-    
-    const techAvg = techCount > 0 ? techTotal / techCount : 0;
-    chartData.datasets[1].data.push(Math.round(techAvg));
-    
-    // Calculate average requirement compliance
-    let reqTotal = 0;
-    let reqCount = 0;
-    
-    if (bid.requirement_compliance) {
-      for (const key in bid.requirement_compliance) {
-        if (bid.requirement_compliance[key].score) {
-          reqTotal += bid.requirement_compliance[key].score;
-          reqCount++;
-        }
-      }
-    }
-    
-    const reqAvg = reqCount > 0 ? reqTotal / reqCount : 0;
-    chartData.datasets[2].data.push(Math.round(reqAvg));
+    // Weighted technical and requirement averages from the scoring engine
+    chartData.datasets[1].data.push(Math.round(bid.technical_score || 0));
+    chartData.datasets[2].data.push(Math.round(bid.requirement_score || 0));
   });
   
   // Create the chart
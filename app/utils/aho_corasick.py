@@ -0,0 +1,92 @@
+"""
+Multi-pattern string matching utilities for UniSphere.
+An Aho-Corasick automaton finds every occurrence of a large set of phrases (control
+IDs, security keywords) in one linear pass over a text, however many phrases there are.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Lower-cases ASCII letters only, so offsets in the folded text are offsets in the original
+_ASCII_FOLD = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def fold(text: str) -> str:
+    """Case-fold ASCII letters without changing the text's length."""
+    return text.translate(_ASCII_FOLD)
+
+
+class AhoCorasick:
+    """
+    Case-insensitive automaton over a fixed set of phrases, each with a value.
+
+    Matches are whole words: a phrase counts only where the characters around it
+    are not letters or digits, so "AC-2" is not found in "AC-22".
+    """
+
+    def __init__(self, phrases: Dict[str, Any]):
+        """
+        Args:
+            phrases: Mapping of phrase to the value reported with its matches
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]  # (phrase length, value) per state
+
+        for phrase, value in phrases.items():
+            phrase = fold(phrase)
+            if not phrase:
+                continue
+            state = 0
+            for char in phrase:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(phrase), value))
+
+        # Breadth-first, so each state's failure link is set before its children need it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Every whole-word occurrence of the phrases in a text.
+
+        Yields:
+            Tuples of (start, end, value) in order of end offset; overlapping
+            matches are all reported
+        """
+        folded = fold(text)
+        length = len(folded)
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(folded):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            if end < length and folded[end].isalnum():
+                continue
+            for phrase_length, value in output[state]:
+                start = end - phrase_length
+                if start > 0 and folded[start - 1].isalnum():
+                    continue
+                yield start, end, value
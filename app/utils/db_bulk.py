@@ -0,0 +1,132 @@
+"""
+Bulk persistence utilities for UniSphere.
+Extraction and assessment write hundreds of rows at a time. These helpers send them
+as batched executemany inserts and dialect-native upserts instead of one ORM object
+and one round trip per row.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = 500
+
+_UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _chunks(rows: List[Dict[str, Any]], size: int) -> Iterable[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def bulk_insert(db: Session, model: Any, rows: List[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+    """
+    Insert rows with batched executemany statements.
+
+    Python-side column defaults are applied per row. The rows are not added to the
+    session, so expire or re-query relationships that should include them.
+
+    Args:
+        db: Database session
+        model: Mapped model class
+        rows: Column values of each row
+        chunk_size: Rows per statement
+
+    Returns:
+        Number of rows inserted
+    """
+    for chunk in _chunks(rows, chunk_size):
+        db.execute(insert(model), chunk)
+    return len(rows)
+
+
+def prefetch_by_key(db: Session, model: Any, key_columns: Sequence[str], *filters: Any) -> Dict[Tuple, Any]:
+    """
+    Load existing rows in one query, indexed by their natural key.
+
+    Args:
+        db: Database session
+        model: Mapped model class
+        key_columns: Columns forming the natural key
+        filters: SQLAlchemy filter expressions limiting the rows loaded
+
+    Returns:
+        Mapping of key tuples to model instances
+    """
+    rows = db.query(model).filter(*filters).all()
+    return {tuple(getattr(row, column) for column in key_columns): row for row in rows}
+
+
+def bulk_upsert(
+    db: Session,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    key_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = BULK_CHUNK_SIZE
+) -> int:
+    """
+    Insert rows, updating the existing row when its natural key already exists.
+
+    PostgreSQL and SQLite use INSERT ... ON CONFLICT DO UPDATE, which needs a unique
+    constraint on the key columns. Other dialects prefetch the existing keys with one
+    query and split the rows into a bulk insert and a bulk update by primary key.
+
+    Args:
+        db: Database session
+        model: Mapped model class
+        rows: Column values of each row, including the key columns
+        key_columns: Columns forming the natural key
+        update_columns: Columns overwritten on conflict; defaults to every non-key column given
+        chunk_size: Rows per statement
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+    if update_columns is None:
+        update_columns = [column for column in rows[0] if column not in key_columns]
+
+    dialect_insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect_insert:
+        for chunk in _chunks(rows, chunk_size):
+            statement = dialect_insert(model.__table__).values(chunk)
+            if update_columns:
+                statement = statement.on_conflict_do_update(
+                    index_elements=list(key_columns),
+                    set_={column: statement.excluded[column] for column in update_columns}
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=list(key_columns))
+            db.execute(statement)
+        return len(rows)
+
+    key_attributes = [getattr(model, column) for column in key_columns]
+    existing = {}
+    for chunk in _chunks(rows, chunk_size):
+        keys = [tuple(row[column] for column in key_columns) for row in chunk]
+        for found in db.query(model.id, *key_attributes).filter(tuple_(*key_attributes).in_(keys)):
+            existing[tuple(found[1:])] = found[0]
+
+    inserts, updates = [], []
+    for row in rows:
+        row_id = existing.get(tuple(row[column] for column in key_columns))
+        if row_id is None:
+            inserts.append(row)
+        elif update_columns:
+            updates.append({"id": row_id, **{column: row[column] for column in update_columns}})
+
+    bulk_insert(db, model, inserts, chunk_size)
+    for chunk in _chunks(updates, chunk_size):
+        db.execute(update(model), chunk)
+    return len(rows)
@@ -0,0 +1,181 @@
+"""
+Near-duplicate detection utilities for UniSphere.
+Overlapping chunks make the extractors report the same requirement several times.
+Items are fingerprinted with MinHash signatures and candidate pairs are found with
+LSH banding, so collapsing them takes near-linear time instead of comparing every pair.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+PRIORITY_RANK = {"must-have": 3, "should-have": 2, "nice-to-have": 1}
+
+# Universal hash family (a * x + b) mod p, fixed so signatures are reproducible
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(20240601)
+_MAX_PERM = 256
+_A = _rng.integers(1, 1 << 31, size=_MAX_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 31, size=_MAX_PERM, dtype=np.uint64)
+
+
+def _tokens(text: str) -> Set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def minhash_signatures(token_sets: List[Set[str]], num_perm: int) -> np.ndarray:
+    """
+    MinHash signature of each token set.
+
+    Args:
+        token_sets: Word sets of the texts
+        num_perm: Signature length
+
+    Returns:
+        Array of shape (texts, num_perm); the fraction of equal columns of two rows
+        estimates the Jaccard similarity of their sets
+    """
+    a, b = _A[:num_perm], _B[:num_perm]
+    signatures = np.full((len(token_sets), num_perm), _PRIME, dtype=np.uint64)
+    for row, tokens in enumerate(token_sets):
+        if tokens:
+            hashes = np.fromiter((_token_hash(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+            signatures[row] = ((hashes[:, None] * a + b) % _PRIME).min(axis=0)
+    return signatures
+
+
+def near_duplicate_groups(
+    texts: List[str],
+    min_similarity: Optional[float] = None,
+    bands: Optional[int] = None,
+    rows: Optional[int] = None
+) -> List[List[int]]:
+    """
+    Group texts whose word sets are near-identical.
+
+    Signatures are split into bands; only texts sharing a band bucket become
+    candidates, and candidates are confirmed with their exact Jaccard similarity.
+    Texts quoting different numbers ("99.9%" and "99.99%") are never grouped.
+
+    Args:
+        texts: Texts to group
+        min_similarity: Minimum Jaccard similarity of near-duplicates
+        bands: LSH bands
+        rows: Signature rows per band
+
+    Returns:
+        Groups of text indices in input order, singletons included
+    """
+    min_similarity = settings.DEDUP_MIN_SIMILARITY if min_similarity is None else min_similarity
+    bands = bands or settings.DEDUP_LSH_BANDS
+    rows = rows or settings.DEDUP_LSH_ROWS
+
+    token_sets = [_tokens(text) for text in texts]
+    numbers = [tuple(sorted(set(_NUMBER.findall(text)))) for text in texts]
+    signatures = minhash_signatures(token_sets, bands * rows)
+
+    parent = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = {}
+        band_signatures = signatures[:, band * rows:(band + 1) * rows]
+        for i in range(len(texts)):
+            if token_sets[i]:
+                buckets.setdefault(band_signatures[i].tobytes(), []).append(i)
+        for members in buckets.values():
+            for position, i in enumerate(members):
+                for j in members[position + 1:]:
+                    if find(i) == find(j) or numbers[i] != numbers[j]:
+                        continue
+                    union = len(token_sets[i] | token_sets[j])
+                    if len(token_sets[i] & token_sets[j]) / union >= min_similarity:
+                        parent[find(j)] = find(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values(), key=lambda group: group[0])
+
+
+def _merge_requirements(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Keep the most detailed description, the highest priority and every source section."""
+    merged = dict(max(group, key=lambda req: len(req.get("description") or "")))
+    merged["priority"] = max(
+        (req.get("priority") or "Should-have" for req in group),
+        key=lambda priority: PRIORITY_RANK.get(priority.lower(), 0)
+    )
+    sections = []
+    for req in group:
+        section = req.get("section")
+        if section and section not in sections:
+            sections.append(section)
+    if sections:
+        merged["section"] = "; ".join(sections)[:255]
+    return merged
+
+
+def _merge_specs(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Keep the most detailed specification; mandatory if any duplicate is mandatory."""
+    merged = dict(max(group, key=lambda spec: len(spec.get("description") or "")))
+    merged["is_mandatory"] = any(spec.get("is_mandatory", True) for spec in group)
+    return merged
+
+
+def collapse_near_duplicates(
+    items: List[Dict[str, Any]],
+    text_of: Callable[[Dict[str, Any]], str],
+    merge: Callable[[List[Dict[str, Any]]], Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Merge near-duplicate extracted items.
+
+    Args:
+        items: Extracted item dicts
+        text_of: Returns the text an item is compared by
+        merge: Combines a group of duplicates into one item
+
+    Returns:
+        The deduplicated items in first-seen order, and how many items were collapsed
+    """
+    if not items:
+        return [], 0
+    groups = near_duplicate_groups([text_of(item) for item in items])
+    merged = [merge([items[i] for i in group]) if len(group) > 1 else items[group[0]] for group in groups]
+    return merged, len(items) - len(merged)
+
+
+def dedupe_requirements(requirements: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Collapse near-duplicate requirements; see collapse_near_duplicates."""
+    return collapse_near_duplicates(requirements, lambda req: req.get("description") or "", _merge_requirements)
+
+
+def dedupe_tech_specs(tech_specs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Collapse near-duplicate technical specifications; see collapse_near_duplicates."""
+    return collapse_near_duplicates(
+        tech_specs,
+        lambda spec: " ".join(
+            str(spec.get(field) or "") for field in ("name", "description", "min_value", "max_value", "measurement_unit")
+        ),
+        _merge_specs
+    )
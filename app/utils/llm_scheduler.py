@@ -0,0 +1,171 @@
+"""
+LLM call scheduler for UniSphere.
+Every provider call goes through a shared scheduler with two priority lanes.
+Interactive calls (chatbot questions, reviewer-triggered assessments) get reserved
+capacity and jump ahead of queued batch calls; batch work (bulk bid evaluation)
+fills whatever capacity is left.
+"""
+
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar("llm_lane", default=BATCH)
+
+
+def current_lane() -> str:
+    """The lane LLM calls made in the current context are tagged with."""
+    return _current_lane.get()
+
+
+@contextmanager
+def llm_lane(lane: str) -> Iterator[None]:
+    """
+    Tag every LLM call made inside the block with a lane.
+
+    Args:
+        lane: INTERACTIVE or BATCH
+    """
+    if lane not in LANES:
+        raise ValueError(f"Unknown LLM lane: {lane}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class _LaneStats:
+    """Queue and wait-time counters for one lane."""
+
+    def __init__(self, window: int = 500):
+        self.queued = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=window)
+
+    def record_wait(self, wait: float) -> None:
+        self.admitted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.recent_waits.append(wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self.recent_waits)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "queue_depth": self.queued,
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "avg_wait_ms": round(1000 * self.total_wait / self.admitted, 1) if self.admitted else 0.0,
+            "p95_wait_ms": round(1000 * p95, 1),
+            "max_wait_ms": round(1000 * self.max_wait, 1)
+        }
+
+
+class LLMScheduler:
+    """
+    Admission control for provider calls.
+
+    At most ``max_concurrency`` calls run at once, and batch calls may only use
+    ``max_concurrency - reserved_interactive`` of those slots. Queued interactive
+    calls are always admitted before queued batch calls; within a lane calls are
+    admitted in arrival order.
+    """
+
+    def __init__(self, max_concurrency: int, reserved_interactive: int):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.reserved_interactive = min(max(reserved_interactive, 0), max_concurrency - 1)
+        self._cond = threading.Condition()
+        self._queues = {lane: deque() for lane in LANES}
+        self._stats = {lane: _LaneStats() for lane in LANES}
+        self._tickets = itertools.count()
+
+    def _in_flight(self) -> int:
+        return sum(stats.in_flight for stats in self._stats.values())
+
+    def _can_admit(self, lane: str, ticket: int) -> bool:
+        if self._queues[lane][0] != ticket or self._in_flight() >= self.max_concurrency:
+            return False
+        if lane == INTERACTIVE:
+            return True
+        # Batch work waits for queued interactive calls and leaves the reserved slots free
+        if self._queues[INTERACTIVE]:
+            return False
+        return self._stats[BATCH].in_flight < self.max_concurrency - self.reserved_interactive
+
+    def acquire(self, lane: str) -> None:
+        """Block until a call in the given lane may start."""
+        if lane not in LANES:
+            raise ValueError(f"Unknown LLM lane: {lane}")
+        ticket = next(self._tickets)
+        enqueued_at = time.monotonic()
+        with self._cond:
+            self._queues[lane].append(ticket)
+            self._stats[lane].queued += 1
+            while not self._can_admit(lane, ticket):
+                self._cond.wait()
+            self._queues[lane].popleft()
+            stats = self._stats[lane]
+            stats.queued -= 1
+            stats.in_flight += 1
+            stats.record_wait(time.monotonic() - enqueued_at)
+            # The next call in either lane may now be admissible
+            self._cond.notify_all()
+
+    def release(self, lane: str) -> None:
+        """Free the slot of a finished call."""
+        with self._cond:
+            self._stats[lane].in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, lane: Optional[str] = None) -> Iterator[None]:
+        """
+        Hold a scheduler slot for the duration of a provider call.
+
+        Args:
+            lane: INTERACTIVE or BATCH; defaults to the lane of the current context
+        """
+        lane = lane or current_lane()
+        self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def run(self, fn: Callable[..., Any], *args: Any, lane: Optional[str] = None, **kwargs: Any) -> Any:
+        """Call ``fn`` once a slot in the given lane is free."""
+        with self.slot(lane):
+            return fn(*args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Capacity, queue depth and wait times per lane."""
+        with self._cond:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "reserved_interactive": self.reserved_interactive,
+                "in_flight": self._in_flight(),
+                "lanes": {lane: self._stats[lane].snapshot() for lane in LANES}
+            }
+
+
+scheduler = LLMScheduler(settings.LLM_MAX_CONCURRENCY, settings.LLM_INTERACTIVE_RESERVED)
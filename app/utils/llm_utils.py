@@ -42,7 +42,9 @@ def chunk_text(text: str, chunk_size: int = 2000, overlap: int = 200) -> List[st
                     end = space + 1
         
         chunks.append(text[start:end])
-        start = end - overlap  # Include overlap
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)  # Include overlap
     
     return chunks
 
@@ -67,17 +69,18 @@ def analyze_text_with_llm(prompt: str, text: str, output_format: str = None) ->
         # In a real implementation, this would integrate with the LLM API
         # For this implementation, simulate the LLM response
         if output_format == "json":
-            # Generate simulated JSON response based on the prompt
-            if "requirements" in prompt.lower():
-                return simulate_requirements_response()
-            elif "technical specification" in prompt.lower():
-                return simulate_tech_specs_response()
-            elif "compliance" in prompt.lower() and "score" in prompt.lower():
+            # Generate simulated JSON response based on the prompt. The most specific
+            # prompts are matched first, as the shared templates all mention requirements.
+            if "compliance" in prompt.lower() and "score" in prompt.lower():
                 return simulate_compliance_response()
             elif "strengths" in prompt.lower() and "weaknesses" in prompt.lower():
                 return simulate_strengths_weaknesses_response()
             elif "gap" in prompt.lower():
                 return simulate_gap_analysis_response()
+            elif "technical specification" in prompt.lower():
+                return simulate_tech_specs_response()
+            elif "requirements" in prompt.lower():
+                return simulate_requirements_response()
             else:
                 return {"result": "Generic LLM analysis result"}
         else:
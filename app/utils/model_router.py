@@ -0,0 +1,206 @@
+"""
+Tiered model routing for UniSphere.
+Compliance checks are first evaluated with a cheap, fast model and escalated to the
+expensive model only when the cheap answer is ambiguous, low-confidence or failed,
+or when the requirement is important enough to always deserve the expensive model.
+Each routed result records its routing decision, latency and cost, so routing can
+be reported per RFP from stored analysis results.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# A compliance call: takes a model name, returns the parsed result and token usage
+ComplianceCall = Callable[[str], Tuple[Dict[str, Any], Dict[str, int]]]
+
+
+class RoutingPolicy:
+    """Configuration of the cheap-first routing policy."""
+
+    def __init__(
+        self,
+        cheap_model: str = settings.ROUTING_CHEAP_MODEL,
+        expensive_model: str = settings.OPENAI_MODEL,
+        ambiguous_band: Tuple[float, float] = settings.ROUTING_AMBIGUOUS_BAND,
+        min_confidence: float = settings.ROUTING_MIN_CONFIDENCE,
+        escalate_priorities: Iterable[str] = settings.ROUTING_ESCALATE_PRIORITIES,
+        enabled: bool = settings.ROUTING_ENABLED
+    ):
+        self.cheap_model = cheap_model
+        self.expensive_model = expensive_model
+        self.ambiguous_band = ambiguous_band
+        self.min_confidence = min_confidence
+        self.escalate_priorities = {priority.lower() for priority in escalate_priorities}
+        self.enabled = enabled
+
+    def escalation_reason(self, result: Dict[str, Any]) -> Optional[str]:
+        """Why a cheap-tier result must be escalated, or None to accept it."""
+        if not isinstance(result, dict) or "error" in result or "score" not in result:
+            return "error"
+        try:
+            score = float(result["score"])
+            confidence = float(result.get("confidence", 0))
+        except (TypeError, ValueError):
+            return "error"
+        low, high = self.ambiguous_band
+        if low <= score <= high:
+            return "ambiguous_score"
+        if confidence < self.min_confidence:
+            return "low_confidence"
+        return None
+
+
+default_policy = RoutingPolicy()
+
+
+def estimate_cost(model: str, usage: Dict[str, int]) -> float:
+    """
+    Cost in USD of one call from its token usage.
+
+    Args:
+        model: Model name
+        usage: Dict with prompt_tokens and completion_tokens
+
+    Returns:
+        Estimated cost, 0 for models without a configured price
+    """
+    input_price, output_price = settings.MODEL_PRICES.get(model, (0.0, 0.0))
+    return (
+        usage.get("prompt_tokens", 0) * input_price
+        + usage.get("completion_tokens", 0) * output_price
+    ) / 1_000_000
+
+
+def _timed_call(call: ComplianceCall, model: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    started = time.monotonic()
+    result, usage = call(model)
+    tier = {
+        "model": model,
+        "latency_ms": round(1000 * (time.monotonic() - started), 1),
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "cost_usd": round(estimate_cost(model, usage), 6)
+    }
+    return result, tier
+
+
+def route_compliance(
+    call: ComplianceCall,
+    priority: Optional[str] = None,
+    policy: Optional[RoutingPolicy] = None
+) -> Dict[str, Any]:
+    """
+    Evaluate a compliance check cheap-first, escalating when the policy says so.
+
+    Args:
+        call: Performs the check with a given model
+        priority: Requirement priority, e.g. "Must-have"
+        policy: Routing policy; defaults to the configured one
+
+    Returns:
+        The accepted result, with a "routing" entry describing the decision
+    """
+    policy = policy or default_policy
+    tiers: List[Dict[str, Any]] = []
+    reason = None
+    routed_direct = None
+
+    if not policy.enabled:
+        routed_direct = "disabled"
+        result, tier = _timed_call(call, policy.expensive_model)
+        tiers.append(tier)
+    elif priority and priority.lower() in policy.escalate_priorities:
+        # Important requirements go straight to the expensive model; nothing is escalated
+        routed_direct = "priority"
+        result, tier = _timed_call(call, policy.expensive_model)
+        tiers.append(tier)
+    else:
+        result, tier = _timed_call(call, policy.cheap_model)
+        tiers.append(tier)
+        reason = policy.escalation_reason(result)
+        if reason:
+            logger.debug(f"Escalating compliance check to {policy.expensive_model}: {reason}")
+            result, tier = _timed_call(call, policy.expensive_model)
+            tiers.append(tier)
+
+    if not isinstance(result, dict):
+        result = {"score": 0, "explanation": "Unexpected response format"}
+    result["routing"] = {
+        "model": tiers[-1]["model"],
+        "escalated": reason is not None,
+        "escalation_reason": reason,
+        "routed_direct": routed_direct,
+        "latency_ms": round(sum(tier["latency_ms"] for tier in tiers), 1),
+        "cost_usd": round(sum(tier["cost_usd"] for tier in tiers), 6),
+        "tiers": tiers
+    }
+    return result
+
+
+def summarize_routing(results: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate the routing entries of stored compliance results.
+
+    Args:
+        results: Compliance result dicts, as stored in AnalysisResult JSON
+
+    The escalation rate is over the checks that tried the cheap model first;
+    checks sent straight to the expensive model are counted separately.
+
+    Returns:
+        Call counts, escalation rate and reasons, cost, and latency per model
+    """
+    checks = 0
+    cheap_first = 0
+    escalated = 0
+    direct: Dict[str, int] = {}
+    reasons: Dict[str, int] = {}
+    total_cost = 0.0
+    total_latency = 0.0
+    models: Dict[str, Dict[str, float]] = {}
+
+    for result in results:
+        routing = result.get("routing") if isinstance(result, dict) else None
+        if not routing:
+            continue
+        checks += 1
+        total_cost += routing.get("cost_usd", 0.0)
+        total_latency += routing.get("latency_ms", 0.0)
+        # Results stored before routed_direct existed recorded priority routing as an escalation
+        routed_direct = routing.get("routed_direct") or (
+            "priority" if routing.get("escalation_reason") == "priority" else None
+        )
+        if routed_direct:
+            direct[routed_direct] = direct.get(routed_direct, 0) + 1
+        else:
+            cheap_first += 1
+        if routing.get("escalated") and not routed_direct:
+            escalated += 1
+            reason = routing.get("escalation_reason") or "unknown"
+            reasons[reason] = reasons.get(reason, 0) + 1
+        for tier in routing.get("tiers", []):
+            model = models.setdefault(tier["model"], {"calls": 0, "cost_usd": 0.0, "latency_ms": 0.0})
+            model["calls"] += 1
+            model["cost_usd"] += tier.get("cost_usd", 0.0)
+            model["latency_ms"] += tier.get("latency_ms", 0.0)
+
+    for model in models.values():
+        model["avg_latency_ms"] = round(model.pop("latency_ms") / model["calls"], 1)
+        model["cost_usd"] = round(model["cost_usd"], 4)
+
+    return {
+        "routed_checks": checks,
+        "direct_checks": direct,
+        "escalated_checks": escalated,
+        "escalation_rate": round(escalated / cheap_first, 3) if cheap_first else 0.0,
+        "escalation_reasons": reasons,
+        "total_cost_usd": round(total_cost, 4),
+        "avg_latency_ms": round(total_latency / checks, 1) if checks else 0.0,
+        "models": models
+    }
@@ -8,13 +8,23 @@ from typing import Any, Dict, List, Optional, Union
 from openai import OpenAI
 
 from app.config import settings
+from app.utils.prompt_templates import get_prompt, render_prompt
+from app.utils.llm_scheduler import scheduler
+from app.utils.model_router import route_compliance
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
-def analyze_with_openai(prompt: str, text: str, output_format: str = None) -> Union[str, Dict, List]:
+def analyze_with_openai(
+    prompt: str,
+    text: str,
+    output_format: str = None,
+    lane: Optional[str] = None,
+    model: Optional[str] = None,
+    usage: Optional[Dict[str, int]] = None
+) -> Union[str, Dict, List]:
     """
     Analyze text using OpenAI's API.
     
@@ -22,6 +32,9 @@ def analyze_with_openai(prompt: str, text: str, output_format: str = None) -> Un
         prompt: Instruction prompt for the LLM
         text: Text to analyze
         output_format: Expected output format (e.g., 'json')
+        lane: Scheduler lane; defaults to the lane of the calling context
+        model: Model to use; defaults to settings.OPENAI_MODEL
+        usage: Optional dict that receives the call's prompt and completion token counts
         
     Returns:
         Response from the LLM
@@ -29,23 +42,28 @@ def analyze_with_openai(prompt: str, text: str, output_format: str = None) -> Un
     try:
         logger.debug(f"Sending prompt to OpenAI with {len(text)} characters of text")
         
-        # Build the full prompt
+        # Build the full prompt; the instructions come first so the provider can cache the prefix
         full_prompt = f"{prompt}\n\nText to analyze:\n{text}"
         
         response_format = {"type": "json_object"} if output_format == "json" else None
         
-        response = client.chat.completions.create(
-            model="gpt-4o",  # Latest model as of May 13, 2024
-            messages=[
-                {"role": "system", "content": "You are an expert in government procurement evaluation focusing on connectivity projects."},
-                {"role": "user", "content": full_prompt}
-            ],
-            response_format=response_format,
-            temperature=0.2  # Lower temperature for more focused responses
-        )
+        with scheduler.slot(lane):
+            response = client.chat.completions.create(
+                model=model or settings.OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": get_prompt("system_procurement").static},
+                    {"role": "user", "content": full_prompt}
+                ],
+                response_format=response_format,
+                temperature=0.2  # Lower temperature for more focused responses
+            )
         
         result = response.choices[0].message.content
         
+        if usage is not None and response.usage is not None:
+            usage["prompt_tokens"] = response.usage.prompt_tokens
+            usage["completion_tokens"] = response.usage.completion_tokens
+        
         # Parse JSON if expected
         if output_format == "json":
             try:
@@ -74,29 +92,7 @@ def extract_requirements(rfp_text: str) -> List[Dict]:
     Returns:
         List of requirements with their details
     """
-    prompt = """
-    Extract the key requirements from this Request for Proposal (RFP) document.
-    Focus on connectivity requirements, technical specifications, operational requirements, and compliance needs.
-    
-    For each requirement, identify:
-    1. Category (Technical, Security, Operational, Financial, etc.)
-    2. Description
-    3. Priority (Must-have, Should-have, or Nice-to-have)
-    4. Section where it appears in the document
-    
-    Only extract actual requirements, not general information or background.
-    
-    Respond with a JSON array of requirements in this format:
-    [
-        {
-            "category": "Technical",
-            "description": "The system must provide at least 10Gbps throughput for backbone connections.",
-            "priority": "Must-have",
-            "section": "Network Requirements"
-        },
-        ...
-    ]
-    """
+    prompt = render_prompt("requirement_extraction")
     
     try:
         return analyze_with_openai(prompt, rfp_text, "json")
@@ -105,43 +101,152 @@ def extract_requirements(rfp_text: str) -> List[Dict]:
         return []
 
 
-def extract_technical_specifications(rfp_text: str) -> List[Dict]:
+def classify_requirements(candidates: List[Dict]) -> List[Dict]:
     """
-    Extract technical specifications from RFP text using OpenAI.
+    Classify rule-extracted requirement candidates in batches using OpenAI.
     
     Args:
-        rfp_text: The text of the RFP document
+        candidates: Candidates from extract_requirement_candidates
         
     Returns:
-        List of technical specifications with their details
+        The candidates the model confirmed as requirements, with its category and
+        priority; candidates of a failed batch keep their heuristic classification
+    """
+    prompt = render_prompt("requirement_classification")
+    # Classification is a simple task, so it goes to the cheap model when routing is enabled
+    model = settings.ROUTING_CHEAP_MODEL if settings.ROUTING_ENABLED else None
+    batch_size = settings.REQUIREMENT_CLASSIFY_BATCH
+    
+    requirements = []
+    for offset in range(0, len(candidates), batch_size):
+        batch = candidates[offset:offset + batch_size]
+        batch_text = "\n".join(
+            f"{i + 1}. [{candidate['section']}] {candidate['description']}"
+            for i, candidate in enumerate(batch)
+        )
+        response = analyze_with_openai(prompt, batch_text, "json", model=model)
+        
+        labels = {}
+        if isinstance(response, dict) and isinstance(response.get("requirements"), list):
+            for label in response["requirements"]:
+                if isinstance(label, dict) and isinstance(label.get("index"), int):
+                    labels[label["index"] - 1] = label
+        else:
+            logger.error(f"Requirement classification failed for candidates {offset + 1}-{offset + len(batch)}")
+        
+        for i, candidate in enumerate(batch):
+            label = labels.get(i)
+            if label is None:
+                requirements.append(candidate)
+            elif label.get("is_requirement", True):
+                requirements.append({
+                    **candidate,
+                    "category": label.get("category") or candidate["category"],
+                    "priority": label.get("priority") or candidate["priority"]
+                })
+    
+    return requirements
+
+
+def screen_mandatory_criteria(criteria: List[Dict]) -> List[Optional[Dict]]:
     """
-    prompt = """
-    Extract the specific technical specifications from this Request for Proposal (RFP) document.
-    Focus on detailed technical requirements that include specific measurements, values, or capabilities.
+    Screen a bid against mandatory criteria in batches using OpenAI.
     
-    For each specification, identify:
-    1. Name (e.g., "Backbone Throughput", "Latency", "Encryption Strength")
-    2. Description
-    3. Category (Network, Security, Hardware, etc.)
-    4. Measurement unit (if applicable)
-    5. Minimum value (if specified)
-    6. Maximum value (if specified)
-    7. Whether it is mandatory
+    Args:
+        criteria: Dicts with the criterion text and the bid evidence for it
+        
+    Returns:
+        A verdict dict (verdict and reason) per criterion, in order; None for
+        criteria of a failed batch
+    """
+    prompt = render_prompt("mandatory_screening")
+    # Screening is a coarse pass/fail check, so it goes to the cheap model when routing is enabled
+    model = settings.ROUTING_CHEAP_MODEL if settings.ROUTING_ENABLED else None
+    batch_size = settings.SCREENING_BATCH_SIZE
+    
+    verdicts: List[Optional[Dict]] = []
+    for offset in range(0, len(criteria), batch_size):
+        batch = criteria[offset:offset + batch_size]
+        batch_text = "\n\n".join(
+            f"{i + 1}. {criterion['text']}\nBid evidence:\n{criterion['evidence'] or '(no relevant passage found)'}"
+            for i, criterion in enumerate(batch)
+        )
+        response = analyze_with_openai(prompt, batch_text, "json", model=model)
+        
+        labels = {}
+        if isinstance(response, dict) and isinstance(response.get("criteria"), list):
+            for label in response["criteria"]:
+                if isinstance(label, dict) and isinstance(label.get("index"), int):
+                    labels[label["index"] - 1] = label
+        else:
+            logger.error(f"Mandatory screening failed for criteria {offset + 1}-{offset + len(batch)}")
+        
+        for i in range(len(batch)):
+            label = labels.get(i)
+            if label and label.get("verdict") in ("pass", "fail", "unclear"):
+                verdicts.append({"verdict": label["verdict"], "reason": label.get("reason", "")})
+            else:
+                verdicts.append(None)
+    
+    return verdicts
+
+
+def evaluate_security_family(family: str, controls: List[Dict], passages: List[str]) -> List[Optional[Dict]]:
+    """
+    Assess a bid against the security controls of one family in a single call.
     
-    Respond with a JSON array of specifications in this format:
-    [
+    Args:
+        family: Name of the control family
+        controls: Dicts with requirement_id, title, description, framework and the
+            indexes of their most relevant passages
+        passages: Bid passages shared by the controls
+        
+    Returns:
+        A result dict (score, explanation, evidence, confidence) per control, in order; None
+        for controls the response left out. Raises ValueError if the response is
+        not a list of controls at all.
+    """
+    prompt = render_prompt("security_compliance_batch", family=family)
+    passage_text = "\n\n".join(f"[P{i + 1}] {passage}" for i, passage in enumerate(passages))
+    control_text = "\n".join(
+        f"{i + 1}. {control['requirement_id'] or 'No ID'} {control['title']} ({control['framework']}): "
+        f"{control['description']} Relevant passages: "
+        f"{', '.join(f'P{index + 1}' for index in control['passages']) or 'none found'}"
+        for i, control in enumerate(controls)
+    )
+    response = analyze_with_openai(
+        prompt, f"Bid passages:\n{passage_text or '(no relevant passage found)'}\n\nControls:\n{control_text}", "json"
+    )
+    
+    if not (isinstance(response, dict) and isinstance(response.get("controls"), list)):
+        raise ValueError(f"Unexpected response for the {family} family: {str(response)[:200]}")
+    
+    labels = {}
+    for label in response["controls"]:
+        if isinstance(label, dict) and isinstance(label.get("index"), int) and isinstance(label.get("score"), (int, float)):
+            labels[label["index"] - 1] = label
+    return [
         {
-            "name": "Backbone Throughput",
-            "description": "Minimum network throughput capacity for backbone connections",
-            "category": "Network",
-            "measurement_unit": "Gbps",
-            "min_value": "10",
-            "max_value": null,
-            "is_mandatory": true
-        },
-        ...
+            "score": labels[i]["score"],
+            "explanation": labels[i].get("explanation", ""),
+            "evidence": labels[i].get("evidence", ""),
+            "confidence": labels[i]["confidence"] if isinstance(labels[i].get("confidence"), (int, float)) else None
+        } if i in labels else None
+        for i in range(len(controls))
     ]
+
+
+def extract_technical_specifications(rfp_text: str) -> List[Dict]:
     """
+    Extract technical specifications from RFP text using OpenAI.
+    
+    Args:
+        rfp_text: The text of the RFP document
+        
+    Returns:
+        List of technical specifications with their details
+    """
+    prompt = render_prompt("tech_spec_extraction")
     
     try:
         return analyze_with_openai(prompt, rfp_text, "json")
@@ -161,31 +266,15 @@ def evaluate_requirement_compliance(requirement: Dict, bid_text: str) -> Dict:
     Returns:
         Compliance score and explanation
     """
-    prompt = f"""
-    You are an expert in government procurement evaluation. Analyze how well the vendor's bid complies with the following requirement:
-    
-    Requirement Category: {requirement['category']}
-    Priority: {requirement['priority']}
-    Description: {requirement['description']}
-    
-    Based on the bid text, evaluate compliance on a scale of 0-100, where:
-    0 = Not addressed at all
-    25 = Poorly addressed
-    50 = Partially addressed
-    75 = Mostly addressed
-    100 = Fully addressed
-    
-    Provide a detailed explanation for your score, referencing specific parts of the bid.
-    
-    Respond with a JSON object in the following format:
-    {{
-        "score": 75,
-        "explanation": "The vendor addresses this requirement by..."
-    }}
-    """
+    prompt = render_prompt(
+        "requirement_compliance",
+        category=requirement['category'],
+        priority=requirement['priority'],
+        description=requirement['description']
+    )
     
     try:
-        return analyze_with_openai(prompt, bid_text, "json")
+        return route_compliance(_compliance_call(prompt, bid_text), priority=requirement.get('priority'))
     except Exception as e:
         logger.exception("Error evaluating requirement compliance")
         return {"score": 0, "explanation": f"Error: {str(e)}"}
@@ -202,42 +291,51 @@ def evaluate_technical_compliance(specification: Dict, bid_text: str) -> Dict:
     Returns:
         Compliance score and explanation
     """
-    min_value = f"Minimum Value: {specification['min_value']} {specification['measurement_unit']}" if specification.get('min_value') else ""
-    max_value = f"Maximum Value: {specification['max_value']} {specification['measurement_unit']}" if specification.get('max_value') else ""
+    prompt = render_prompt("technical_compliance", **technical_prompt_fields(specification))
     
-    prompt = f"""
-    You are an expert in technical evaluation for government connectivity projects. Analyze how well the vendor's bid complies with the following technical specification:
-    
-    Specification Name: {specification['name']}
-    Category: {specification['category']}
-    Description: {specification['description']}
-    {min_value}
-    {max_value}
-    Mandatory: {"Yes" if specification.get('is_mandatory') else "No"}
-    
-    Based on the bid text, evaluate compliance on a scale of 0-100, where:
-    0 = Not addressed at all
-    25 = Poorly addressed
-    50 = Partially addressed
-    75 = Mostly addressed
-    100 = Fully addressed
-    
-    Provide specific evidence from the bid text that justifies your score.
-    
-    Respond with a JSON object in the following format:
-    {{
-        "score": 75,
-        "explanation": "The vendor addresses this specification by..."
-    }}
-    """
+    # Mandatory specifications are routed like Must-have requirements
+    priority = "Must-have" if specification.get('is_mandatory') else "Should-have"
     
     try:
-        return analyze_with_openai(prompt, bid_text, "json")
+        return route_compliance(_compliance_call(prompt, bid_text), priority=priority)
     except Exception as e:
         logger.exception("Error evaluating technical compliance")
         return {"score": 0, "explanation": f"Error: {str(e)}"}
 
 
+def _compliance_call(prompt: str, bid_text: str):
+    """Build the per-model call used by the tiered router for one compliance check."""
+    def call(model: str):
+        usage: Dict[str, int] = {}
+        result = analyze_with_openai(prompt, bid_text, "json", model=model, usage=usage)
+        return result, usage
+    return call
+
+
+def technical_prompt_fields(specification: Dict) -> Dict[str, Any]:
+    """
+    Build the variable fields of the technical compliance prompt.
+    
+    Args:
+        specification: Technical specification details
+        
+    Returns:
+        Field values for the ``technical_compliance`` template
+    """
+    unit = specification.get('measurement_unit') or ""
+    min_value = f"{specification['min_value']} {unit}".strip() if specification.get('min_value') else None
+    max_value = f"{specification['max_value']} {unit}".strip() if specification.get('max_value') else None
+    
+    return {
+        "name": specification['name'],
+        "category": specification['category'],
+        "description": specification['description'],
+        "min_value": min_value,
+        "max_value": max_value,
+        "mandatory": "Yes" if specification.get('is_mandatory') else "No"
+    }
+
+
 def identify_strengths_weaknesses(requirements_text: str, specs_text: str, bid_text: str) -> Dict:
     """
     Identify strengths and weaknesses in a bid compared to RFP requirements.
@@ -250,35 +348,7 @@ def identify_strengths_weaknesses(requirements_text: str, specs_text: str, bid_t
     Returns:
         Dictionary with strengths and weaknesses lists
     """
-    prompt = f"""
-    You are an expert in government procurement evaluation. Based on the vendor's bid, identify the top strengths and weaknesses compared to the RFP requirements and technical specifications.
-    
-    RFP Requirements:
-    {requirements_text}
-    
-    Technical Specifications:
-    {specs_text}
-    
-    Analyze the bid and provide:
-    1. Top 5 strengths of the proposal
-    2. Top 5 weaknesses or gaps in the proposal
-    
-    Be specific and reference exact requirements or specifications where possible.
-    
-    Respond with a JSON object in the following format:
-    {{
-        "strengths": [
-            "The vendor exceeds network throughput requirements by offering 20Gbps capability",
-            "Strong security compliance with all required certifications",
-            ...
-        ],
-        "weaknesses": [
-            "Limited experience with similar government projects",
-            "Maintenance response time does not meet the required SLA",
-            ...
-        ]
-    }}
-    """
+    prompt = render_prompt("strengths_weaknesses", requirements_text=requirements_text, specs_text=specs_text)
     
     try:
         return analyze_with_openai(prompt, bid_text, "json")
@@ -299,35 +369,7 @@ def perform_gap_analysis(requirements_text: str, specs_text: str, bid_text: str)
     Returns:
         List of identified gaps with details
     """
-    prompt = f"""
-    You are an expert in government procurement evaluation. Identify specific gaps between the RFP requirements and the vendor's bid.
-    
-    RFP Requirements:
-    {requirements_text}
-    
-    Technical Specifications:
-    {specs_text}
-    
-    Provide a detailed analysis of requirements or specifications that are not fully addressed in the bid.
-    For each gap, include:
-    1. What requirement/specification item has the gap
-    2. What the RFP specifically requires
-    3. What is missing or inadequate in the bid
-    4. The potential impact of this gap (Critical, Medium, or Low)
-    
-    Focus on substantive gaps that would affect evaluation or implementation, not minor wording differences.
-    
-    Respond with a JSON array in the following format:
-    [
-        {{
-            "item": "Network throughput requirement",
-            "requirement": "10Gbps minimum throughput",
-            "gap": "Vendor only offers 5Gbps throughput",
-            "impact": "Critical - would not meet basic connectivity needs"
-        }},
-        ...
-    ]
-    """
+    prompt = render_prompt("gap_analysis", requirements_text=requirements_text, specs_text=specs_text)
     
     try:
         return analyze_with_openai(prompt, bid_text, "json")
@@ -123,3 +123,26 @@ def extract_text_from_txt(file_path: str) -> str:
     except Exception as e:
         logger.exception(f"Error extracting text from TXT: {file_path}")
         return ""
+
+
+def extract_document_text(file_path: str) -> str:
+    """
+    Extract text from a PDF, DOCX or TXT file based on its extension.
+    
+    Args:
+        file_path: Path to the document
+        
+    Returns:
+        Extracted text, or an empty string for unsupported formats
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    
+    if file_ext == '.pdf':
+        return extract_text_from_pdf(file_path)
+    elif file_ext == '.docx':
+        return extract_text_from_docx(file_path)
+    elif file_ext == '.txt':
+        return extract_text_from_txt(file_path)
+    
+    logger.error(f"Unsupported file format: {file_ext}")
+    return ""
@@ -10,6 +10,7 @@ import requests
 from typing import Dict, List, Union, Optional
 
 from app.config import settings
+from app.utils.llm_scheduler import scheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -68,7 +69,8 @@ def analyze_with_perplexity(
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers)
+        with scheduler.slot():
+            response = requests.post(url, json=payload, headers=headers)
         response.raise_for_status()  # Raise exception for bad status codes
         
         # Extract the response content
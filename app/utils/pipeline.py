@@ -0,0 +1,180 @@
+"""
+Stage pipeline for UniSphere.
+A pipeline is a set of stages that declare the named values they read and produce.
+Every stage whose inputs are available runs at once on a thread pool, so the wall
+time of a run approaches that of its longest dependency chain instead of the sum
+of all stages. Completion callbacks run on the calling thread, which keeps the
+caller's database session single-threaded.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class PipelineError(Exception):
+    """Raised when a pipeline's stages cannot be scheduled."""
+
+
+class Stage:
+    """
+    One unit of work in a Pipeline.
+
+    The stage function is called with its inputs as keyword arguments. A stage with
+    one output returns the value itself; a stage with several outputs returns a dict
+    keyed by output name. Stages that set ``needs_session`` also receive ``db``, a
+    session of their own that is closed when the stage finishes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        inputs: Sequence[str] = (),
+        outputs: Sequence[str] = (),
+        needs_session: bool = False
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.needs_session = needs_session
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+class PipelineRun:
+    """Values, timings and failures of one pipeline run."""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.skipped: List[str] = []
+        self.wall_time = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Timings in seconds, with the stage total to compare against the wall time."""
+        return {
+            "wall_time": round(self.wall_time, 3),
+            "stage_time": round(sum(self.timings.values()), 3),
+            "stages": {name: round(seconds, 3) for name, seconds in self.timings.items()},
+            "errors": {name: str(error) for name, error in self.errors.items()},
+            "skipped": list(self.skipped)
+        }
+
+
+class Pipeline:
+    """A set of stages scheduled by their data dependencies."""
+
+    def __init__(self, stages: List[Stage], max_workers: int = 4):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise PipelineError("Stage names must be unique")
+        producers: Dict[str, str] = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise PipelineError(f"Output {output!r} is produced by both {producers[output]} and {stage.name}")
+                producers[output] = stage.name
+        self.stages = stages
+        self.max_workers = max(1, max_workers)
+
+    @staticmethod
+    def _execute(stage: Stage, kwargs: Dict[str, Any], session_factory: Optional[Callable[[], Session]]):
+        """Run one stage; returns its result, elapsed seconds and exception, if any."""
+        start = time.perf_counter()
+        session = None
+        try:
+            if stage.needs_session:
+                session = session_factory()
+                kwargs = {**kwargs, "db": session}
+            return stage.func(**kwargs), time.perf_counter() - start, None
+        except Exception as e:
+            return None, time.perf_counter() - start, e
+        finally:
+            if session is not None:
+                session.close()
+
+    def run(
+        self,
+        values: Dict[str, Any],
+        on_stage_complete: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ) -> PipelineRun:
+        """
+        Run every stage once its inputs are available.
+
+        Args:
+            values: Initial named values
+            on_stage_complete: Called on this thread with the stage name and its
+                outputs as soon as each stage finishes, e.g. to persist them
+            session_factory: Creates sessions for stages that need one
+
+        Returns:
+            The run's values, per-stage timings, errors and skipped stages. Stages
+            downstream of a failed stage are skipped rather than run.
+        """
+        if session_factory is None and any(stage.needs_session for stage in self.stages):
+            raise PipelineError("A session factory is required for stages that need a session")
+
+        run = PipelineRun()
+        run.values.update(values)
+        failed_outputs = set()
+        pending = {stage.name: stage for stage in self.stages}
+        running: Dict[Future, Stage] = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as executor:
+            while pending or running:
+                # Skip stages behind a failure until nothing changes, then start every ready stage
+                changed = True
+                while changed:
+                    changed = False
+                    for name, stage in list(pending.items()):
+                        if any(key in failed_outputs for key in stage.inputs):
+                            del pending[name]
+                            failed_outputs.update(stage.outputs)
+                            run.skipped.append(name)
+                            changed = True
+                for name, stage in list(pending.items()):
+                    if all(key in run.values for key in stage.inputs):
+                        del pending[name]
+                        kwargs = {key: run.values[key] for key in stage.inputs}
+                        # Each stage runs in a copy of this context, so context variables such as the LLM lane carry over
+                        future = executor.submit(contextvars.copy_context().run, self._execute, stage, kwargs, session_factory)
+                        running[future] = stage
+
+                if not running:
+                    if pending:
+                        raise PipelineError(f"Stages {sorted(pending)} wait for inputs that no stage produces")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    result, run.timings[stage.name], error = future.result()
+                    if error is not None:
+                        logger.error(f"Pipeline stage {stage.name} failed: {str(error)}")
+                        run.errors[stage.name] = error
+                        failed_outputs.update(stage.outputs)
+                        continue
+
+                    if len(stage.outputs) == 1:
+                        outputs = {stage.outputs[0]: result}
+                    else:
+                        outputs = {key: (result or {}).get(key) for key in stage.outputs}
+                    run.values.update(outputs)
+                    if on_stage_complete:
+                        on_stage_complete(stage.name, outputs)
+
+        run.wall_time = time.perf_counter() - started
+        return run
@@ -0,0 +1,554 @@
+"""
+Prompt template registry for UniSphere.
+Prompts are defined once, normalised (indentation and redundant whitespace removed)
+and compiled when this module is imported, so each LLM call only renders the
+variable fields. Every template keeps its static instructions first and its
+variable fields last, which lets provider-side prompt caching reuse the prefix.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import string
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a regex approximation
+    tiktoken = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# The prompts as written before this registry, the baseline of the token report
+_BASELINES_PATH = Path(__file__).resolve().parent.parent / "data" / "prompt_baselines.json"
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]|[ \t]{2,}|\n")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+_encoding = None
+if tiktoken is not None:
+    try:
+        _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        logger.warning("tiktoken encoding unavailable, using approximate token counts")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens a prompt will be billed for.
+
+    Uses tiktoken when it is installed; otherwise approximates BPE tokenisation
+    (words, number groups, punctuation and runs of indentation).
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Number of tokens
+    """
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Normalise prompt text for sending to an LLM.
+
+    Strips leading and trailing whitespace from every line and collapses runs
+    of blank lines, so source-code indentation is never billed.
+
+    Args:
+        text: Raw prompt text as written in source
+
+    Returns:
+        Normalised prompt text
+    """
+    lines = [line.strip() for line in text.strip().splitlines()]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines))
+
+
+class PromptTemplate:
+    """
+    A versioned prompt made of a static prefix and a variable suffix.
+
+    The static part is sent verbatim. The dynamic part uses ``{field}``
+    placeholders and is compiled into literal/field segments per line; lines
+    whose fields all render empty are dropped. ``example`` holds typical field
+    values, used to measure the rendered prompt.
+    """
+
+    def __init__(self, name: str, version: str, static: str, dynamic: str = "", example: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.version = version
+        self.example = example or {}
+        self.static = normalize_prompt(static)
+        self.dynamic = normalize_prompt(dynamic)
+        self._lines = [self._compile_line(line) for line in self.dynamic.splitlines()] if self.dynamic else []
+        self.fields = sorted({field for line in self._lines for _, field in line if field})
+        self.fingerprint = hashlib.sha256(f"{self.static}\x00{self.dynamic}".encode("utf-8")).hexdigest()[:12]
+
+    @staticmethod
+    def _compile_line(line: str) -> List[Tuple[str, Optional[str]]]:
+        return [(literal, field) for literal, field, _, _ in string.Formatter().parse(line)]
+
+    def render(self, **fields: Any) -> str:
+        """
+        Render the template with the given variable fields.
+
+        Args:
+            **fields: Values for every placeholder in the dynamic part
+
+        Returns:
+            Rendered prompt text
+        """
+        missing = [field for field in self.fields if field not in fields]
+        if missing:
+            raise KeyError(f"Prompt '{self.name}' is missing fields: {', '.join(missing)}")
+
+        rendered_lines = []
+        for segments in self._lines:
+            parts = []
+            has_field = False
+            has_value = False
+            for literal, field in segments:
+                parts.append(literal)
+                if field:
+                    has_field = True
+                    value = fields[field]
+                    if value is None or value == "":
+                        continue
+                    has_value = True
+                    parts.append(str(value))
+            if has_field and not has_value:
+                continue
+            rendered_lines.append("".join(parts))
+
+        if not rendered_lines:
+            return self.static
+        return f"{self.static}\n\n" + "\n".join(rendered_lines)
+
+    def token_stats(self, baseline: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Token counts of the prompt as rendered with the example fields, and of the
+        prompt it replaced rendered with the same fields.
+
+        Args:
+            baseline: The original prompt in str.format syntax; None for a prompt
+                that did not exist before the registry
+
+        Returns:
+            Token statistics; the before and saved figures are None without a baseline
+        """
+        after = count_tokens(self.render(**self.example))
+        before = count_tokens(baseline.format(**self.example)) if baseline is not None else None
+        return {
+            "name": self.name,
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "static_tokens": count_tokens(self.static),
+            "tokens_before": before,
+            "tokens_after": after,
+            "tokens_saved": before - after if before is not None else None,
+            "saved_pct": round(100 * (before - after) / before, 1) if before else None
+        }
+
+
+_REGISTRY: Dict[str, PromptTemplate] = {}
+
+
+def register_prompt(template: PromptTemplate) -> PromptTemplate:
+    """Add a compiled template to the registry."""
+    if template.name in _REGISTRY:
+        raise ValueError(f"Prompt '{template.name}' is already registered")
+    _REGISTRY[template.name] = template
+    return template
+
+
+def get_prompt(name: str) -> PromptTemplate:
+    """Look up a compiled template by name."""
+    return _REGISTRY[name]
+
+
+def render_prompt(name: str, /, **fields: Any) -> str:
+    """Render a registered template with its variable fields."""
+    return _REGISTRY[name].render(**fields)
+
+
+def get_prompt_version() -> str:
+    """
+    Combined version of all registered prompts.
+
+    Changes whenever any template's text or version changes, so stored
+    analysis results can record which prompt set produced them.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(_REGISTRY):
+        template = _REGISTRY[name]
+        digest.update(f"{name}:{template.version}:{template.fingerprint};".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def prompt_token_report() -> List[Dict[str, Any]]:
+    """
+    Report per-template token counts of the original prompts and of the templates,
+    both rendered with typical field values.
+
+    Returns:
+        List of per-template token statistics, sorted by name
+    """
+    with open(_BASELINES_PATH, encoding="utf-8") as f:
+        baselines = json.load(f)["prompts"]
+    return [
+        _REGISTRY[name].token_stats((baselines.get(name) or {}).get("text"))
+        for name in sorted(_REGISTRY)
+    ]
+
+
+# Shared fragments. Kept terse: every call pays for these tokens.
+SCORING_RUBRIC = """
+Score compliance 0-100: 0 = not addressed, 25 = poorly, 50 = partially, 75 = mostly, 100 = fully addressed.
+"""
+
+SECURITY_RUBRIC = """
+Score compliance 0-100: 0-39 non-compliant, 40-69 partially compliant, 70-89 mostly compliant, 90-100 fully compliant.
+"""
+
+# Typical RFP listing for measuring the summary prompts
+_EVALUATION_EXAMPLE = {
+    "requirements_text": "\n".join([
+        "- Technical (Must-have): The network must provide at least 10 Gbps of backbone throughput.",
+        "- Operational (Must-have): Critical issues must be responded to within 4 hours, 24/7.",
+        "- Security (Must-have): The solution must hold a FedRAMP Moderate authorization.",
+        "- Financial (Should-have): Pricing must be fixed for the first three years.",
+        "- Compliance (Nice-to-have): The vendor should report monthly on SLA performance."
+    ]),
+    "specs_text": "\n".join([
+        "- Backbone Throughput: min 10 Gbps",
+        "- Edge Throughput: min 1 Gbps",
+        "- Critical Issue Response: max 4 hours",
+        "- Uptime Guarantee: min 99.9 percent"
+    ])
+}
+
+COMPLIANCE_RESPONSE = """
+Respond with a JSON object, where confidence (0-1) is how certain you are of the score:
+{"score": 75, "confidence": 0.9, "explanation": "The vendor addresses this by..."}
+"""
+
+
+register_prompt(PromptTemplate(
+    name="system_procurement",
+    version="1",
+    static="""
+    You are an expert in government procurement evaluation focusing on connectivity projects.
+    """
+))
+
+register_prompt(PromptTemplate(
+    name="requirement_extraction",
+    version="1",
+    static="""
+    You are an expert in government procurement. Extract the key requirements from this Request for Proposal (RFP) document.
+    Focus on connectivity, technical, operational, security, financial and compliance requirements.
+    Only extract actual requirements, not general information or background.
+
+    For each requirement, identify:
+    1. Category (Technical, Security, Operational, Financial, Compliance, etc.)
+    2. Description (the actual requirement text)
+    3. Priority (Must-have, Should-have, or Nice-to-have)
+    4. Section where it appears in the document
+
+    Respond with a JSON array of requirements in this format:
+    [{"category": "Technical", "description": "The system must provide at least 10Gbps throughput for backbone connections.", "priority": "Must-have", "section": "Network Requirements"}]
+    """
+))
+
+register_prompt(PromptTemplate(
+    name="requirement_classification",
+    version="1",
+    static="""
+    You are an expert in government procurement. Each numbered line below is a candidate requirement that keyword rules found in a Request for Proposal (RFP), with the section it appears in.
+    For each candidate decide:
+    1. is_requirement: whether it is an actual obligation on the vendor (false for background, buyer obligations or boilerplate)
+    2. category (Technical, Security, Operational, Financial, Compliance, etc.)
+    3. priority (Must-have, Should-have, or Nice-to-have)
+
+    Respond with a JSON object listing every candidate by its number:
+    {"requirements": [{"index": 1, "is_requirement": true, "category": "Technical", "priority": "Must-have"}]}
+    """
+))
+
+register_prompt(PromptTemplate(
+    name="mandatory_screening",
+    version="1",
+    static="""
+    You are an expert in government procurement evaluation screening bids against pass/fail criteria before full evaluation.
+    Each numbered entry below is a mandatory requirement or specification from a Request for Proposal (RFP), followed by the passages of the vendor's bid most relevant to it.
+    For each entry decide the verdict:
+    - "pass" if the passages show the bid meets the criterion
+    - "fail" if the passages show the bid does not meet it, or the bid clearly does not address it
+    - "unclear" if the passages are not enough to decide
+    Only answer "fail" when the evidence is clear; full evaluation follows for every other verdict.
+
+    Respond with a JSON object listing every entry by its number:
+    {"criteria": [{"index": 1, "verdict": "pass", "reason": "One sentence citing the bid"}]}
+    """
+))
+
+register_prompt(PromptTemplate(
+    name="tech_spec_extraction",
+    version="1",
+    static="""
+    You are an expert in technology procurement for government connectivity projects. Extract the specific technical specifications from this Request for Proposal (RFP) document.
+    Focus on detailed technical requirements that include specific measurements, values, or capabilities.
+
+    For each specification, identify:
+    1. Name (e.g., "Backbone Throughput", "Latency", "Encryption Strength")
+    2. Description
+    3. Category (Network, Security, Hardware, Software, etc.)
+    4. Measurement unit (if applicable)
+    5. Minimum value (if specified)
+    6. Maximum value (if specified)
+    7. Whether it is mandatory
+
+    Respond with a JSON array of specifications in this format:
+    [{"name": "Backbone Throughput", "description": "Minimum network throughput capacity for backbone connections", "category": "Network", "measurement_unit": "Gbps", "min_value": "10", "max_value": null, "is_mandatory": true}]
+    """
+))
+
+register_prompt(PromptTemplate(
+    name="requirement_compliance",
+    version="2",
+    static="""
+    You are an expert in government procurement evaluation. Analyze how well the vendor's bid complies with the requirement below.
+    """ + SCORING_RUBRIC + """
+    Provide a detailed explanation for your score, referencing specific parts of the bid.
+    """ + COMPLIANCE_RESPONSE,
+    dynamic="""
+    Requirement Category: {category}
+    Priority: {priority}
+    Description: {description}
+    """,
+    example={
+        "category": "Technical",
+        "priority": "Must-have",
+        "description": "The network must provide at least 10 Gbps of backbone throughput with 99.99% availability."
+    }
+))
+
+register_prompt(PromptTemplate(
+    name="technical_compliance",
+    version="2",
+    static="""
+    You are an expert in technical evaluation for government connectivity projects. Analyze how well the vendor's bid complies with the technical specification below.
+    """ + SCORING_RUBRIC + """
+    Provide specific evidence from the bid text that justifies your score.
+    """ + COMPLIANCE_RESPONSE,
+    dynamic="""
+    Specification Name: {name}
+    Category: {category}
+    Description: {description}
+    Minimum Value: {min_value}
+    Maximum Value: {max_value}
+    Mandatory: {mandatory}
+    """,
+    example={
+        "name": "Backbone Throughput",
+        "category": "Network",
+        "description": "Minimum network throughput capacity for backbone connections",
+        "min_value": "10 Gbps",
+        "max_value": None,
+        "mandatory": "Yes"
+    }
+))
+
+register_prompt(PromptTemplate(
+    name="strengths_weaknesses",
+    version="1",
+    static="""
+    You are an expert in government procurement evaluation. Based on the vendor's bid, identify the top 5 strengths and top 5 weaknesses of the proposal compared to the RFP requirements and technical specifications listed below.
+    Be specific and reference exact requirements or specifications where possible.
+
+    Respond with a JSON object in this format:
+    {"strengths": ["The vendor exceeds network throughput requirements by offering 20Gbps capability"], "weaknesses": ["Maintenance response time does not meet the required SLA"]}
+    """,
+    dynamic="""
+    RFP Requirements:
+    {requirements_text}
+
+    Technical Specifications:
+    {specs_text}
+    """,
+    example=_EVALUATION_EXAMPLE
+))
+
+register_prompt(PromptTemplate(
+    name="gap_analysis",
+    version="1",
+    static="""
+    You are an expert in government procurement evaluation. Identify specific gaps between the RFP requirements listed below and the vendor's bid.
+    For each gap, include:
+    1. What requirement/specification item has the gap
+    2. What the RFP specifically requires
+    3. What is missing or inadequate in the bid
+    4. The potential impact of this gap (Critical, Medium, or Low)
+
+    Focus on substantive gaps that would affect evaluation or implementation, not minor wording differences.
+
+    Respond with a JSON array in this format:
+    [{"item": "Network throughput requirement", "requirement": "10Gbps minimum throughput", "gap": "Vendor only offers 5Gbps throughput", "impact": "Critical - would not meet basic connectivity needs"}]
+    """,
+    dynamic="""
+    RFP Requirements:
+    {requirements_text}
+
+    Technical Specifications:
+    {specs_text}
+    """,
+    example=_EVALUATION_EXAMPLE
+))
+
+register_prompt(PromptTemplate(
+    name="security_compliance",
+    version="1",
+    static="""
+    Analyze this bid's compliance with the security requirement below.
+    """ + SECURITY_RUBRIC + """
+    Also provide a detailed explanation of your assessment and any evidence found in the bid.
+
+    Respond with a JSON object: {"score": number, "explanation": string, "evidence": string, "status": string}
+    """,
+    dynamic="""
+    Requirement: {title}
+    Description: {description}
+    Framework: {framework}
+    ID: {requirement_id}
+    """,
+    example={
+        "title": "Unsuccessful Logon Attempts",
+        "description": "Enforce a limit of consecutive invalid logon attempts by a user and lock the account when it is exceeded.",
+        "framework": "fedramp",
+        "requirement_id": "AC-7"
+    }
+))
+
+register_prompt(PromptTemplate(
+    name="security_compliance_batch",
+    version="2",
+    static="""
+    Analyze this bid's compliance with each numbered security control below; all belong to one control family.
+    The bid passages are listed first, labelled P1, P2, ...; each control names the passages most relevant to it, but any passage may be used.
+    """ + SECURITY_RUBRIC + """
+    A control no passage addresses is non-compliant.
+
+    Respond with a JSON object listing every control by its number, with the labels of the passages you relied on
+    and how certain you are of the score (confidence, 0-1):
+    {"controls": [{"index": 1, "score": 75, "confidence": 0.9, "explanation": "The vendor addresses this by...", "evidence": "P2, P5"}]}
+    """,
+    dynamic="""
+    Control family: {family}
+    """,
+    example={"family": "Access Control"}
+))
+
+register_prompt(PromptTemplate(
+    name="security_requirement_extraction",
+    version="1",
+    static="""
+    Extract all security requirements from this RFP.
+    For each requirement, identify:
+    1. The security framework it belongs to (e.g., NIST, FedRAMP, CMMC, etc.)
+    2. The requirement ID if available (e.g., AC-2, IA-4)
+    3. The requirement title
+    4. The detailed description
+    5. The compliance level (required, recommended, or optional)
+
+    Respond with a JSON array: [{"framework": string, "requirement_id": string, "title": string, "description": string, "compliance_level": string}]
+    """
+))
+
+register_prompt(PromptTemplate(
+    name="bid_risk_prediction",
+    version="1",
+    static="""
+    Analyze this vendor bid for the following risk categories:
+    1. Financial stability risks (e.g., insufficient resources, pricing inconsistencies)
+    2. Technical capability risks (e.g., unproven technology, insufficient expertise)
+    3. Delivery timeline risks (e.g., unrealistic deadlines, resource constraints)
+    4. Compliance risks (e.g., regulatory issues, certification gaps)
+    5. Security risks (e.g., data protection vulnerabilities, access control issues)
+
+    For each risk identified give a clear title, a severity (High, Medium, Low), a detailed explanation and suggested mitigation strategies.
+
+    Respond with a JSON object where overall_risk_score is 0-100 (0 is lowest risk):
+    {"overall_risk_score": number, "risks": [{"category": string, "title": string, "severity": string, "explanation": string, "mitigation": string}]}
+    """
+))
+
+register_prompt(PromptTemplate(
+    name="bid_sentiment",
+    version="1",
+    static="""
+    Analyze the sentiment and language patterns in this vendor bid.
+    Identify potential issues such as:
+    1. Uncertainty or lack of confidence (e.g., hedging language, excessive qualifiers)
+    2. Overcommitment (e.g., unrealistic promises, lack of specificity in delivery)
+    3. Ambiguity (e.g., vague terms, undefined scope)
+    4. Reluctance (e.g., excessive caveats, limitations)
+    5. Negative sentiment (e.g., complaints about requirements, defensive tone)
+
+    For each section of the bid, identify the overall sentiment and confidence level.
+    Also identify any concerning patterns or red flags.
+
+    Respond with a JSON object where overall_sentiment is "positive", "neutral" or "negative" and confidence values are 0-100:
+    {"overall_sentiment": string, "confidence_score": number, "key_findings": [{"finding": string, "evidence": string, "significance": string, "recommendation": string}], "section_analysis": [{"section": string, "sentiment": string, "confidence": number, "notable_patterns": string}]}
+    """
+))
+
+
+register_prompt(PromptTemplate(
+    name="chunk_summary",
+    version="1",
+    static="""
+    Summarize this excerpt of a vendor bid for a government procurement evaluation in at most 150 words.
+    Keep every concrete commitment: numbers, units, SLAs, certifications, security controls, staffing, schedule and pricing.
+    Do not add information that is not in the excerpt. Respond with plain text only.
+    """
+))
+
+register_prompt(PromptTemplate(
+    name="section_summary",
+    version="1",
+    static="""
+    The text below is a sequence of summaries of consecutive excerpts of a vendor bid.
+    Merge them into one summary of at most 250 words, keeping every concrete commitment (numbers, units, SLAs, certifications, security controls, staffing, schedule and pricing).
+    Respond with plain text only.
+    """
+))
+
+register_prompt(PromptTemplate(
+    name="document_summary",
+    version="1",
+    static="""
+    The text below is a sequence of section summaries covering a complete vendor bid.
+    Write an overview of the whole bid in at most 400 words: scope of the offer, technical approach, key commitments and any notable omissions or caveats.
+    Respond with plain text only.
+    """
+))
+
+
+if __name__ == "__main__":
+    # Print the token report: python -m app.utils.prompt_templates
+    print(f"{'template':34} {'before':>7} {'after':>7} {'saved':>7}")
+    for row in prompt_token_report():
+        if row["tokens_before"] is None:
+            print(f"{row['name']:34} {'-':>7} {row['tokens_after']:>7} {'-':>7}")
+        else:
+            print(f"{row['name']:34} {row['tokens_before']:>7} {row['tokens_after']:>7} {row['saved_pct']:>6}%")
+    print(f"prompt set version: {get_prompt_version()}")
@@ -0,0 +1,141 @@
+"""
+Rule-based requirement extraction for UniSphere.
+Most RFP requirements are sentences or list items built around a small set of modal
+phrases ("shall", "must", "is required to", "will provide"). This module finds them
+with precompiled patterns over the segmented document, so the LLM only has to
+classify candidates instead of reading the whole RFP, and RFPs can be analyzed
+without any LLM at all.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.section_utils import PREAMBLE
+
+# Breaks between candidate units: sentence ends, blank lines and list items
+_UNIT_BREAK = re.compile(
+    r"(?<=[.!?;])\s+(?=[(\"'A-Z0-9])"
+    r"|\n[ \t]*\n"
+    r"|\n(?=[ \t]*(?:[-•*▪]|\(?(?:\d{1,3}|[a-zA-Z]|[ivx]{1,4})[.)])[ \t]+)"
+)
+_LIST_MARKER = re.compile(r"^\s*(?:[-•*▪]|\(?(?:\d{1,3}(?:\.\d+)*|[a-zA-Z]|[ivx]{1,4})[.)])\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Modal phrases, strongest first; the first class that matches sets the priority
+_TRIGGERS: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("Must-have", re.compile(
+        r"\b(?:shall|must|(?:is|are) required|(?:is|are) mandatory|at a minimum|no less than)\b", re.IGNORECASE
+    )),
+    ("Should-have", re.compile(
+        r"\b(?:should|will (?:provide|be required|ensure|support|maintain|deliver|include|submit)"
+        r"|(?:is|are) expected to|(?:is|are) responsible for)\b", re.IGNORECASE
+    )),
+    ("Nice-to-have", re.compile(
+        r"\b(?:(?:is|are) (?:desirable|preferred|encouraged)|preferably|optional(?:ly)?|nice to have)\b", re.IGNORECASE
+    )),
+]
+
+# Obligations of the buyer rather than the vendor
+_BUYER_SUBJECT = re.compile(
+    r"^(?:the\s+)?(?:government|agency|state|county|city|department|owner|purchaser|buyer|contracting officer)"
+    r"\s+(?:shall|will|may|must|reserves)\b",
+    re.IGNORECASE
+)
+
+_CATEGORY_KEYWORDS: Dict[str, "re.Pattern[str]"] = {
+    "Security": re.compile(
+        r"\b(?:secur\w*|encrypt\w*|authenticat\w*|mfa|fedramp|fisma|nist|access control|vulnerab\w*|"
+        r"incident|firewall|audit log\w*|privacy|pii|intrusion)\b", re.IGNORECASE
+    ),
+    "Financial": re.compile(
+        r"\b(?:pric\w*|cost\w*|invoic\w*|payment\w*|budget\w*|fees?|discount\w*|bond|insurance|warrant\w*)\b",
+        re.IGNORECASE
+    ),
+    "Compliance": re.compile(
+        r"\b(?:compl(?:y|ies|iance)|regulat\w*|statut\w*|laws?|certif\w*|section 508|ada|hipaa|licens\w*)\b",
+        re.IGNORECASE
+    ),
+    "Operational": re.compile(
+        r"\b(?:support|maintenance|training|staff\w*|schedul\w*|deliver\w*|report\w*|help ?desk|sla|"
+        r"response time|implementation|project management|transition|on-?site)\b", re.IGNORECASE
+    ),
+    "Technical": re.compile(
+        r"\b(?:system\w*|network\w*|bandwidth|[gmk]bps|latency|uptime|availability|software|hardware|"
+        r"integrat\w*|api\w*|database\w*|throughput|server\w*|cloud|redundan\w*|backup\w*)\b", re.IGNORECASE
+    ),
+}
+
+MIN_CANDIDATE_CHARS = 20
+MAX_CANDIDATE_CHARS = 1000
+
+
+def _units(text: str) -> List[Tuple[int, int]]:
+    """Split text into sentence and list-item units, as (start, end) offsets."""
+    units = []
+    start = 0
+    for match in _UNIT_BREAK.finditer(text):
+        units.append((start, match.start()))
+        start = match.end()
+    units.append((start, len(text)))
+    return units
+
+
+def classify_priority(sentence: str) -> Optional[str]:
+    """Priority implied by the sentence's modal phrase, or None when it states no requirement."""
+    for priority, pattern in _TRIGGERS:
+        if pattern.search(sentence):
+            return priority
+    return None
+
+
+def classify_category(sentence: str) -> str:
+    """Category whose keywords occur most often in the sentence; Technical when none do."""
+    best, best_hits = "Technical", 0
+    for category, pattern in _CATEGORY_KEYWORDS.items():
+        hits = len(pattern.findall(sentence))
+        if hits > best_hits:
+            best, best_hits = category, hits
+    return best
+
+
+def extract_requirement_candidates(sections: List[Dict]) -> List[Dict]:
+    """
+    Find requirement sentences and list items in segmented RFP text.
+
+    Args:
+        sections: Sections from segment_sections
+
+    Returns:
+        Candidate requirements in document order, each with description, a heuristic
+        category and priority, the section heading and key, and start and end
+        character offsets in the document
+    """
+    candidates = []
+    for section in sections:
+        body = section["text"]
+        # The heading line itself is not part of any requirement
+        skip = 0 if section["key"] == PREAMBLE else body.find("\n") + 1 or len(body)
+        for start, end in _units(body[skip:]):
+            start, end = start + skip, end + skip
+            raw = body[start:end]
+            marker = _LIST_MARKER.match(raw)
+            if marker:
+                start += marker.end()
+            sentence = _WHITESPACE.sub(" ", body[start:end]).strip()
+            if not MIN_CANDIDATE_CHARS <= len(sentence) <= MAX_CANDIDATE_CHARS:
+                continue
+            if _BUYER_SUBJECT.match(sentence):
+                continue
+            priority = classify_priority(sentence)
+            if not priority:
+                continue
+            candidates.append({
+                "description": sentence,
+                "category": classify_category(sentence),
+                "priority": priority,
+                "section": section["heading"][:255],
+                "section_key": section["key"],
+                "start": section["start"] + start,
+                "end": section["start"] + end
+            })
+    return candidates
@@ -0,0 +1,102 @@
+"""
+Section segmentation utilities for UniSphere.
+Splits RFP text into its numbered or titled sections and fingerprints each one,
+so two versions of a document can be compared section by section.
+"""
+
+import hashlib
+import re
+from typing import Dict, List
+
+_LINE = re.compile(r"^.*$", re.MULTILINE)
+# Keyword headings ("SECTION 5 - SUPPORT", "Article IV")
+_KEYWORD_HEADING = re.compile(r"^(?:section|article|part|attachment|appendix)\s+[\w.\-]+", re.IGNORECASE)
+# Numbered headings ("3.2 Network Requirements", "C.4.1 Security")
+_NUMBERED_HEADING = re.compile(r"^(?:[A-Z]\.)?\d+(?:\.\d+)*\.?\s+[A-Z]")
+# Short all-caps lines ("STATEMENT OF WORK")
+_CAPS_HEADING = re.compile(r"^[A-Z][A-Z0-9 ,&/()\-]{3,80}$")
+_WHITESPACE = re.compile(r"\s+")
+
+PREAMBLE = "preamble"
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    # Numbered list items that are full sentences ("1. The vendor shall ...") are not headings
+    if not stripped or len(stripped) > 110 or stripped.endswith((".", ",", ";", ":")):
+        return False
+    if _KEYWORD_HEADING.match(stripped) or _NUMBERED_HEADING.match(stripped):
+        return True
+    return bool(_CAPS_HEADING.match(stripped)) and len(stripped.split()) <= 10
+
+
+def normalize_section_text(text: str) -> str:
+    """Collapse whitespace and case so formatting-only edits do not count as changes."""
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def section_key(heading: str) -> str:
+    """Stable key for a section heading."""
+    return normalize_section_text(heading)[:255]
+
+
+def segment_sections(text: str) -> List[Dict]:
+    """
+    Split a document into sections at its headings.
+
+    Text before the first heading becomes the "preamble" section. Repeated
+    headings get a numeric suffix so every key is unique.
+
+    Args:
+        text: Document text
+
+    Returns:
+        List of sections in document order, each with key, heading, start and end
+        offsets, text and a content hash
+    """
+    if not text:
+        return []
+
+    starts = [m for m in _LINE.finditer(text) if _is_heading(m.group(0))]
+    bounds = [(PREAMBLE, 0)] + [(m.group(0).strip(), m.start()) for m in starts]
+
+    sections = []
+    seen: Dict[str, int] = {}
+    for i, (heading, start) in enumerate(bounds):
+        end = bounds[i + 1][1] if i + 1 < len(bounds) else len(text)
+        body = text[start:end]
+        if not body.strip():
+            continue
+        key = section_key(heading)
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] > 1:
+            key = f"{key} #{seen[key]}"
+        sections.append({
+            "key": key,
+            "heading": heading,
+            "start": start,
+            "end": end,
+            "text": body,
+            "hash": hashlib.sha256(normalize_section_text(body).encode("utf-8")).hexdigest()
+        })
+
+    return sections
+
+
+def diff_sections(previous: Dict[str, str], current: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Compare two documents' section digests.
+
+    Args:
+        previous: Mapping of section key to content hash for the earlier version
+        current: Mapping of section key to content hash for the new version
+
+    Returns:
+        Section keys grouped as added, changed, removed and unchanged
+    """
+    return {
+        "added": [key for key in current if key not in previous],
+        "changed": [key for key in current if key in previous and previous[key] != current[key]],
+        "removed": [key for key in previous if key not in current],
+        "unchanged": [key for key in current if previous.get(key) == current[key]]
+    }
@@ -0,0 +1,199 @@
+"""
+Unit normalisation utilities for UniSphere.
+Parses free-text quantities ("10", "99.99%", "1,000 Mbps", "4 hours") into canonical
+numeric values and units, so numeric specifications and the numeric claims of a bid
+can be compared without an LLM.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Dimension, canonical unit and conversion factor to it for each unit spelling.
+# Bandwidth units always carry "ps" or "/s", which keeps them apart from storage units.
+_UNITS: Dict[str, Tuple[str, float]] = {}
+_CANONICAL_UNITS = {
+    "bandwidth": "Mbps",
+    "time": "ms",
+    "percentage": "%",
+    "storage": "GB",
+    "power": "W",
+}
+
+
+def _register(dimension: str, factor: float, *spellings: str) -> None:
+    for spelling in spellings:
+        _UNITS[spelling] = (dimension, factor)
+
+
+_register("bandwidth", 1e-6, "bps", "bit/s", "bits per second")
+_register("bandwidth", 1e-3, "kbps", "kbit/s", "kilobits per second")
+_register("bandwidth", 1.0, "mbps", "mbit/s", "megabits per second")
+_register("bandwidth", 1e3, "gbps", "gbit/s", "gigabits per second")
+_register("bandwidth", 1e6, "tbps", "tbit/s", "terabits per second")
+_register("bandwidth", 8e-3, "kilobytes per second")
+_register("bandwidth", 8.0, "megabytes per second")
+_register("bandwidth", 8e3, "gigabytes per second")
+_register("time", 1e-3, "us", "µs", "μs", "microsecond", "microseconds")
+_register("time", 1.0, "ms", "msec", "millisecond", "milliseconds")
+_register("time", 1e3, "s", "sec", "secs", "second", "seconds")
+_register("time", 6e4, "min", "mins", "minute", "minutes")
+_register("time", 3.6e6, "h", "hr", "hrs", "hour", "hours")
+_register("time", 8.64e7, "day", "days")
+_register("percentage", 1.0, "%", "percent", "pct")
+_register("storage", 1e-6, "kb", "kilobyte", "kilobytes")
+_register("storage", 1e-3, "mb", "megabyte", "megabytes")
+_register("storage", 1.0, "gb", "gigabyte", "gigabytes")
+_register("storage", 1e3, "tb", "terabyte", "terabytes")
+_register("storage", 1e6, "pb", "petabyte", "petabytes")
+_register("storage", 1024 / 1e9, "kib")
+_register("storage", 1024 ** 2 / 1e9, "mib")
+_register("storage", 1024 ** 3 / 1e9, "gib")
+_register("storage", 1024 ** 4 / 1e9, "tib")
+_register("power", 1e-3, "mw", "milliwatt", "milliwatts")
+_register("power", 1.0, "w", "watt", "watts")
+_register("power", 1e3, "kw", "kilowatt", "kilowatts")
+
+# Case-sensitive spellings that would be ambiguous in lower case: "MB/s" is megabytes
+# and "Mb/s" megabits per second, while "mb/s" could be either and is not recognised
+_CASE_SENSITIVE = {
+    "MW": ("power", 1e6),
+    "kb/s": ("bandwidth", 1e-3), "Kb/s": ("bandwidth", 1e-3), "Mb/s": ("bandwidth", 1.0),
+    "Gb/s": ("bandwidth", 1e3), "Tb/s": ("bandwidth", 1e6),
+    "B/s": ("bandwidth", 8e-6), "kB/s": ("bandwidth", 8e-3), "KB/s": ("bandwidth", 8e-3),
+    "MB/s": ("bandwidth", 8.0), "GB/s": ("bandwidth", 8e3), "TB/s": ("bandwidth", 8e6),
+    "MBps": ("bandwidth", 8.0), "GBps": ("bandwidth", 8e3),
+}
+
+_NUMBER = r"(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+_UNIT_ALTERNATION = "|".join(
+    re.escape(spelling) for spelling in sorted(set(_UNITS) | set(_CASE_SENSITIVE), key=len, reverse=True)
+)
+_QUANTITY = re.compile(
+    rf"(?<![\w.]){_NUMBER}\s*(?:-\s*)?({_UNIT_ALTERNATION})(?![A-Za-z0-9/])",
+    re.IGNORECASE
+)
+_BARE_NUMBER = re.compile(rf"^\s*(?:[<>]=?|≤|≥|~|at least|at most|up to|minimum|maximum|min\.?|max\.?)?\s*{_NUMBER}\s*$", re.IGNORECASE)
+_NINES = re.compile(r"\b(two|three|four|five|six) nines\b", re.IGNORECASE)
+_NINES_VALUES = {"two": 99.0, "three": 99.9, "four": 99.99, "five": 99.999, "six": 99.9999}
+
+
+def _unit_info(spelling: str) -> Optional[Tuple[str, float]]:
+    spelling = spelling.strip()
+    if spelling in _CASE_SENSITIVE:
+        return _CASE_SENSITIVE[spelling]
+    return _UNITS.get(spelling.lower())
+
+
+def _to_float(number: str) -> float:
+    return float(number.replace(",", ""))
+
+
+def parse_quantity(value: Any, unit_hint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Parse a quantity into a canonical value and unit.
+
+    Args:
+        value: Value as written, e.g. "10", "99.99%", "1,000 Mbps" or "five nines"
+        unit_hint: Unit to assume when the value carries none, e.g. a spec's measurement_unit
+
+    Returns:
+        Dict with value (in the canonical unit), unit and dimension, or None when the
+        value is not a number with a recognised unit
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        text = str(value)
+    else:
+        text = str(value).strip()
+    if not text:
+        return None
+
+    nines = _NINES.search(text)
+    if nines:
+        return {"value": _NINES_VALUES[nines.group(1).lower()], "unit": "%", "dimension": "percentage"}
+
+    match = _QUANTITY.search(text)
+    if match:
+        number, spelling = match.group(1), match.group(2)
+    else:
+        bare = _BARE_NUMBER.match(text)
+        if not bare or not unit_hint:
+            return None
+        number, spelling = bare.group(1), unit_hint
+
+    info = _unit_info(spelling)
+    if not info:
+        return None
+    dimension, factor = info
+    return {"value": _to_float(number) * factor, "unit": _CANONICAL_UNITS[dimension], "dimension": dimension}
+
+
+def normalize_spec_bounds(min_value: Any, max_value: Any, measurement_unit: Optional[str]) -> Dict[str, Any]:
+    """
+    Canonical numeric bounds of a technical specification.
+
+    Args:
+        min_value: Minimum value as extracted
+        max_value: Maximum value as extracted
+        measurement_unit: Unit as extracted
+
+    Returns:
+        Dict with min_numeric, max_numeric, canonical_unit and dimension; all None when
+        neither bound parses, and bounds of a different dimension are dropped
+    """
+    low = parse_quantity(min_value, measurement_unit)
+    high = parse_quantity(max_value, measurement_unit)
+    dimension = (low or high or {}).get("dimension")
+    if low and low["dimension"] != dimension:
+        low = None
+    if high and high["dimension"] != dimension:
+        high = None
+    return {
+        "min_numeric": low["value"] if low else None,
+        "max_numeric": high["value"] if high else None,
+        "canonical_unit": _CANONICAL_UNITS[dimension] if dimension else None,
+        "dimension": dimension
+    }
+
+
+def find_quantities(text: str) -> List[Dict[str, Any]]:
+    """
+    Find every number-with-unit claim in a text.
+
+    Args:
+        text: Bid text or evidence passages
+
+    Returns:
+        Claims in text order, each with value, unit, dimension, the matched text and
+        its start and end offsets
+    """
+    claims = []
+    for match in _QUANTITY.finditer(text):
+        info = _unit_info(match.group(2))
+        if not info:
+            continue
+        dimension, factor = info
+        claims.append({
+            "value": _to_float(match.group(1)) * factor,
+            "unit": _CANONICAL_UNITS[dimension],
+            "dimension": dimension,
+            "text": match.group(0),
+            "start": match.start(),
+            "end": match.end()
+        })
+    for match in _NINES.finditer(text):
+        claims.append({
+            "value": _NINES_VALUES[match.group(1).lower()],
+            "unit": "%",
+            "dimension": "percentage",
+            "text": match.group(0),
+            "start": match.start(),
+            "end": match.end()
+        })
+    return sorted(claims, key=lambda claim: claim["start"])
+
+
+def format_quantity(value: float, unit: str) -> str:
+    """Readable canonical quantity, e.g. "10,000 Mbps"."""
+    return f"{value:,.10g} {unit}" if unit != "%" else f"{value:,.10g}%"